@@ -1,6 +1,11 @@
+import itertools
 import json
 import os
-import requests
+import chatSession
+import feedbackCache
+import llmGateway
+import llmResilience
+import metrics
 
 # 공통 질문 5개
 COMMON_QUESTIONS = [
@@ -11,18 +16,33 @@ COMMON_QUESTIONS = [
     "5년 후 본인의 모습을 어떻게 상상하시나요?"
 ]
 
-def lambda_handler(event, context):
-    # ① API 키 확인
-    api_key = os.environ.get("OPENAI_API_KEY")
-    if not api_key:
-        return {"statusCode": 500, "body": json.dumps({"error": "OPENAI_API_KEY가 설정되지 않음"})}
+FINAL_MESSAGE = "모든 질문이 끝났어요. 면접 준비 잘 하셨길 바랍니다!"
+
+SYSTEM_PROMPT = "너는 면접관이자 코치야. 응답은 항상 짧고 명확해야 해."
+OPENAI_MODEL = "gpt-4o-mini"
+
+
+def _is_upstream_failure(e):
+    """상위 서비스 장애(타임아웃/연결 오류/429/5xx)만 회로 차단기 실패로 셉니다."""
+    if isinstance(e, llmGateway.LLMError) and e.status_code:
+        return e.status_code == 429 or e.status_code >= 500
+    return True
 
-    # ② 요청 데이터 파싱
-    try:
-        body = json.loads(event.get("body", "{}"))
-    except Exception as e:
-        return {"statusCode": 400, "body": json.dumps({"error": f"body 파싱 실패: {str(e)}"})}
 
+# 피드백 호출 보호 (헤지 요청 + 회로 차단기, 웜 인보크 사이에 상태 유지)
+feedback_guard = llmResilience.GuardedCall('openai-feedback', is_failure=_is_upstream_failure)
+stream_guard = llmResilience.GuardedCall('openai-feedback-stream', is_failure=_is_upstream_failure)
+
+
+def plan_turn(body, job_question_limit=None):
+    """요청 본문으로 이번 턴을 결정합니다.
+
+    job_question_limit: 서버 측 세션에서만 지정. 이만큼 직무 질문에 답하면 job_done으로 바꾸고 면접을 끝냄
+    (None이면 기존처럼 클라이언트가 보낸 job_done을 따름).
+
+    반환: (즉시 반환할 응답 본문 또는 None, AI에 보낼 prompt, 응답에 담을 상태 필드,
+          피드백 캐시 범위(공통 질문 답변일 때 해당 질문, 아니면 None))
+    """
     resume = body.get("resume", "이력서 정보 없음")
     job_type = body.get("job_type", "직무 미정")
     conversation = body.get("conversation", [])
@@ -34,6 +54,7 @@ def lambda_handler(event, context):
 
     # ③ 공통 질문 단계
     prompt = ""
+    cache_scope = None
     if not common_done:
         # 사용자가 답변한 경우 → AI 피드백 생성
         if user_answer:
@@ -43,6 +64,7 @@ def lambda_handler(event, context):
                 f"질문: {last_question}\n"
                 f"답변: {user_answer}"
             )
+            cache_scope = last_question
         # 다음 질문 결정
         if common_index < len(COMMON_QUESTIONS):
             next_question = COMMON_QUESTIONS[common_index]
@@ -57,66 +79,236 @@ def lambda_handler(event, context):
     if common_done and not job_done:
         if job_index == 0 and not user_answer:
             return {
-                "statusCode": 200,
-                "body": json.dumps({
-                    "question": f"{job_type} 직무와 관련된 질문을 시작할게요. 이 직무를 선택한 이유는 무엇인가요?",
-                    "common_done": True,
-                    "job_index": 1
-                })
-            }
+                "question": f"{job_type} 직무와 관련된 질문을 시작할게요. 이 직무를 선택한 이유는 무엇인가요?",
+                "common_done": True,
+                "job_index": 1
+            }, "", None, None
         elif user_answer:
             prompt = (
                 f"너는 면접관이야. '{job_type}' 직무 면접 중이야. 아래 답변을 보고 적절한지 평가하고 부족하면 피드백과 꼬리 질문 1개만 해줘.\n\n"
                 f"답변: {user_answer}"
             )
+            cache_scope = None  # 직무 답변 피드백은 공통 질문 범위로 캐시하지 않음
+            # 마지막 직무 질문에 답했으면 피드백과 함께 면접 종료
+            if job_question_limit is not None and job_index >= job_question_limit:
+                job_done = True
+                next_question = FINAL_MESSAGE
 
-    # ⑤ 모든 질문이 끝난 경우
-    if common_done and job_done:
-        return {
-            "statusCode": 200,
-            "body": json.dumps({"question": "모든 질문이 끝났어요. 면접 준비 잘 하셨길 바랍니다!"})
-        }
+    # ⑤ 모든 질문이 끝난 경우 (이번 턴에 끝났으면 위에서 만든 피드백 프롬프트는 그대로 보냄)
+    if common_done and job_done and not prompt:
+        return {"question": FINAL_MESSAGE}, "", None, None
 
-    # ⑥ AI 호출 (prompt가 있을 때만)
-    ai_feedback = None
-    if prompt:
-        try:
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "gpt-4o-mini",
-                    "messages": [
-                        {"role": "system", "content": "너는 면접관이자 코치야. 응답은 항상 짧고 명확해야 해."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    "temperature": 0.6,
-                    "max_tokens": 500
-                },
-                timeout=25
-            )
+    return None, prompt, {
+        "question": next_question,
+        "common_index": common_index,
+        "job_index": job_index + 1 if common_done and not job_done else job_index,
+        "common_done": common_done,
+        "job_done": job_done
+    }, cache_scope
+
+
+def _messages(prompt):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def _cached_feedback(cache_scope, body):
+    """비슷한 답변에 대해 이전에 생성한 피드백이 있으면 반환합니다."""
+    if not cache_scope:
+        return None
+    hit = feedbackCache.lookup(cache_scope, body.get("user_answer", ""))
+    if hit is None:
+        return None
+    print(f"[Info] 피드백 캐시 적중 (유사도 {hit['similarity']:.3f}, 적중률 {feedbackCache.get_stats()['hit_rate']})")
+    return hit["value"]
+
+
+def _parse_request(event):
+    """① API 키 확인, ② 요청 데이터 파싱. 실패 시 (None, None, 오류 응답)을 반환합니다."""
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        return None, None, {"statusCode": 500, "body": json.dumps({"error": "OPENAI_API_KEY가 설정되지 않음"})}
+    try:
+        body = json.loads(event.get("body") or "{}")
+    except Exception as e:
+        return None, None, {"statusCode": 400, "body": json.dumps({"error": f"body 파싱 실패: {str(e)}"})}
+    return api_key, body, None
+
+
+def _open_session(body):
+    """세션 모드 요청이면 (chatSession.Turn, plan_turn용 본문)을, 기존 요청이면 (None, body)를 반환합니다.
+
+    - {"new_session": true, "resume": ..., "job_type": ...}: 서버 측 세션을 만들고 첫 질문부터 시작
+    - {"session_id": ..., "user_answer": ...}: 저장된 진행 상태와 대화 맥락으로 이어서 진행
+    - 그 외: 기존처럼 클라이언트가 보낸 진행 상태를 그대로 사용
+    세션이 없으면 LookupError를 발생시킵니다.
+    """
+    if body.get("new_session"):
+        item = chatSession.create(body.get("resume", "이력서 정보 없음"), body.get("job_type", "직무 미정"))
+    elif body.get("session_id"):
+        item = chatSession.load(body["session_id"])
+        if item is None:
+            raise LookupError(f"session_id {body['session_id']} 없음 (만료되었을 수 있음)")
+    else:
+        return None, body
+    turn = chatSession.Turn(item)
+    return turn, turn.plan_body(body.get("user_answer", "").strip())
 
-            if response.status_code != 200:
-                return {"statusCode": response.status_code, "body": json.dumps({"error": response.text})}
 
-            result = response.json()
-            ai_feedback = result.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
+def _with_context(turn, prompt, cache_scope):
+    """프롬프트 앞에 세션 맥락(요약 + 최근 턴)을 붙입니다.
 
+    맥락이 들어간 피드백은 이 지원자의 대화에 맞춰진 것이므로 공유 피드백 캐시를 쓰지 않습니다 (cache_scope=None).
+    """
+    context = turn.context()
+    if not context:
+        return prompt, cache_scope
+    return context + prompt, None
+
+
+def _commit_session(turn, body, state, feedback):
+    """이번 턴을 세션에 저장하고 응답에 붙일 필드를 반환합니다. 이미 처리된 턴이면 SessionConflict."""
+    if turn is None:
+        return {}
+    turn.commit(body.get("user_answer", ""), state, state.get("question"), feedback)
+    return {"session_id": turn.item["session_id"]}
+
+
+@metrics.handler('aiInterviewBot')
+def lambda_handler(event, context):
+    """버퍼링 모드: 전체 응답을 받은 뒤 한 번에 반환 (스트리밍이 안 되는 API Gateway 통합용)."""
+    api_key, body, error_response = _parse_request(event)
+    if error_response:
+        return error_response
+    try:
+        turn, body = _open_session(body)
+    except LookupError as e:
+        return {"statusCode": 404, "body": json.dumps({"error": str(e)})}
+
+    early_body, prompt, fields, cache_scope = plan_turn(body, turn.job_question_limit if turn else None)
+    if early_body is not None:
+        try:
+            early_body = dict(early_body, **_commit_session(turn, body, early_body, None))
+        except chatSession.SessionConflict as e:
+            return {"statusCode": 409, "body": json.dumps({"error": str(e)})}
+        return {"statusCode": 200, "body": json.dumps(early_body)}
+    if turn is not None and prompt:
+        prompt, cache_scope = _with_context(turn, prompt, cache_scope)
+
+    # ⑥ AI 호출 (prompt가 있을 때만, 비슷한 공통 질문 답변이 캐시에 있으면 재사용)
+    ai_feedback = None
+    cached = _cached_feedback(cache_scope, body)
+    if cached is not None:
+        ai_feedback = cached
+    elif prompt:
+        try:
+            # 응답이 최근 p95보다 늦으면 같은 요청을 하나 더 보내 먼저 온 응답을 사용
+            result = feedback_guard.call(lambda: llmGateway.chat_openai(
+                _messages(prompt),
+                model=OPENAI_MODEL,
+                temperature=0.6,
+                max_tokens=500,
+                timeout=25,
+                api_key=api_key,
+                max_retries=1  # 실시간 면접이므로 재시도는 1회만
+            ))
+            ai_feedback = result["text"]
+            if cache_scope:
+                feedbackCache.store(cache_scope, body.get("user_answer", ""), ai_feedback)
+
+        except llmResilience.CircuitOpenError:
+            # 연속 실패로 회로가 열려 있으면 기다리지 않고 피드백 없이 다음 질문만 반환
+            print(f"[Warn] 피드백 생략 (회로 차단기 열림): {feedback_guard.get_stats()}")
+        except llmGateway.LLMError as e:
+            if e.status_code:
+                return {"statusCode": e.status_code, "body": json.dumps({"error": e.body})}
+            ai_feedback = f"AI 호출 실패: {str(e)}"
         except Exception as e:
             ai_feedback = f"AI 호출 실패: {str(e)}"
 
-    # ⑦ 반환
+    # ⑦ 세션 저장 후 반환
+    try:
+        fields = dict(fields, **_commit_session(turn, body, fields, ai_feedback))
+    except chatSession.SessionConflict as e:
+        return {"statusCode": 409, "body": json.dumps({"error": str(e)})}
     return {
         "statusCode": 200,
-        "body": json.dumps({
-            "feedback_or_followup": ai_feedback,
-            "question": next_question,
-            "common_index": common_index,
-            "job_index": job_index + 1 if common_done else job_index,
-            "common_done": common_done,
-            "job_done": job_done
-        })
+        "body": json.dumps(dict({"feedback_or_followup": ai_feedback}, **fields))
     }
+
+
+def _sse(payload):
+    return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n".encode("utf-8")
+
+
+@metrics.handler('aiInterviewBot')
+def stream_handler(event, context):
+    """스트리밍 모드: SSE 바이트 조각을 yield 하는 생성기 핸들러.
+
+    관리형 런타임은 생성기 핸들러를 스트리밍하지 못하므로 배포 시에는 aiInterviewBotStream(Lambda Web Adapter
+    뒤의 HTTP 서버, 함수 URL InvokeMode=RESPONSE_STREAM)을 통해 호출합니다.
+    - 피드백 조각: data: {"delta": "..."}
+    - 마지막 이벤트: data: {"done": true, ...lambda_handler와 같은 응답 필드}
+    - 스트림 종료: data: [DONE]
+    """
+    api_key, body, error_response = _parse_request(event)
+    if error_response:
+        yield _sse({"done": True, "statusCode": error_response["statusCode"],
+                    "error": json.loads(error_response["body"])["error"]})
+        yield b"data: [DONE]\n\n"
+        return
+    try:
+        turn, body = _open_session(body)
+    except LookupError as e:
+        yield _sse({"done": True, "statusCode": 404, "error": str(e)})
+        yield b"data: [DONE]\n\n"
+        return
+
+    early_body, prompt, fields, cache_scope = plan_turn(body, turn.job_question_limit if turn else None)
+    if early_body is not None:
+        try:
+            yield _sse(dict({"done": True}, **early_body, **_commit_session(turn, body, early_body, None)))
+        except chatSession.SessionConflict as e:
+            yield _sse({"done": True, "statusCode": 409, "error": str(e)})
+        yield b"data: [DONE]\n\n"
+        return
+    if turn is not None and prompt:
+        prompt, cache_scope = _with_context(turn, prompt, cache_scope)
+
+    # 다음 질문은 AI 응답을 기다리지 않고 먼저 보낸다
+    yield _sse({"question": fields["question"]})
+
+    ai_feedback = _cached_feedback(cache_scope, body)
+    if ai_feedback is not None:
+        yield _sse({"delta": ai_feedback})
+    elif prompt:
+        def _open_stream():
+            stream = llmGateway.stream_openai(_messages(prompt), model=OPENAI_MODEL, temperature=0.6,
+                                              max_tokens=500, timeout=25, api_key=api_key, max_retries=1)
+            return stream, next(stream, None)
+
+        parts = []
+        try:
+            # 첫 조각이 최근 p95보다 늦으면 스트림을 하나 더 열어 먼저 응답한 쪽을 사용 (진 쪽은 닫음)
+            stream, first = stream_guard.call(_open_stream, discard=lambda opened: opened[0].close())
+            for delta in itertools.chain([first] if first else [], stream):
+                parts.append(delta)
+                yield _sse({"delta": delta})
+            ai_feedback = "".join(parts).strip()
+            if cache_scope:
+                feedbackCache.store(cache_scope, body.get("user_answer", ""), ai_feedback)
+        except llmResilience.CircuitOpenError:
+            print(f"[Warn] 피드백 생략 (회로 차단기 열림): {stream_guard.get_stats()}")
+        except Exception as e:
+            ai_feedback = "".join(parts).strip() or f"AI 호출 실패: {str(e)}"
+
+    try:
+        fields = dict(fields, **_commit_session(turn, body, fields, ai_feedback))
+    except chatSession.SessionConflict as e:
+        yield _sse({"done": True, "statusCode": 409, "error": str(e)})
+        yield b"data: [DONE]\n\n"
+        return
+    yield _sse(dict({"done": True, "feedback_or_followup": ai_feedback}, **fields))
+    yield b"data: [DONE]\n\n"
@@ -0,0 +1,76 @@
+import json
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import aiInterviewBot
+
+# aiInterviewBot 스트리밍 모드 배포용 HTTP 서버 (Lambda Web Adapter 뒤에서 실행)
+# 관리형 Python 런타임은 생성기 핸들러의 응답을 스트리밍하지 못하므로, Lambda Web Adapter(LWA)가
+# 함수 URL 요청을 이 서버로 넘기고 chunked 응답을 그대로 클라이언트에 흘려보낸다.
+# 요청 본문은 기존 aiInterviewBot과 같고, 응답은 stream_handler의 SSE 이벤트 (text/event-stream).
+#
+# 배포 설정 (스트리밍 함수를 버퍼링 함수와 별도로 하나 더 둠. API Gateway 통합은 기존 lambda_handler 그대로)
+#   런타임        : python3.12 (관리형), 코드 패키지는 기존 함수와 동일
+#   레이어        : arn:aws:lambda:<region>:753240598075:layer:LambdaAdapterLayerX86:<버전> (arm64는 ...Arm64)
+#   핸들러        : aiInterviewBotStream.sh  (이 서버를 띄우는 스크립트)
+#   환경 변수     : AWS_LAMBDA_EXEC_WRAPPER=/opt/bootstrap, AWS_LWA_INVOKE_MODE=response_stream,
+#                   PORT=8080, OPENAI_API_KEY (그 외 aiInterviewBot과 같은 설정)
+#   함수 URL      : InvokeMode=RESPONSE_STREAM (AuthType은 프론트엔드 인증 방식에 맞춤, CORS에 POST 허용)
+#   제한 시간     : 30초 이상 (피드백 호출 제한 25초 + 세션 저장)
+# LWA 준비 확인(GET /)에는 200으로 응답한다.
+
+STREAM_SERVER_PORT = int(os.environ.get('PORT', os.environ.get('AWS_LWA_PORT', '8080')))
+
+
+def _event(handler, body):
+    """HTTP 요청을 aiInterviewBot이 받는 API Gateway 형식 이벤트로 바꿉니다."""
+    return {
+        'httpMethod': handler.command,
+        'path': handler.path,
+        'headers': {name: value for name, value in handler.headers.items()},
+        'body': body.decode('utf-8') if body else None,
+    }
+
+
+class StreamRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"status": "ok"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        event = _event(self, self.rfile.read(length))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for chunk in aiInterviewBot.stream_handler(event, None):
+                self._write_chunk(chunk)
+        except Exception as e:
+            print(f"[Error] 스트리밍 응답 중 오류: {e}")
+            self._write_chunk(aiInterviewBot._sse({"done": True, "statusCode": 500, "error": str(e)}))
+        self._write_chunk(b"")  # chunked 종료
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass  # 요청마다 stderr 로그를 남기지 않음 (지표는 metrics.handler가 남김)
+
+
+def make_server(port=STREAM_SERVER_PORT, host='127.0.0.1'):
+    return ThreadingHTTPServer((host, port), StreamRequestHandler)
+
+
+if __name__ == "__main__":
+    server = make_server()
+    print(f"[Info] aiInterviewBot 스트리밍 서버 시작: 포트 {server.server_address[1]}")
+    server.serve_forever()
@@ -0,0 +1,3 @@
+#!/bin/sh
+# Lambda Web Adapter용 함수 핸들러: aiInterviewBot 스트리밍 서버를 띄움 (aiInterviewBotStream.py 참고)
+exec python3 "${LAMBDA_TASK_ROOT:-.}/aiInterviewBotStream.py"
@@ -1,25 +1,23 @@
 # lambda_function.py
 import json
-import boto3
 import os
 import uuid
+import attributeCodec
+import awsClients
+import batchRecords
+import jsonExtract
+import llmCache
+import llmGateway
+import metrics
+import postingExtractor
+import promptCompiler
 
-s3_client = boto3.client('s3')
-bedrock_runtime = boto3.client('bedrock-runtime', region_name='us-east-1') # Bedrock 사용 가능 리전
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table(os.environ['DYNAMODB_TABLE']) # 환경 변수에서 테이블 이름 가져오기
+# 클라이언트는 첫 사용 시점에 만들어지고 웜 인보크 사이에 재사용됨
+s3_client = awsClients.lazy_client('s3')
+table = awsClients.lazy_table(env_var='DYNAMODB_TABLE') # 환경 변수에서 테이블 이름 가져오기 (첫 사용 시)
 
-def lambda_handler(event, context):
-    # 1. S3 이벤트에서 버킷 이름과 파일 키(이름) 가져오기
-    bucket = event['Records'][0]['s3']['bucket']['name']
-    key = event['Records'][0]['s3']['object']['key']
-
-    # 2. S3에서 파일 내용 읽기 (단순 .txt 파일로 가정)
-    response = s3_client.get_object(Bucket=bucket, Key=key)
-    content = response['Body'].read().decode('utf-8')
-
-    # 3. Bedrock LLM에 보낼 프롬프트 구성
-    prompt = f"""
+# 공고 분석 프롬프트 (모듈 로드 시 한 번 공백 정규화, 호출당 입력 토큰 예산 적용)
+ANALYSIS_PROMPT = promptCompiler.PromptTemplate('job_posting_analysis', """
     Human: 다음 채용 공고 텍스트를 분석해서, 이 회사의 '인재상', '경영철학', 그리고 이 직무에 필요한 '핵심역량' 5가지를 추출해줘.
     결과는 반드시 아래와 같은 JSON 형식으로만 응답해줘. 다른 설명은 붙이지 마.
 
@@ -34,31 +32,62 @@ def lambda_handler(event, context):
     </job_posting>
 
     Assistant:
-    """
+    """, budget=int(os.environ.get('ANALYSIS_PROMPT_TOKEN_BUDGET', '8000')))
 
-    # 4. Bedrock API 호출 (Claude 모델 예시)
-    body = json.dumps({
-        "prompt": prompt,
-        "max_tokens_to_sample": 2000,
-        "temperature": 0.1,
-    })
+# LLM 분석 결과 JSON 스키마
+ANALYSIS_SCHEMA = {
+    'type': 'object',
+    'required': ['ideal_candidate', 'philosophy', 'core_competencies'],
+    'properties': {
+        'ideal_candidate': {'type': 'array'},
+        'philosophy': {'type': 'string'},
+        'core_competencies': {'type': 'array', 'minItems': 1},
+    }
+}
 
-    modelId = 'anthropic.claude-v2'
-    accept = 'application/json'
-    contentType = 'application/json'
+@metrics.handler('analyzeJobPostiong')
+def lambda_handler(event, context):
+    # 여러 레코드(S3 배치 알림, SQS 배치)는 모두 처리하고 실패한 항목만 보고
+    if batchRecords.is_batch_event(event):
+        return batchRecords.process_batch(event, analyze_posting)
 
-    response = bedrock_runtime.invoke_model(body=body, modelId=modelId, accept=accept, contentType=contentType)
-    response_body = json.loads(response.get('body').read())
+    # 1. S3 이벤트에서 버킷 이름과 파일 키(이름) 가져오기
+    bucket = event['Records'][0]['s3']['bucket']['name']
+    key = event['Records'][0]['s3']['object']['key']
+    return analyze_posting(bucket, key)
+
+def analyze_posting(bucket, key):
+    """채용 공고 파일 하나를 분석해 DynamoDB에 저장합니다."""
+    # 2. S3에서 파일 내용 읽기 (조각 단위로 읽으며 HTML/반복 문단/안내 문구를 걷어내고 관련 섹션만 남김)
+    response = s3_client.get_object(Bucket=bucket, Key=key)
+    with metrics.span('extract_posting'):
+        content, _ = postingExtractor.extract(response['Body'], content_type=response.get('ContentType'))
+
+    # 3. Bedrock LLM에 보낼 프롬프트 구성 (예산 초과 시 공고 본문 뒷부분부터 잘림)
+    prompt, _ = ANALYSIS_PROMPT.render(content=promptCompiler.section(content, priority=1))
 
-    # 5. LLM의 응답(JSON 텍스트)을 파싱
-    analysis_result = json.loads(response_body.get('completion'))
+    # 4. Bedrock API 호출 (Claude 모델 예시, 공용 게이트웨이 사용)
+    # 동일한 공고 텍스트는 캐시된 분석 결과를 재사용
+    result = llmGateway.invoke_bedrock(prompt, model_id='anthropic.claude-v2', max_tokens=2000,
+                                       temperature=0.1, region='us-east-1', # Bedrock 사용 가능 리전
+                                       use_cache=True)
+    if result['cached']:
+        print(f"[Info] 캐시된 분석 결과 사용: {llmCache.get_stats()}")
+
+    # 5. LLM의 응답에서 JSON을 추출 (추출 실패 시에만 복구 요청, 그래도 실패한 응답은 캐시에서 제거)
+    try:
+        analysis_result = jsonExtract.extract(result['text'], ANALYSIS_SCHEMA, name='job_posting_analysis',
+                                              repair=jsonExtract.bedrock_repairer(ANALYSIS_SCHEMA, region='us-east-1'))
+    except jsonExtract.JSONExtractionError:
+        llmCache.invalidate_for('anthropic.claude-v2', prompt, llmGateway.bedrock_cache_params(2000, 0.1))
+        raise
 
     # 6. DynamoDB에 저장
     job_posting_id = str(uuid.uuid4())
     item = {
         'job_posting_id': job_posting_id,
         'original_s3_key': key,
-        'analysis': analysis_result,
+        'analysis': attributeCodec.encode(analysis_result),  # 크면 압축 저장 (읽는 쪽은 attributeCodec.decode)
         'company_questions': [], # 기업 지정 질문을 위한 빈 리스트
         'generated_questions': [] # AI 생성 질문을 위한 빈 리스트
     }
@@ -68,3 +97,5 @@ def lambda_handler(event, context):
         'statusCode': 200,
         'body': json.dumps({'message': 'Analysis complete', 'job_posting_id': job_posting_id})
     }
+
+awsClients.prime_on_init()
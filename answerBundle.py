@@ -0,0 +1,109 @@
+import json
+import random
+import time
+
+# 세션별 답변 번들: interview-sessions/{session_id}/answers.bundle.jsonl
+# 1번째 줄은 색인 헤더, 이후 한 줄에 답변 하나 (JSON Lines).
+#   {"format": "answer-bundle", "version": 1, "count": 2, "index": ["q01", "q02"]}
+#   {"id": "q01", "key": "interview-sessions/.../q01_answer.txt", "answer": "..."}
+#   {"id": "q02", "key": "interview-sessions/.../q02_answer.txt", "answer": "...", "etag": "\"...\""}
+# "etag"는 번들에 넣을 때 읽은 답변 객체의 ETag (다시 올라온 답변인지 목록의 ETag와 비교하는 용도).
+# 답변은 원본 키 순서(= 기존 S3 목록 순서)로 정렬해 저장하므로 기존 방식과 같은 순서로 읽힌다.
+# 답변별 채점이 끝나면 해당 항목에 "partial_score"가 덧붙는다 (incrementalScoring).
+
+BUNDLE_FORMAT = 'answer-bundle'
+BUNDLE_VERSION = 1
+BUNDLE_FILENAME = 'answers.bundle.jsonl'
+ANSWER_SUFFIX = '_answer.txt'
+MAX_APPEND_ATTEMPTS = 8
+
+
+def bundle_key(session_id):
+    return f"interview-sessions/{session_id}/{BUNDLE_FILENAME}"
+
+
+def question_id_from_key(key):
+    return key.split('/')[-1].replace(ANSWER_SUFFIX, '')
+
+
+def encode(entries):
+    """답변 목록을 번들 바이트로 만듭니다."""
+    entries = sorted(entries, key=lambda e: e['key'])
+    header = {'format': BUNDLE_FORMAT, 'version': BUNDLE_VERSION, 'count': len(entries),
+              'index': [e['id'] for e in entries]}
+    lines = [json.dumps(header, ensure_ascii=False)] + [json.dumps(e, ensure_ascii=False) for e in entries]
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def decode(data):
+    """번들 바이트를 (header, entries)로 읽습니다."""
+    lines = data.decode('utf-8').splitlines()
+    header = json.loads(lines[0])
+    if header.get('format') != BUNDLE_FORMAT:
+        raise ValueError("답변 번들 형식이 아닙니다.")
+    if header.get('version', 0) > BUNDLE_VERSION:
+        raise ValueError(f"지원하지 않는 답변 번들 버전: {header.get('version')}")
+    entries = [json.loads(line) for line in lines[1:] if line.strip()]
+    return header, entries
+
+
+def _error_code(e):
+    return getattr(e, 'response', {}).get('Error', {}).get('Code')
+
+
+def read(s3_client, bucket, session_id):
+    """번들을 GET 한 번으로 읽습니다. 없으면 (None, None)."""
+    try:
+        response = s3_client.get_object(Bucket=bucket, Key=bundle_key(session_id))
+    except Exception as e:
+        if _error_code(e) in ('NoSuchKey', '404'):
+            return None, None
+        raise
+    header, entries = decode(response['Body'].read())
+    return entries, response.get('ETag')
+
+
+def _update(s3_client, bucket, session_id, mutate):
+    """번들을 읽어 mutate(entries)로 바꾼 뒤 조건부로 씁니다. mutate가 None을 반환하면 쓰지 않습니다.
+
+    S3 조건부 쓰기(IfMatch / IfNoneMatch)로 동시에 올라온 답변끼리 덮어쓰지 않도록 하고,
+    충돌하면 다시 읽어서 재시도합니다. 쓴 답변 수(쓰지 않았으면 None)를 반환합니다.
+    """
+    for attempt in range(MAX_APPEND_ATTEMPTS):
+        entries, etag = read(s3_client, bucket, session_id)
+        entries = mutate(entries or [])
+        if entries is None:
+            return None
+        condition = {'IfMatch': etag} if etag else {'IfNoneMatch': '*'}
+        try:
+            s3_client.put_object(Bucket=bucket, Key=bundle_key(session_id), Body=encode(entries),
+                                 ContentType='application/x-ndjson', **condition)
+            return len(entries)
+        except Exception as e:
+            if _error_code(e) not in ('PreconditionFailed', 'ConditionalRequestConflict', '412', '409'):
+                raise
+            time.sleep(random.uniform(0, 0.05 * (2 ** attempt)))
+    raise RuntimeError(f"답변 번들 갱신 충돌이 계속됩니다: {bundle_key(session_id)}")
+
+
+def append(s3_client, bucket, session_id, answer_key, answer_text, etag=None):
+    """답변 하나를 번들에 추가합니다 (같은 키가 있으면 교체). etag: 읽은 답변 객체의 ETag."""
+    entry = {'id': question_id_from_key(answer_key), 'key': answer_key, 'answer': answer_text}
+    if etag:
+        entry['etag'] = etag
+    return _update(s3_client, bucket, session_id,
+                   lambda entries: [e for e in entries if e['key'] != answer_key] + [entry])
+
+
+def annotate(s3_client, bucket, session_id, answer_key, answer_text, **fields):
+    """번들의 답변 항목에 fields(부분 채점 결과 등)를 덧붙입니다.
+
+    그 사이 같은 질문의 답변이 다시 올라와 내용이 바뀌었으면 덧붙이지 않고 False를 반환합니다.
+    """
+    def _mutate(entries):
+        for entry in entries:
+            if entry['key'] == answer_key and entry['answer'] == answer_text:
+                entry.update(fields)
+                return entries
+        return None
+    return _update(s3_client, bucket, session_id, _mutate) is not None
@@ -0,0 +1,124 @@
+import json
+import os
+import threading
+import zlib
+from decimal import Decimal
+
+try:
+    import zstandard
+except ImportError:  # zstandard가 없는 배포에서는 zlib만 사용 (읽기는 zstd로 저장된 값만 실패)
+    zstandard = None
+
+# 큰 DynamoDB 속성(질문/답변 목록, 공고 분석 결과) 압축 저장
+# - 속성 값을 JSON으로 직렬화했을 때 ATTRIBUTE_CODEC_THRESHOLD_BYTES 이상이고 압축해서 작아질 때만
+#   Binary 속성으로 바꿔 저장한다 (작은 값은 그대로 맵/리스트로 남아 콘솔/쿼리에서 그대로 보임)
+# - Binary 값 형식: MAGIC(2바이트) + 형식 버전(1바이트) + 코덱 ID(1바이트) + 압축된 JSON
+#   → 읽는 쪽은 MAGIC으로 압축 여부를 판단하므로 압축 전/후 항목이 섞여 있어도 그대로 읽힌다
+# - 기존 항목은 migrateAttributeCodec 핸들러로 다시 쓴다
+
+ATTRIBUTE_CODEC_ENABLED = os.environ.get('ATTRIBUTE_CODEC_ENABLED', '1') == '1'
+ATTRIBUTE_CODEC_THRESHOLD_BYTES = int(os.environ.get('ATTRIBUTE_CODEC_THRESHOLD_BYTES', '1024'))  # WCU 1KB 단위
+ATTRIBUTE_CODEC = os.environ.get('ATTRIBUTE_CODEC', 'zlib')  # zlib | zstd (zstandard 설치 시)
+ATTRIBUTE_CODEC_LEVEL = int(os.environ.get('ATTRIBUTE_CODEC_LEVEL', '6'))
+
+MAGIC = b'\xacC'
+FORMAT_VERSION = 1
+CODEC_IDS = {'zlib': 1, 'zstd': 2}
+
+_lock = threading.Lock()
+_stats = {'encoded': 0, 'skipped': 0, 'decoded': 0, 'raw_bytes': 0, 'stored_bytes': 0}
+
+
+def _count(**amounts):
+    with _lock:
+        for name, amount in amounts.items():
+            _stats[name] += amount
+
+
+def json_default(value):
+    """json.dumps default: DynamoDB에서 읽은 숫자(Decimal)는 정수면 int, 소수면 float로 (87.5가 87로 잘리지 않게), set은 목록으로."""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f"JSON으로 직렬화할 수 없는 형식: {type(value)}")
+
+
+def _codec():
+    if ATTRIBUTE_CODEC == 'zstd' and zstandard is None:
+        print("[Warn] zstandard 모듈이 없어 zlib으로 압축합니다.")
+        return 'zlib'
+    return ATTRIBUTE_CODEC if ATTRIBUTE_CODEC in CODEC_IDS else 'zlib'
+
+
+def _compress(codec, data):
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=ATTRIBUTE_CODEC_LEVEL).compress(data)
+    return zlib.compress(data, ATTRIBUTE_CODEC_LEVEL)
+
+
+def _decompress(codec_id, data):
+    if codec_id == CODEC_IDS['zstd']:
+        if zstandard is None:
+            raise ValueError("zstd로 압축된 속성이지만 zstandard 모듈이 없습니다.")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec_id == CODEC_IDS['zlib']:
+        return zlib.decompress(data)
+    raise ValueError(f"알 수 없는 코덱 ID: {codec_id}")
+
+
+def _raw(value):
+    return getattr(value, 'value', value)  # boto3는 Binary로 감싸서 반환
+
+
+def is_encoded(value):
+    raw = _raw(value)
+    return isinstance(raw, (bytes, bytearray)) and bytes(raw[:2]) == MAGIC
+
+
+def encode(value, threshold=None):
+    """큰 값이면 압축한 bytes를, 아니면 값을 그대로 반환합니다."""
+    threshold = ATTRIBUTE_CODEC_THRESHOLD_BYTES if threshold is None else threshold
+    if not ATTRIBUTE_CODEC_ENABLED or value is None or isinstance(value, (bytes, bytearray)) or is_encoded(value):
+        return value
+    data = json.dumps(value, ensure_ascii=False, separators=(',', ':'), default=json_default).encode('utf-8')
+    if len(data) < threshold:
+        _count(skipped=1)
+        return value
+    codec = _codec()
+    encoded = MAGIC + bytes([FORMAT_VERSION, CODEC_IDS[codec]]) + _compress(codec, data)
+    if len(encoded) >= len(data):
+        _count(skipped=1)
+        return value
+    _count(encoded=1, raw_bytes=len(data), stored_bytes=len(encoded))
+    return encoded
+
+
+def decode(value):
+    """압축된 값이면 풀어서, 아니면 그대로 반환합니다."""
+    if not is_encoded(value):
+        return value
+    raw = bytes(_raw(value))
+    version, codec_id = raw[2], raw[3]
+    if version != FORMAT_VERSION:
+        raise ValueError(f"지원하지 않는 속성 압축 형식 버전: {version}")
+    _count(decoded=1)
+    # boto3 리소스가 float를 받지 않으므로 소수는 Decimal로 복원
+    return json.loads(_decompress(codec_id, raw[4:]).decode('utf-8'), parse_float=Decimal)
+
+
+def encode_item(item, fields):
+    """item에서 fields에 해당하는 속성만 encode한 사본을 반환합니다."""
+    return {name: encode(value) if name in fields else value for name, value in item.items()}
+
+
+def decode_item(item, fields=None):
+    """item의 압축된 속성(fields가 있으면 그 속성만)을 풀어 사본으로 반환합니다."""
+    if item is None:
+        return None
+    return {name: decode(value) if fields is None or name in fields else value for name, value in item.items()}
+
+
+def get_stats():
+    with _lock:
+        return dict(_stats)
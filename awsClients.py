@@ -0,0 +1,167 @@
+import json
+import os
+import threading
+import metrics
+
+# boto3는 import 자체가 무거우므로 실제로 클라이언트가 필요할 때 불러온다.
+
+# --- 기본 설정 ---
+# 1이면 모듈 초기화(init) 단계에서 등록된 클라이언트를 미리 만들어 둔다 (프로비저닝된 동시성용)
+PRIME_CONNECTIONS_ON_INIT = os.environ.get('PRIME_CONNECTIONS_ON_INIT', '0') == '1'
+
+_lock = threading.RLock()
+_instances = {}   # (종류, 서비스/테이블, 리전, 설정) -> boto3 객체, 웜 인보크 사이에서 재사용
+_registered = []  # lazy_* 로 만든 프록시 목록 (prime 대상)
+_override = None  # (종류, 서비스/테이블, 리전) -> 대역 객체 또는 None, 로컬 하네스용
+
+
+def _key(kind, name, region_name, config):
+    return (kind, name, region_name, json.dumps(config, sort_keys=True) if config else None)
+
+
+def _memoize(key, factory):
+    instance = _instances.get(key)
+    if instance is None:
+        with _lock:
+            instance = _instances.get(key)
+            if instance is None:
+                instance = _override(*key[:3]) if _override else None
+                if instance is None:
+                    instance = factory()
+                _instances[key] = instance
+    return instance
+
+
+def get_client(service, region_name=None, config=None):
+    """boto3 클라이언트를 한 번만 만들어 재사용합니다. config는 botocore Config 인자 dict."""
+    def _create():
+        import boto3
+        from botocore.config import Config
+        kwargs = {}
+        if region_name:
+            kwargs['region_name'] = region_name
+        if config:
+            kwargs['config'] = Config(**config)
+        return metrics.instrument_client(boto3.client(service, **kwargs))
+    return _memoize(_key('client', service, region_name, config), _create)
+
+
+def get_resource(service, region_name=None):
+    def _create():
+        import boto3
+        resource = boto3.resource(service, region_name=region_name) if region_name else boto3.resource(service)
+        metrics.instrument_client(resource.meta.client)
+        return resource
+    return _memoize(_key('resource', service, region_name, None), _create)
+
+
+def get_table(table_name, region_name=None):
+    return _memoize(_key('table', table_name, region_name, None),
+                    lambda: get_resource('dynamodb', region_name).Table(table_name))
+
+
+class LazyProxy:
+    """첫 속성 접근 시점에 실제 객체를 만드는 프록시. 기존 코드의 s3_client.get_object(...) 형태를 그대로 쓴다."""
+
+    def __init__(self, factory, description):
+        self._factory = factory
+        self._description = description
+        self._instance = None
+
+    def _get(self):
+        if self._instance is None:
+            self._instance = self._factory()
+        return self._instance
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+
+    def __repr__(self):
+        state = 'ready' if self._instance is not None else 'lazy'
+        return f"<LazyProxy {self._description} ({state})>"
+
+
+def _register(proxy):
+    with _lock:
+        _registered.append(proxy)
+    return proxy
+
+
+def lazy_client(service, region_name=None, config=None):
+    return _register(LazyProxy(lambda: get_client(service, region_name, config), f"client:{service}"))
+
+
+def lazy_table(table_name=None, env_var=None, region_name=None):
+    """DynamoDB Table 프록시. env_var를 주면 테이블 이름도 첫 사용 시점에 환경 변수에서 읽는다."""
+    def _create():
+        return get_table(table_name or os.environ[env_var], region_name)
+    return _register(LazyProxy(_create, f"table:{table_name or '$' + str(env_var)}"))
+
+
+def open_connection(client):
+    """클라이언트 엔드포인트로 TCP/TLS 연결을 하나 열어 커넥션 풀에 넣어 둡니다. 열었으면 True.
+
+    botocore 내부 속성(_endpoint, http_session)을 쓰므로 형태가 다르면(로컬 하네스 대역 등) 아무것도 하지 않는다.
+    S3 가상 호스트 방식 요청은 버킷별 호스트(<bucket>.s3...)로 가므로 여기서 연 연결은 경로 방식/다른 서비스에만 재사용된다.
+    """
+    endpoint = getattr(client, '_endpoint', None)
+    http_session = getattr(endpoint, 'http_session', None)
+    if endpoint is None or not hasattr(http_session, '_get_connection_manager'):
+        return False
+    pool = http_session._get_connection_manager(endpoint.host).connection_from_url(endpoint.host)
+    connection = pool._get_conn()
+    try:
+        connection.connect()
+    except Exception:
+        connection.close()
+        raise
+    finally:
+        pool._put_conn(connection)
+    return True
+
+
+def prime():
+    """등록된 클라이언트/테이블을 모두 만들고 자격 증명 해석과 엔드포인트 연결까지 미리 해 둡니다."""
+    with _lock:
+        proxies = list(_registered)
+    opened = 0
+    connected = set()  # 같은 클라이언트를 쓰는 프록시가 여럿이면 연결은 한 번만
+    for proxy in proxies:
+        try:
+            instance = proxy._get()
+            client = getattr(getattr(instance, 'meta', None), 'client', instance)  # resource/Table -> client
+            credentials = getattr(getattr(client, '_request_signer', None), '_credentials', None)
+            if credentials is not None:
+                credentials.get_frozen_credentials()
+            if id(client) not in connected:
+                connected.add(id(client))
+                opened += open_connection(client)
+        except Exception as e:
+            print(f"[Warn] 클라이언트 미리 준비 실패 ({proxy!r}): {e}")
+    print(f"[Info] 클라이언트 미리 준비: {len(proxies)}개, 연결 {opened}개")
+    return len(proxies)
+
+
+def prime_on_init():
+    """모듈 마지막에서 호출. 프로비저닝된 동시성 초기화이거나 PRIME_CONNECTIONS_ON_INIT=1 일 때만 prime()."""
+    if PRIME_CONNECTIONS_ON_INIT or os.environ.get('AWS_LAMBDA_INITIALIZATION_TYPE') == 'provisioned-concurrency':
+        prime()
+
+
+def set_override(factory):
+    """factory(kind, name, region_name)가 돌려준 객체를 실제 boto3 객체 대신 씁니다 (None이면 해제).
+
+    kind는 'client' / 'resource' / 'table'. factory가 None을 돌려주면 실제 객체를 만듭니다.
+    """
+    global _override
+    with _lock:
+        _override = factory
+    reset()
+
+
+def reset():
+    """메모이즈된 객체를 모두 버립니다 (벤치마크/로컬 하네스용)."""
+    with _lock:
+        _instances.clear()
+        for proxy in _registered:
+            proxy._instance = None
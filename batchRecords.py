@@ -0,0 +1,73 @@
+import json
+import os
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+# --- 기본 설정 ---
+BATCH_MAX_WORKERS = max(1, int(os.environ.get('BATCH_MAX_WORKERS', '4')))  # 배치 내 동시 처리 개수
+
+
+def is_batch_event(event):
+    """레코드가 여러 개이거나 SQS에서 온 이벤트면 배치 모드로 처리합니다."""
+    records = event.get('Records') or []
+    return len(records) > 1 or any(r.get('eventSource') == 'aws:sqs' for r in records)
+
+
+def s3_objects_from_record(record):
+    """레코드 하나에서 (bucket, key) 목록을 꺼냅니다.
+
+    - S3 이벤트 레코드: 그대로 사용
+    - SQS 레코드: body의 S3 알림(SNS로 한 번 감싼 경우 포함)을 풀어서 사용
+    """
+    if record.get('eventSource') == 'aws:sqs':
+        body = json.loads(record.get('body') or '{}')
+        if 'Message' in body and 'Records' not in body:  # SNS -> SQS 구독
+            body = json.loads(body['Message'])
+        if body.get('Event') == 's3:TestEvent':
+            return []
+        records = body.get('Records', [])
+    else:
+        records = [record]
+    return [
+        (r['s3']['bucket']['name'], urllib.parse.unquote_plus(r['s3']['object']['key'], encoding='utf-8'))
+        for r in records
+    ]
+
+
+def _item_identifier(record, index):
+    # SQS는 messageId로 재시도 대상을 식별, 직접 S3 이벤트는 객체 키로 표시만 함
+    if record.get('messageId'):
+        return record['messageId']
+    try:
+        return record['s3']['object']['key']
+    except (KeyError, TypeError):
+        return str(index)
+
+
+def _process_record(record, handle_object):
+    for bucket, key in s3_objects_from_record(record):
+        response = handle_object(bucket, key)
+        status = (response or {}).get('statusCode', 200)
+        if status >= 400:
+            raise RuntimeError(f"{bucket}/{key} 처리 실패 ({status}): {response.get('body')}")
+
+
+def process_batch(event, handle_object, max_workers=BATCH_MAX_WORKERS):
+    """배치의 모든 레코드를 동시에 처리하고 실패한 항목만 batchItemFailures로 반환합니다.
+
+    handle_object(bucket, key)는 Lambda 응답 형식의 dict를 반환하며,
+    statusCode가 400 이상이거나 예외가 발생하면 해당 레코드를 실패로 봅니다.
+    """
+    records = event.get('Records') or []
+    failures = []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(records)))) as executor:
+        futures = [executor.submit(_process_record, record, handle_object) for record in records]
+        for index, (record, future) in enumerate(zip(records, futures)):
+            try:
+                future.result()
+            except Exception as e:
+                identifier = _item_identifier(record, index)
+                print(f"[Error] 배치 레코드 처리 실패 ({identifier}): {e}")
+                failures.append({'itemIdentifier': identifier})
+    print(f"[Info] 배치 처리 완료: 전체 {len(records)}건, 실패 {len(failures)}건")
+    return {'batchItemFailures': failures}
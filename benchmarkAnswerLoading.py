@@ -0,0 +1,79 @@
+import argparse
+import importlib
+import io
+import random
+import threading
+import time
+
+# calculate-scores.py 는 파일명에 '-'가 있어 일반 import 문으로 불러올 수 없음
+calculate_scores = importlib.import_module('calculate-scores')
+
+
+class LatencyS3Stub:
+    """get_object 마다 지연을 주입하는 S3 클라이언트 대역 (list_objects_v2, get_object만 지원)."""
+
+    def __init__(self, session_id, answer_count, latency_ms=80, jitter_ms=40, fail_every=0):
+        self.session_id = session_id
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.objects = {}
+        for i in range(1, answer_count + 1):
+            key = f"interview-sessions/{session_id}/q{i:02d}_answer.txt"
+            self.objects[key] = f"질문 {i}에 대한 답변입니다.".encode('utf-8')
+        self.fail_keys = set()
+        if fail_every:
+            self.fail_keys = set(sorted(self.objects)[fail_every - 1::fail_every])
+        self.get_count = 0
+        self._lock = threading.Lock()
+
+    def get_paginator(self, operation_name):
+        assert operation_name == 'list_objects_v2'
+        return self
+
+    def paginate(self, Bucket, Prefix):
+        keys = sorted(k for k in self.objects if k.startswith(Prefix))
+        # 실제 S3처럼 1000개 단위 페이지로 나눔
+        for start in range(0, max(len(keys), 1), 1000):
+            yield {'Contents': [{'Key': k} for k in keys[start:start + 1000]]}
+
+    def get_object(self, Bucket, Key):
+        with self._lock:
+            self.get_count += 1
+        time.sleep((self.latency_ms + random.uniform(0, self.jitter_ms)) / 1000.0)
+        if Key in self.fail_keys:
+            raise RuntimeError(f"injected failure: {Key}")
+        return {'Body': io.BytesIO(self.objects[Key])}
+
+
+def run(answer_count, latency_ms, jitter_ms, fail_every, concurrency_levels, repeat):
+    session_id = 'bench-session'
+    print(f"answers={answer_count} latency={latency_ms}ms(+0~{jitter_ms}ms) fail_every={fail_every}")
+    baseline = None
+    for workers in concurrency_levels:
+        stub = LatencyS3Stub(session_id, answer_count, latency_ms, jitter_ms, fail_every)
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            keys = calculate_scores.list_answer_keys('bench-bucket', session_id, client=stub)
+            answers, failures = calculate_scores.fetch_answers('bench-bucket', keys, max_workers=workers, client=stub)
+            timings.append(time.perf_counter() - started)
+            # 순서가 목록 순서와 같은지 확인
+            loaded_ids = [a['id'] for a in answers]
+            expected_ids = [k.split('/')[-1].replace('_answer.txt', '') for k in keys if k not in stub.fail_keys]
+            assert loaded_ids == expected_ids, "답변 순서가 목록 순서와 다릅니다."
+        best = min(timings)
+        baseline = baseline or best
+        print(f"  workers={workers:>3}  best={best * 1000:8.1f}ms  speedup={baseline / best:5.2f}x  "
+              f"loaded={len(answers)} failed={len(failures)}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='calculate-scores 답변 로드 벤치마크 (지연 주입 S3 대역 사용)')
+    parser.add_argument('--answers', type=int, default=30)
+    parser.add_argument('--latency-ms', type=int, default=80)
+    parser.add_argument('--jitter-ms', type=int, default=40)
+    parser.add_argument('--fail-every', type=int, default=0, help='N번째 객체마다 실패를 주입 (0이면 없음)')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8, 16])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    run(args.answers, args.latency_ms, args.jitter_ms, args.fail_every, args.workers, args.repeat)
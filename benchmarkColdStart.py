@@ -0,0 +1,88 @@
+import argparse
+import glob
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# 새 인터프리터(= 콜드 스타트)에서 실행되는 측정 코드
+PROBE = r"""
+import importlib, json, sys, time
+started = time.perf_counter()
+module = importlib.import_module(sys.argv[1])
+imported = time.perf_counter()
+import awsClients
+clients = awsClients.prime()
+primed = time.perf_counter()
+result = {'import_ms': (imported - started) * 1000, 'first_clients_ms': (primed - imported) * 1000, 'clients': clients}
+if sys.argv[2]:
+    with open(sys.argv[2], encoding='utf-8') as f:
+        event = json.load(f)
+    t0 = time.perf_counter()
+    try:
+        module.lambda_handler(event, None)
+        result['invoke_ok'] = True
+    except Exception as e:
+        result['invoke_ok'] = False
+        result['invoke_error'] = repr(e)[:200]
+    t1 = time.perf_counter()
+    try:
+        module.lambda_handler(event, None)
+    except Exception:
+        pass
+    t2 = time.perf_counter()
+    result['first_invoke_ms'] = (t1 - t0) * 1000
+    result['warm_invoke_ms'] = (t2 - t1) * 1000
+print(json.dumps(result))
+"""
+
+
+def handler_modules():
+    """lambda_handler를 가진 모듈 이름 목록."""
+    names = []
+    for path in sorted(glob.glob(os.path.join(HERE, '*.py'))):
+        with open(path, encoding='utf-8') as f:
+            if re.search(r'^def lambda_handler\(', f.read(), re.M):
+                names.append(os.path.splitext(os.path.basename(path))[0])
+    return names
+
+
+def measure(module_name, event_path, primed):
+    env = dict(os.environ)
+    env.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+    env.setdefault('DYNAMODB_TABLE', 'AI_Interview_Data')  # 테이블 이름을 환경 변수에서 읽는 핸들러용
+    env['PRIME_CONNECTIONS_ON_INIT'] = '1' if primed else '0'
+    output = subprocess.run([sys.executable, '-c', PROBE, module_name, event_path or ''], cwd=HERE, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(modules, event_dir, repeat):
+    header = f"{'handler':<28}{'mode':<8}{'import':>10}{'1st clients':>13}{'1st invoke':>12}{'warm':>10}"
+    print(header)
+    print('-' * len(header))
+    for name in modules:
+        event_path = os.path.join(event_dir, f"{name}.json") if event_dir else None
+        if event_path and not os.path.exists(event_path):
+            event_path = None
+        for primed in (False, True):
+            samples = [measure(name, event_path, primed) for _ in range(repeat)]
+            med = lambda field: statistics.median(s[field] for s in samples) if field in samples[0] else None
+            fmt = lambda v: f"{v:8.1f}ms" if v is not None else f"{'-':>10}"
+            print(f"{name:<28}{'primed' if primed else 'lazy':<8}{fmt(med('import_ms')):>10}"
+                  f"{fmt(med('first_clients_ms')):>13}{fmt(med('first_invoke_ms')):>12}{fmt(med('warm_invoke_ms')):>10}")
+            if event_path and not samples[0].get('invoke_ok', True):
+                print(f"    invoke error: {samples[0]['invoke_error']}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='핸들러별 import 시간과 첫 호출 시간 측정 (핸들러마다 새 프로세스)')
+    parser.add_argument('modules', nargs='*', help='측정할 모듈 (기본: lambda_handler가 있는 모든 모듈)')
+    parser.add_argument('--event-dir', help='<모듈명>.json 이벤트가 있으면 첫 호출/웜 호출 시간도 측정')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    run(args.modules or handler_modules(), args.event_dir, args.repeat)
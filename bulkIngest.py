@@ -0,0 +1,229 @@
+import hashlib
+import importlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import awsClients
+import llmGateway
+import metrics
+import rateLimiter
+
+# 채용 공고/이력서 일괄 질문 생성
+# 파트너가 resumes/ 에 수백 개를 한꺼번에 올리면 객체마다 generate-custom-questions가 따로 실행되어
+# Bedrock 스로틀링이 몰린다. 이 핸들러는 매니페스트(또는 prefix 목록)를 받아 한 번에 처리한다.
+#   - 동시 처리: BULK_CONCURRENCY 개 스레드로 generate-custom-questions.process_object 호출
+#   - 쿼터 제한: 모든 Bedrock 호출이 RPM/TPM 쿼터에 맞춘 공유 토큰 버킷을 거침 (llmGateway.set_rate_limiter)
+#   - 체크포인트: bulk-ingest/<run_id>/checkpoint.json 에 진행 상황을 저장하고,
+#     같은 이벤트로 다시 호출하면 끝난 키는 건너뛰고 이어서 처리 (run_id는 입력에서 결정됨)
+#
+# 이벤트 예시
+#   {"bucket": "ai-interview-bucket", "manifest_key": "manifests/partner-a.json"}
+#       매니페스트: 키 배열, {"keys": [...]} 또는 줄 단위 텍스트
+#   {"bucket": "ai-interview-bucket", "prefixes": ["resumes/partner-a/", "job-postings/"]}
+#   선택: "run_id", "concurrency"
+
+# --- 기본 설정 ---
+BULK_CONCURRENCY = max(1, int(os.environ.get('BULK_CONCURRENCY', '8')))
+BEDROCK_RPM_QUOTA = int(os.environ.get('BEDROCK_RPM_QUOTA', '100'))        # 모델별 분당 요청 쿼터
+BEDROCK_TPM_QUOTA = int(os.environ.get('BEDROCK_TPM_QUOTA', '200000'))     # 모델별 분당 토큰 쿼터
+BULK_QUOTA_FRACTION = float(os.environ.get('BULK_QUOTA_FRACTION', '0.8'))  # 실시간 트래픽 몫을 남겨 둠
+BULK_CHECKPOINT_PREFIX = os.environ.get('BULK_CHECKPOINT_PREFIX', 'bulk-ingest/')
+BULK_CHECKPOINT_EVERY = max(1, int(os.environ.get('BULK_CHECKPOINT_EVERY', '10')))  # 완료 N건마다 저장
+BULK_TIME_MARGIN_MS = int(os.environ.get('BULK_TIME_MARGIN_MS', '60000'))  # 남은 시간이 이보다 적으면 새 작업을 시작하지 않음
+BULK_MAX_ATTEMPTS = int(os.environ.get('BULK_MAX_ATTEMPTS', '3'))  # 실패한 키를 다시 시도하는 최대 횟수 (실행 간 누적)
+BULK_AUTO_CONTINUE = os.environ.get('BULK_AUTO_CONTINUE', '0') == '1'  # 미완료 시 같은 이벤트로 자신을 비동기 재호출
+INGEST_PREFIXES = ('job-postings/', 'resumes/')
+# ---
+
+s3_client = awsClients.lazy_client('s3', config={'max_pool_connections': max(10, BULK_CONCURRENCY)})
+
+# 웜 인보크 사이에 유지 (버킷 잔량이 다음 실행으로 이어짐)
+_limiter = None
+_generator = None
+
+
+def get_limiter():
+    global _limiter
+    if _limiter is None:
+        _limiter = rateLimiter.QuotaLimiter(max(1, int(BEDROCK_RPM_QUOTA * BULK_QUOTA_FRACTION)),
+                                            max(1, int(BEDROCK_TPM_QUOTA * BULK_QUOTA_FRACTION)))
+    return _limiter
+
+
+def get_generator():
+    """질문 생성 모듈 (파일 이름에 '-'가 있어 importlib으로 불러옴)."""
+    global _generator
+    if _generator is None:
+        _generator = importlib.import_module('generate-custom-questions')
+    return _generator
+
+
+def is_ingestible(key):
+    return key.startswith(INGEST_PREFIXES) and key.endswith('.json')
+
+
+# --- 대상 키 목록 ---
+def read_manifest(bucket, manifest_key):
+    body = s3_client.get_object(Bucket=bucket, Key=manifest_key)['Body'].read().decode('utf-8')
+    try:
+        data = json.loads(body)
+    except json.JSONDecodeError:
+        return [line.strip() for line in body.splitlines() if line.strip()]
+    return data.get('keys', []) if isinstance(data, dict) else data
+
+
+def list_prefixes(bucket, prefixes):
+    keys = []
+    paginator = s3_client.get_paginator('list_objects_v2')
+    for prefix in prefixes:
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            keys.extend(obj['Key'] for obj in page.get('Contents', []))
+    return keys
+
+
+def resolve_keys(bucket, manifest_key=None, prefixes=None):
+    """처리할 키 목록 (중복 제거, 순서 유지, 처리 대상만)."""
+    keys = read_manifest(bucket, manifest_key) if manifest_key else list_prefixes(bucket, prefixes or [])
+    return [key for key in dict.fromkeys(keys) if is_ingestible(key)]
+
+
+def make_run_id(bucket, manifest_key=None, prefixes=None):
+    source = json.dumps({'bucket': bucket, 'manifest_key': manifest_key, 'prefixes': sorted(prefixes or [])})
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()[:16]
+
+
+# --- 체크포인트 ---
+def checkpoint_key(run_id):
+    return f"{BULK_CHECKPOINT_PREFIX}{run_id}/checkpoint.json"
+
+
+def load_checkpoint(bucket, run_id):
+    from botocore.exceptions import ClientError
+    try:
+        response = s3_client.get_object(Bucket=bucket, Key=checkpoint_key(run_id))
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') in ('NoSuchKey', '404'):
+            return None
+        raise
+    return json.loads(response['Body'].read().decode('utf-8'))
+
+
+def save_checkpoint(bucket, checkpoint):
+    checkpoint['updated_at'] = int(time.time())
+    s3_client.put_object(Bucket=bucket, Key=checkpoint_key(checkpoint['run_id']),
+                         Body=json.dumps(checkpoint, ensure_ascii=False), ContentType='application/json')
+
+
+def pending_keys(checkpoint):
+    done = set(checkpoint['done'])
+    failed = checkpoint['failed']
+    return [key for key in checkpoint['keys']
+            if key not in done and failed.get(key, {}).get('attempts', 0) < BULK_MAX_ATTEMPTS]
+
+
+# --- 처리 ---
+def process_key(bucket, key):
+    """키 하나로 질문을 생성합니다. 실패하면 예외를 발생시킵니다."""
+    response = get_generator().process_object(bucket, key) or {}
+    if response.get('statusCode', 200) >= 400:
+        raise RuntimeError(f"처리 실패 ({response.get('statusCode')}): {response.get('body')}")
+    if not response.get('outputKey'):
+        raise RuntimeError("질문 생성 결과 없음")
+    return response['outputKey']
+
+
+def run(bucket, checkpoint, context=None, concurrency=BULK_CONCURRENCY):
+    """남은 키를 동시에 처리하고 체크포인트를 갱신합니다. 시간이 부족하면 새 작업을 멈춥니다."""
+    queue = pending_keys(checkpoint)
+    in_flight = {}
+    completed_since_save = 0
+
+    # 제한 시간이 짧게 설정된 함수에서도 일할 시간이 남도록 여유 시간은 전체의 1/4을 넘지 않게 함
+    margin_ms = min(BULK_TIME_MARGIN_MS, context.get_remaining_time_in_millis() // 4) if context else 0
+
+    def has_time():
+        return context is None or context.get_remaining_time_in_millis() > margin_ms
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        while queue or in_flight:
+            while queue and len(in_flight) < concurrency and has_time():
+                key = queue.pop(0)
+                in_flight[executor.submit(process_key, bucket, key)] = key
+            if not in_flight:
+                break  # 시간 부족: 남은 키는 다음 실행에서 처리
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                key = in_flight.pop(future)
+                try:
+                    future.result()
+                    checkpoint['done'].append(key)
+                    checkpoint['failed'].pop(key, None)
+                except Exception as e:
+                    entry = checkpoint['failed'].setdefault(key, {'attempts': 0})
+                    entry['attempts'] += 1
+                    entry['error'] = str(e)
+                    print(f"[Error] 일괄 처리 실패 ({entry['attempts']}/{BULK_MAX_ATTEMPTS}): {key} - {e}")
+                completed_since_save += 1
+            if completed_since_save >= BULK_CHECKPOINT_EVERY:
+                save_checkpoint(bucket, checkpoint)
+                completed_since_save = 0
+    save_checkpoint(bucket, checkpoint)
+    return checkpoint
+
+
+def _continue(event, context):
+    """남은 작업을 같은 이벤트로 이어서 처리하도록 자신을 비동기 호출합니다."""
+    awsClients.get_client('lambda').invoke(FunctionName=context.invoked_function_arn, InvocationType='Event',
+                                           Payload=json.dumps(event).encode('utf-8'))
+    print("[Info] 남은 작업을 위해 비동기 재호출")
+
+
+@metrics.handler('bulkIngest')
+def lambda_handler(event, context):
+    # 1. 입력 확인
+    bucket = event.get('bucket')
+    manifest_key = event.get('manifest_key')
+    prefixes = event.get('prefixes')
+    if not bucket or not (manifest_key or prefixes):
+        return {'statusCode': 400, 'body': json.dumps({'error': 'bucket과 manifest_key 또는 prefixes가 필요합니다.'})}
+    run_id = event.get('run_id') or make_run_id(bucket, manifest_key, prefixes)
+
+    # 2. 체크포인트 로드 (없으면 대상 키 목록을 만들어 새로 시작, 이후 실행은 같은 목록을 사용)
+    try:
+        checkpoint = load_checkpoint(bucket, run_id)
+        if checkpoint is None:
+            keys = resolve_keys(bucket, manifest_key, prefixes)
+            checkpoint = {'run_id': run_id, 'keys': keys, 'done': [], 'failed': {}}
+            print(f"[Info] 일괄 처리 시작: run_id={run_id}, {len(keys)}건")
+        else:
+            print(f"[Info] 일괄 처리 재개: run_id={run_id}, 완료 {len(checkpoint['done'])}/{len(checkpoint['keys'])}건")
+    except Exception as e:
+        print(f"[Error] 일괄 처리 준비 실패: {e}")
+        return {'statusCode': 500, 'body': json.dumps({'error': f'일괄 처리 준비 실패: {e}'})}
+
+    # 3. 공유 쿼터 제한기를 건 상태로 처리
+    limiter = get_limiter()
+    previous = llmGateway.set_rate_limiter(limiter)
+    try:
+        run(bucket, checkpoint, context, concurrency=max(1, int(event.get('concurrency', BULK_CONCURRENCY))))
+    finally:
+        llmGateway.set_rate_limiter(previous)
+
+    # 4. 결과
+    remaining = len(pending_keys(checkpoint))
+    summary = {
+        'run_id': run_id,
+        'status': 'incomplete' if remaining else 'complete',
+        'total': len(checkpoint['keys']),
+        'done': len(checkpoint['done']),
+        'failed': len([k for k, v in checkpoint['failed'].items() if v['attempts'] >= BULK_MAX_ATTEMPTS]),
+        'remaining': remaining,
+        'limiter': limiter.get_stats(),
+    }
+    print(f"[Info] 일괄 처리 결과: {summary}")
+    if remaining and BULK_AUTO_CONTINUE and context is not None:
+        _continue(dict(event, run_id=run_id), context)
+    return {'statusCode': 200, 'body': json.dumps(summary, ensure_ascii=False)}
+
+awsClients.prime_on_init()
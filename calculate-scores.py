@@ -1,28 +1,220 @@
-import boto3
 import json
 import os
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
+import answerBundle
+import awsClients
+import batchRecords
+import incrementalScoring
+import metrics
+import modelCascade
+import promptCompiler
+import scoreRanking
 
 # --- 1. 기본 설정 ---
 BEDROCK_REGION = "us-east-1"
-BEDROCK_MODEL_ID = "anthropic.claude-3-sonnet-20240229-v1:0"
+BEDROCK_MODEL_ID = os.environ.get('SCORING_MODEL_ID', "us.anthropic.claude-3-7-sonnet-20250219-v1:0")  # 프롬프트 캐시 지원 모델
 DYNAMODB_TABLE_NAME = "InterviewScores"
+# 답변 파일 동시 로드 개수 (1이면 기존처럼 순차 로드)
+ANSWER_FETCH_CONCURRENCY = max(1, int(os.environ.get('ANSWER_FETCH_CONCURRENCY', '8')))
+# 답변 로드 방식
+#   verify : 번들 GET 1회 + 목록 LIST로 번들에 아직 없거나 ETag가 달라진(다시 올라온) 답변만 추가로 GET (기본값)
+#   bundle : 번들 GET 1회만 사용 (번들이 없으면 기존 방식)
+#   legacy : 기존 방식 (LIST + 답변마다 GET)
+ANSWER_BUNDLE_MODE = os.environ.get('ANSWER_BUNDLE_MODE', 'verify')
 # ---
 
-# Boto3 클라이언트 및 리소스 초기화
-s3_client = boto3.client('s3')
-bedrock_runtime = boto3.client('bedrock-runtime', region_name=BEDROCK_REGION)
-dynamodb = boto3.resource('dynamodb', region_name=BEDROCK_REGION)
-score_table = dynamodb.Table(DYNAMODB_TABLE_NAME)
+# Boto3 클라이언트 및 리소스 (첫 사용 시점에 생성, 웜 인보크 사이에 재사용)
+# 스레드 풀이 하나의 S3 클라이언트를 공유하므로 커넥션 풀을 동시 로드 개수 이상으로 잡는다
+s3_client = awsClients.lazy_client('s3', config={'max_pool_connections': max(10, ANSWER_FETCH_CONCURRENCY)})
+score_table = awsClients.lazy_table(DYNAMODB_TABLE_NAME, region_name=BEDROCK_REGION)
 
+# 채점 프롬프트 (모듈 로드 시 한 번 공백 정규화, 호출당 입력 토큰 예산 적용)
+# 같은 jobId의 지원자들은 지시문 + 채용공고 기준 + 출력 형식이 똑같으므로 이 부분을 고정 접두부로 두고
+# 지원자 답변만 뒤에 붙인다. 지원 모델이면 접두부가 Bedrock 프롬프트 캐시에서 읽힌다
+# (모델별 최소 캐시 길이보다 짧은 접두부는 캐시되지 않음).
+SCORING_PROMPT_TOKEN_BUDGET = int(os.environ.get('SCORING_PROMPT_TOKEN_BUDGET', '60000'))
+SCORING_PREFIX = promptCompiler.PromptTemplate('scoring_prefix', """Human: 당신은 채용 공고와 지원자의 면접 답변을 분석하여 평가 점수를 매기는 전문 HR 평가자입니다.
+아래 <채용공고 기준>과 뒤에 이어지는 <지원자 답변>을 **엄격하게 비교**하여, 요청된 JSON 형식에 맞춰 **점수와 평가 의견**을 작성해야 합니다.
+**절대 다른 설명이나 대화 없이, 오직 요청된 JSON 구조만 출력해야 합니다.**
+
+<채용공고 기준>
+{criteria}
+</채용공고 기준>
+
+[출력 형식]
+**반드시 다음 JSON 형식에 맞춰 모든 필드를 채워서 응답하세요:**
+{{
+  "overall_score": "100점 만점 기준 총점 (숫자만 입력, 예: 85)",
+  "overall_comment": "채용 기준 대비 지원자 답변에 대한 1~2줄 요약 평가.",
+  "strengths": "채용 기준과 비교 시 지원자의 강점 1~2가지 요약.",
+  "weaknesses": "채용 기준과 비교 시 지원자의 약점 또는 부족한 점 1~2가지 요약.",
+  "suitability_score": {{
+      "ideal_candidate_fit": "인재상 적합도 점수 (1점에서 5점 사이 숫자만 입력)",
+      "job_description_fit": "직무 적합도 점수 (1점에서 5점 사이 숫자만 입력)"
+  }}
+}}
+""", budget=int(os.environ.get('SCORING_PREFIX_TOKEN_BUDGET', '20000')))
+SCORING_SUFFIX = promptCompiler.PromptTemplate('scoring_answers', """
+<지원자 답변>
+{answers}
+</지원자 답변>
+
+위 [출력 형식]의 JSON만 출력하세요.
+
+Assistant:
+""")
+
+# Bedrock 채점 응답 JSON 스키마
+SCORING_RESULT_SCHEMA = {
+    'type': 'object',
+    'required': ['overall_score', 'overall_comment', 'strengths', 'weaknesses', 'suitability_score'],
+    'properties': {
+        'overall_score': {'type': ['string', 'number']},
+        'suitability_score': {'type': 'object', 'required': ['ideal_candidate_fit', 'job_description_fit']},
+    }
+}
+
+# 모델 캐스케이드(MODEL_CASCADE=1)의 2차 의견: 빠른 모델에 총점만 따로 물어 채점 결과와 비교
+SECOND_OPINION_TOLERANCE = float(os.environ.get('SECOND_OPINION_TOLERANCE', '10'))  # 허용 총점 차이
+SECOND_OPINION_PROMPT = promptCompiler.PromptTemplate('scoring_second_opinion', """Human: 아래 <채용공고 기준>과 <지원자 답변>을 비교하여 100점 만점 총점만 매기세요.
+다른 설명 없이 {{"overall_score": 숫자}} 형식의 JSON만 출력하세요.
+
+<채용공고 기준>
+{criteria}
+</채용공고 기준>
+
+<지원자 답변>
+{answers}
+</지원자 답변>
+
+Assistant:
+""", budget=SCORING_PROMPT_TOKEN_BUDGET)
+SECOND_OPINION_SCHEMA = {
+    'type': 'object',
+    'required': ['overall_score'],
+    'properties': {'overall_score': {'type': ['string', 'number']}}
+}
+
+
+def report_prompt_cache(job_id, usage):
+    """채점 호출의 프롬프트 캐시 읽기/생성/미캐시 입력 토큰을 지표로 남깁니다 (JobId는 로그 속성으로, jobId별 합계는 Logs Insights)."""
+    usage = usage or {}
+    values = {'CacheReadTokens': usage.get('cache_read_input_tokens', 0),
+              'CacheWriteTokens': usage.get('cache_creation_input_tokens', 0),
+              'UncachedInputTokens': usage.get('input_tokens', 0)}
+    print(f"[Info] 프롬프트 캐시 (job={job_id}): 읽기 {values['CacheReadTokens']}, "
+          f"생성 {values['CacheWriteTokens']}, 미캐시 입력 {values['UncachedInputTokens']}")
+    metrics.emit({'Prompt': 'scoring'}, values, units={name: 'Count' for name in values},
+                  properties={'JobId': job_id})
+
+
+def parse_score(value):
+    """'85', 85, '85점' 형태의 점수를 Decimal로 변환합니다."""
+    return Decimal(str(value).split('점')[0].strip())
+
+
+def scores_agree(report, opinion):
+    """채점 결과 총점과 2차 의견 총점의 차이가 허용 범위 안인지 확인합니다."""
+    try:
+        return abs(parse_score(report['overall_score']) - parse_score(opinion['overall_score'])) <= \
+            Decimal(str(SECOND_OPINION_TOLERANCE))
+    except Exception:
+        return False
+
+# --- 답변 로드 함수 ---
+def list_answer_objects(bucket, session_id, client=None):
+    """세션 폴더의 _answer.txt 키 -> ETag (S3 목록 순서)."""
+    client = client or s3_client
+    prefix = f"interview-sessions/{session_id}/"
+    objects = {}
+    paginator = client.get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get('Contents', []):
+            if obj['Key'].endswith("_answer.txt"):
+                objects[obj['Key']] = obj.get('ETag')
+    return objects
+
+def list_answer_keys(bucket, session_id, client=None):
+    """세션 폴더의 _answer.txt 키 목록을 S3 목록 순서대로 반환합니다."""
+    return list(list_answer_objects(bucket, session_id, client))
+
+def fetch_answers(bucket, keys, max_workers=ANSWER_FETCH_CONCURRENCY, client=None):
+    """답변 파일들을 스레드 풀로 동시에 읽습니다.
+
+    결과는 keys 순서를 그대로 따르며, 개별 파일 실패는 failures로 모아서 반환합니다.
+    """
+    client = client or s3_client
+
+    def _fetch(key):
+        answer_obj = client.get_object(Bucket=bucket, Key=key)
+        return answer_obj['Body'].read().decode('utf-8')
+
+    results = [None] * len(keys)
+    if max_workers <= 1 or len(keys) <= 1:
+        for i, key in enumerate(keys):
+            try: results[i] = _fetch(key)
+            except Exception as e: results[i] = e
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(keys))) as executor:
+            futures = [executor.submit(_fetch, key) for key in keys]
+            for i, future in enumerate(futures):
+                try: results[i] = future.result()
+                except Exception as e: results[i] = e
+
+    answers, failures = [], []
+    for key, result in zip(keys, results):
+        question_id = key.split('/')[-1].replace('_answer.txt', '')
+        if isinstance(result, Exception):
+            failures.append({"id": question_id, "key": key, "error": str(result)})
+        else:
+            answers.append({"id": question_id, "answer": result, "key": key})
+    return answers, failures
+
+def load_answers(bucket, session_id, mode=ANSWER_BUNDLE_MODE, client=None):
+    """세션 답변을 (answers, failures)로 읽습니다. 가능하면 답변 번들을 사용합니다."""
+    client = client or s3_client
+    entries = None
+    if mode != 'legacy':
+        entries, _ = answerBundle.read(client, bucket, session_id)
+    if entries is None:
+        if mode != 'legacy': print("[Info] 답변 번들 없음. 개별 답변 파일로 로드합니다.")
+        return fetch_answers(bucket, list_answer_keys(bucket, session_id, client), client=client)
+
+    bundled = {e['key']: e for e in entries}
+    failures = []
+    if mode == 'verify':
+        # 번들 갱신이 아직 반영되지 않은 답변과, 번들에 넣은 뒤 다시 올라온 답변(ETag가 다름)만 개별로 읽어서 합침
+        # (ETag가 없는 예전 번들 항목도 다시 읽음. 개별로 읽은 답변은 이전 내용의 partial_score를 쓰지 않음)
+        missing_keys = [k for k, etag in list_answer_objects(bucket, session_id, client).items()
+                        if k not in bundled or bundled[k].get('etag') != etag]
+        if missing_keys:
+            print(f"[Info] 번들에 없거나 바뀐 답변 {len(missing_keys)}개를 개별 로드합니다.")
+            fetched, failures = fetch_answers(bucket, missing_keys, client=client)
+            bundled.update((ans['key'], ans) for ans in fetched)
+    # 답변별 채점 결과(partial_score)가 있으면 그대로 넘겨 incrementalScoring이 재사용
+    answers = [{"id": bundled[key]['id'], "answer": bundled[key]['answer'],
+                **({'partial_score': bundled[key]['partial_score']} if bundled[key].get('partial_score') else {})}
+               for key in sorted(bundled)]
+    return answers, failures
+
+@metrics.handler('calculate-scores')
 def lambda_handler(event, context):
 
+    # 여러 레코드(S3 배치 알림, SQS 배치)는 세션별로 동시에 채점하고 실패한 항목만 보고
+    if batchRecords.is_batch_event(event):
+        return batchRecords.process_batch(event, score_session)
+
     # 1. S3 이벤트 파싱
     try:
         bucket = event['Records'][0]['s3']['bucket']['name']
         end_file_key = urllib.parse.unquote_plus(event['Records'][0]['s3']['object']['key'], encoding='utf-8')
     except Exception as e: print(f"[Error] S3 이벤트 파싱 오류: {e}"); return {'statusCode': 400, 'body': 'S3 이벤트 파싱 오류'}
+    return score_session(bucket, end_file_key)
+
+def score_session(bucket, end_file_key):
+    """_END.txt 하나에 해당하는 면접 세션을 채점하고 결과를 저장합니다."""
     print(f"[Info] 트리거 감지: {bucket}/{end_file_key}")
 
     # 2. jobId, applicantEmail 추출
@@ -45,109 +237,84 @@ def lambda_handler(event, context):
     except Exception as e: print(f"[Error] 채용 공고 로드 실패: {e}"); return {'statusCode': 500, 'body': '채용 공고 로드 오류'}
 
     # 4. 모든 답변 로드
-    all_answers = []
     try:
-        prefix = f"interview-sessions/{session_id}/"
-        paginator = s3_client.get_paginator('list_objects_v2')
-        pages = paginator.paginate(Bucket=bucket, Prefix=prefix)
-        for page in pages:
-            for obj in page.get('Contents', []):
-                key = obj['Key']
-                if key.endswith("_answer.txt"):
-                    answer_obj = s3_client.get_object(Bucket=bucket, Key=key)
-                    answer_text = answer_obj['Body'].read().decode('utf-8')
-                    question_id = key.split('/')[-1].replace('_answer.txt', '')
-                    all_answers.append({"id": question_id, "answer": answer_text})
+        with metrics.span('load_answers'):
+            all_answers, failed_answers = load_answers(bucket, session_id)
     except Exception as e: print(f"[Error] 답변 로드 실패: {e}"); return {'statusCode': 500, 'body': '답변 로드 오류'}
+    for failed in failed_answers: print(f"[Warn] 답변 파일 로드 실패 (건너뜀): {failed['key']} - {failed['error']}")
+    if failed_answers and not all_answers: print("[Error] 모든 답변 파일 로드 실패"); return {'statusCode': 500, 'body': '답변 로드 오류'}
 
-    answers_formatted_text = ""
-    for ans in all_answers: answers_formatted_text += f"Q ({ans['id']}): {ans['answer']}\n"
+    answers_formatted_text = "\n".join(f"Q ({ans['id']}): {ans['answer']}" for ans in all_answers)
     print(f"[Info] {len(all_answers)}개의 답변 로드 완료.")
 
     # (선택) 지원자 이름 가져오기
     applicant_name = "N/A"
     # try: ... except ...
 
-    # --- 5. Bedrock 채점 프롬프트 ---
-    criteria_text = f"""
-    - 인재상(idealCandidate): {job_posting_data.get('idealCandidate', 'N/A')}
-    - 주요 업무(jobDescription): {job_posting_data.get('jobDescription', 'N/A')}
-    - 자격 요건(qualifications): {job_posting_data.get('qualifications', 'N/A')}
-    """
-
-    prompt = f"""Human: 당신은 채용 공고와 지원자의 면접 답변을 분석하여 평가 점수를 매기는 전문 HR 평가자입니다.
-아래 <채용공고 기준>과 <지원자 답변>을 **엄격하게 비교**하여, 요청된 JSON 형식에 맞춰 **점수와 평가 의견**을 작성해야 합니다.
-**절대 다른 설명이나 대화 없이, 오직 요청된 JSON 구조만 출력해야 합니다.**
-
-<채용공고 기준>
-{criteria_text}
-</채용공고 기준>
-
-<지원자 답변>
-{answers_formatted_text}
-</지원자 답변>
+    # 5. 답변별 점수가 (거의) 다 있으면 합산 + 총평 한 번으로 리포트 완성 (부족하면 아래 전체 채점)
+    final_report = None
+    if incrementalScoring.INCREMENTAL_SCORING:
+        try:
+            with metrics.span('incremental_report'):
+                final_report = incrementalScoring.build_report(job_id, job_posting_data, all_answers)
+        except Exception as e:
+            print(f"[Warn] 답변별 점수 합산 실패, 전체 채점으로 처리: {e}")
+            final_report = None
+    if final_report is not None:
+        print(f"[Info] 답변별 점수 합산 완료. 총점: {final_report.get('overall_score')}")
+        if failed_answers: final_report['answer_load_failures'] = failed_answers
+        return save_report(bucket, session_id, job_id, applicant_email, applicant_name, final_report)
 
-[출력 형식]
-**반드시 다음 JSON 형식에 맞춰 모든 필드를 채워서 응답하세요:**
-{{
-  "overall_score": "100점 만점 기준 총점 (숫자만 입력, 예: 85)",
-  "overall_comment": "채용 기준 대비 지원자 답변에 대한 1~2줄 요약 평가.",
-  "strengths": "채용 기준과 비교 시 지원자의 강점 1~2가지 요약.",
-  "weaknesses": "채용 기준과 비교 시 지원자의 약점 또는 부족한 점 1~2가지 요약.",
-  "suitability_score": {{
-      "ideal_candidate_fit": "인재상 적합도 점수 (1점에서 5점 사이 숫자만 입력)",
-      "job_description_fit": "직무 적합도 점수 (1점에서 5점 사이 숫자만 입력)"
-  }}
-}}
+    # --- 6. Bedrock 채점 프롬프트 (예산 초과 시 채용공고 기준 → 답변 순으로 뒷부분부터 잘림) ---
+    criteria_text = incrementalScoring.build_criteria(job_posting_data)
 
-Assistant:
-"""
+    # 접두부는 답변 길이와 무관하게 잘라야 지원자 사이에 똑같이 유지되어 캐시가 맞는다
+    prefix, prefix_report = SCORING_PREFIX.render(criteria=promptCompiler.section(criteria_text, priority=1))
+    prompt, _ = SCORING_SUFFIX.render(budget=max(1, SCORING_PROMPT_TOKEN_BUDGET - prefix_report['tokens']),
+                                      answers=promptCompiler.section(answers_formatted_text, priority=1))
+    second_opinion = None
+    if modelCascade.MODEL_CASCADE:
+        opinion_prompt, _ = SECOND_OPINION_PROMPT.render(criteria=promptCompiler.section(criteria_text, priority=2),
+                                                         answers=promptCompiler.section(answers_formatted_text, priority=1))
+        second_opinion = modelCascade.SecondOpinion(opinion_prompt, SECOND_OPINION_SCHEMA, scores_agree)
     # --- 프롬프트 끝 ---
 
-    final_report = None
     try:
-        body = { "anthropic_version": "bedrock-2023-05-31", "max_tokens": 2000, "messages": [{"role": "user", "content": [{"type": "text", "text": prompt}]}] }
-        response = bedrock_runtime.invoke_model( body=json.dumps(body), modelId=BEDROCK_MODEL_ID, accept='application/json', contentType='application/json')
-        response_body = json.loads(response.get('body').read())
-        scoring_result_text = response_body['content'][0]['text']
+        # Bedrock 응답 파싱: 서두/```json 펜스/뒤따르는 텍스트가 있어도 스키마에 맞는 첫 JSON을 추출
+        # MODEL_CASCADE=1 이면 빠른 모델로 먼저 채점하고, 스키마 불일치/2차 의견 불일치/긴 답변일 때만 BEDROCK_MODEL_ID로 올림
+        final_report, cascade_info = modelCascade.invoke_json(
+            'scoring_result', prompt, SCORING_RESULT_SCHEMA, BEDROCK_MODEL_ID, max_tokens=2000,
+            region=BEDROCK_REGION, job_id=job_id, second_opinion=second_opinion, cache_prefix=prefix)
 
-        # Bedrock 응답 파싱 (라인 115 근처 시작)
-        try:
-            # ```json 마크다운 제거 또는 시작이 { 인지 확인
-            if "```json" in scoring_result_text:
-                json_part = scoring_result_text.split("```json")[1].split("```")[0].strip()
-            elif scoring_result_text.strip().startswith("{"):
-                json_part = scoring_result_text.strip()
-            else:
-                # JSON 형식이 아닌 경우 오류 발생
-                raise ValueError("Bedrock 응답에서 JSON 형식을 찾을 수 없습니다.")
-            final_report = json.loads(json_part) # JSON 파싱
-        except Exception as parse_e:
-             print(f"[Error] Bedrock 응답 JSON 파싱 실패: {parse_e}, 응답 내용: {scoring_result_text[:500]}")
-             # 파싱 실패 시, Bedrock 호출 오류로 처리하기 위해 에러 다시 발생
-             raise parse_e
-
-        print(f"[Info] Bedrock 채점 완료. 총점: {final_report.get('overall_score')}")
+        print(f"[Info] Bedrock 채점 완료 ({cascade_info['model_id']}). 총점: {final_report.get('overall_score')}")
+        report_prompt_cache(job_id, cascade_info['usage'])
+        # 로드하지 못한 답변이 있으면 리포트에 함께 기록
+        if failed_answers: final_report['answer_load_failures'] = failed_answers
+        if modelCascade.MODEL_CASCADE: final_report['scoring_model'] = cascade_info
 
     except Exception as e:
         # Bedrock 호출 자체 실패 또는 위에서 발생시킨 파싱 에러 처리
         print(f"[Error] Bedrock 채점 호출 또는 JSON 파싱 오류: {e}")
         return {'statusCode': 500, 'body': 'Bedrock 채점 오류'}
 
-    # 6. 최종 리포트 S3 저장
+    return save_report(bucket, session_id, job_id, applicant_email, applicant_name, final_report)
+
+def save_report(bucket, session_id, job_id, applicant_email, applicant_name, final_report):
+    """최종 리포트를 S3와 DynamoDB에 저장합니다."""
+    # 7. 최종 리포트 S3 저장
+    report_key = f"interview-sessions/{session_id}/final_report.json"
     try:
-        report_key = f"interview-sessions/{session_id}/final_report.json"
         s3_client.put_object( Bucket=bucket, Key=report_key, Body=json.dumps(final_report, ensure_ascii=False, indent=2), ContentType='application/json')
         print(f"[Success] 최종 리포트 저장 완료: {report_key}")
     except Exception as e: print(f"[Error] S3 리포트 저장 실패: {e}")
 
-    # 7. DynamoDB에 점수 저장
+    # 8. DynamoDB에 점수 저장
     try:
         overall_score_str = final_report.get('overall_score')
         if overall_score_str is None: raise ValueError("final_report에 'overall_score'가 없습니다.")
         try:
              # 점수 문자열에서 숫자만 추출하여 Decimal로 변환
-             score_decimal = Decimal(str(overall_score_str).split('점')[0].strip())
+             score_decimal = parse_score(overall_score_str)
         except Exception as decimal_e:
              print(f"[Error] 점수({overall_score_str}) Decimal 변환 실패: {decimal_e}")
              raise ValueError("overall_score를 숫자로 변환할 수 없습니다.")
@@ -155,7 +322,9 @@ Assistant:
         item_to_save = {
             'jobId': job_id, 'applicantEmail': applicant_email,
             'overallScore': score_decimal, 'applicantName': applicant_name,
-            'reportS3Key': report_key
+            'reportS3Key': report_key,
+            # 순위 조회 GSI(jobId-scoreRank-index) 정렬 키
+            'scoreRank': scoreRanking.score_rank_key(score_decimal, applicant_email)
         }
         score_table.put_item(Item=item_to_save)
         print(f"[Success] DynamoDB 점수 저장 완료: {item_to_save}")
@@ -163,3 +332,4 @@ Assistant:
 
     return {'statusCode': 200, 'body': '채점 및 저장 완료'}
 
+awsClients.prime_on_init()
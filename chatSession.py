@@ -0,0 +1,166 @@
+import json
+import os
+import time
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+import awsClients
+import llmGateway
+
+# aiInterviewBot 서버 측 세션 저장소
+# 클라이언트는 session_id와 새 답변만 보내고, 진행 상태(common_index/job_index/완료 여부)와 대화 기록은 여기 둔다.
+# - 최근 CHAT_RECENT_TURNS 턴만 원문으로 (zlib 압축 JSON, Binary 속성 history) 보관
+# - 그보다 오래된 턴은 롤링 요약(summary)에 합쳐 넣고, 요약은 CHAT_SUMMARY_MAX_CHARS 이내로 유지
+#   → 매 턴 프롬프트에 붙는 맥락 크기가 대화 길이와 무관하게 일정
+# - 요약 갱신(LLM 호출)은 턴 시작 시 백그라운드로 시작해 피드백 호출과 겹쳐 실행 (실패 시 발췌 요약)
+# - turn 번호 조건부 업데이트로 같은 세션의 중복/동시 제출을 막는다
+
+CHAT_SESSION_TABLE = os.environ.get('CHAT_SESSION_TABLE', 'Interview_Chat_Sessions')  # PK: session_id, TTL: expires_at
+CHAT_SESSION_TTL_SECONDS = int(os.environ.get('CHAT_SESSION_TTL_SECONDS', str(24 * 3600)))
+CHAT_RECENT_TURNS = max(1, int(os.environ.get('CHAT_RECENT_TURNS', '3')))
+CHAT_TURN_MAX_CHARS = int(os.environ.get('CHAT_TURN_MAX_CHARS', '400'))       # 맥락에 넣는 턴별 답변/피드백 길이
+CHAT_SUMMARY_MAX_CHARS = int(os.environ.get('CHAT_SUMMARY_MAX_CHARS', '600'))
+CHAT_SUMMARY_MODEL = os.environ.get('CHAT_SUMMARY_MODEL', 'gpt-4o-mini')
+CHAT_SUMMARY_TIMEOUT = float(os.environ.get('CHAT_SUMMARY_TIMEOUT', '8'))
+CHAT_JOB_QUESTION_LIMIT = int(os.environ.get('CHAT_JOB_QUESTION_LIMIT', '3'))  # 이만큼 직무 질문에 답하면 세션 종료
+
+# 진행 상태 필드 (aiInterviewBot.plan_turn 요청 본문과 같은 이름)
+STATE_FIELDS = ('common_index', 'job_index', 'common_done', 'job_done')
+
+sessions_table = awsClients.lazy_table(CHAT_SESSION_TABLE)
+_executor = ThreadPoolExecutor(max_workers=2)
+
+
+class SessionConflict(Exception):
+    """다른 요청이 이미 이 턴을 처리함."""
+
+
+# --- 기록 인코딩 ---
+def encode_history(turns):
+    return zlib.compress(json.dumps(turns, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+
+def decode_history(value):
+    if not value:
+        return []
+    raw = getattr(value, 'value', value)  # boto3는 Binary로 감싸서 반환
+    return json.loads(zlib.decompress(bytes(raw)).decode('utf-8'))
+
+
+def _clip(text, limit):
+    text = (text or '').strip()
+    return text if len(text) <= limit else text[:limit] + '…'
+
+
+# --- 요약 ---
+def _extractive_summary(summary, turns):
+    """LLM 요약이 실패했을 때: 질문/답변 앞부분만 이어 붙이고 최신 내용 위주로 길이를 맞춥니다."""
+    lines = [summary] if summary else []
+    lines += [f"Q: {_clip(t['q'], 60)} A: {_clip(t['a'], 120)}" for t in turns]
+    text = ' / '.join(lines)
+    return text[-CHAT_SUMMARY_MAX_CHARS:]
+
+
+def summarize(summary, turns):
+    """이전 요약에 turns를 합친 새 요약 (CHAT_SUMMARY_MAX_CHARS 이내)."""
+    dialogue = "\n".join(f"질문: {t['q']}\n답변: {_clip(t['a'], CHAT_TURN_MAX_CHARS)}" for t in turns)
+    prompt = (
+        f"아래 [이전 요약]과 [대화]를 합쳐 {CHAT_SUMMARY_MAX_CHARS}자 이내의 한국어 요약 하나로 만들어줘. "
+        f"지원자의 핵심 경험, 드러난 강점/약점, 이미 다룬 주제만 남기고 요약문만 출력해.\n\n"
+        f"[이전 요약]\n{summary or '없음'}\n\n[대화]\n{dialogue}"
+    )
+    try:
+        result = llmGateway.chat_openai([{"role": "user", "content": prompt}], model=CHAT_SUMMARY_MODEL,
+                                        temperature=0.2, max_tokens=400, timeout=CHAT_SUMMARY_TIMEOUT, max_retries=0)
+        return _clip(result['text'], CHAT_SUMMARY_MAX_CHARS)
+    except Exception as e:
+        print(f"[Warn] 대화 요약 실패, 발췌 요약 사용: {e}")
+        return _extractive_summary(summary, turns)
+
+
+# --- 세션 ---
+def create(resume, job_type):
+    item = {
+        'session_id': str(uuid.uuid4()),
+        'resume': resume,
+        'job_type': job_type,
+        'common_index': 0, 'job_index': 0, 'common_done': False, 'job_done': False,
+        'last_question': None,
+        'summary': '',
+        'history': encode_history([]),
+        'turn': 0,
+        'expires_at': int(time.time()) + CHAT_SESSION_TTL_SECONDS,
+    }
+    sessions_table.put_item(Item=item, ConditionExpression='attribute_not_exists(session_id)')
+    return item
+
+
+def load(session_id):
+    return sessions_table.get_item(Key={'session_id': session_id}, ConsistentRead=True).get('Item')
+
+
+class Turn:
+    """세션 한 턴. 시작할 때 접어야 할 오래된 턴이 있으면 요약을 백그라운드로 시작합니다."""
+
+    def __init__(self, item):
+        self.item = item
+        self.turns = decode_history(item.get('history'))
+        self._fold = None
+        if len(self.turns) >= CHAT_RECENT_TURNS:
+            # 이번 턴이 추가되면 넘치는 만큼을 미리 요약에 합친다
+            folded = self.turns[:len(self.turns) - CHAT_RECENT_TURNS + 1]
+            self._fold = (len(folded), _executor.submit(summarize, item.get('summary', ''), folded))
+
+    def plan_body(self, user_answer):
+        """aiInterviewBot.plan_turn에 넘길 요청 본문 (기존 클라이언트가 보내던 형식)."""
+        body = {field: self.item.get(field) for field in STATE_FIELDS}
+        body.update(resume=self.item.get('resume'), job_type=self.item.get('job_type'), user_answer=user_answer)
+        body['common_index'] = int(body['common_index'] or 0)
+        body['job_index'] = int(body['job_index'] or 0)
+        return body
+
+    @property
+    def job_question_limit(self):
+        """서버 측 세션은 서버가 job_done을 정한다 (기존 클라이언트는 직접 보냄)."""
+        return CHAT_JOB_QUESTION_LIMIT
+
+    def context(self):
+        """피드백 프롬프트 앞에 붙일 맥락 (요약 + 최근 턴, 길이 상한 있음)."""
+        parts = []
+        if self.item.get('summary'):
+            parts.append(f"[지금까지의 면접 요약]\n{self.item['summary']}")
+        if self.turns:
+            recent = "\n".join(f"질문: {t['q']}\n답변: {_clip(t['a'], CHAT_TURN_MAX_CHARS)}"
+                               + (f"\n피드백: {_clip(t['f'], CHAT_TURN_MAX_CHARS)}" if t.get('f') else '')
+                               for t in self.turns[-CHAT_RECENT_TURNS:])
+            parts.append(f"[최근 대화]\n{recent}")
+        return "\n\n".join(parts) + "\n\n" if parts else ""
+
+    def commit(self, user_answer, state, question, feedback):
+        """이번 턴을 기록하고 진행 상태를 저장합니다. 다른 요청이 먼저 저장했으면 SessionConflict."""
+        from botocore.exceptions import ClientError
+        turns, summary = list(self.turns), self.item.get('summary', '')
+        if user_answer:
+            turns.append({'q': self.item.get('last_question') or '', 'a': user_answer, 'f': feedback or ''})
+        if self._fold is not None and len(turns) > CHAT_RECENT_TURNS:
+            count, future = self._fold
+            summary = future.result()
+            turns = turns[count:]
+        turns = turns[-CHAT_RECENT_TURNS:]
+
+        values = {field: state[field] for field in STATE_FIELDS if field in state}
+        values.update(last_question=question, summary=summary, history=encode_history(turns),
+                      expires_at=int(time.time()) + CHAT_SESSION_TTL_SECONDS)
+        try:
+            sessions_table.update_item(
+                Key={'session_id': self.item['session_id']},
+                UpdateExpression="SET " + ", ".join(f"#{field} = :{field}" for field in values) + ", #turn = #turn + :one",
+                ConditionExpression="#turn = :turn",
+                ExpressionAttributeNames=dict({f'#{field}': field for field in values}, **{'#turn': 'turn'}),
+                ExpressionAttributeValues=dict({f':{field}': value for field, value in values.items()},
+                                               **{':one': 1, ':turn': self.item['turn']})
+            )
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') == 'ConditionalCheckFailedException':
+                raise SessionConflict(f"session {self.item['session_id']} turn {self.item['turn']} 이미 처리됨")
+            raise
@@ -0,0 +1,140 @@
+import json
+import time
+import uuid
+import attributeCodec
+import awsClients
+import finalizeInterview
+import getInterviewQuestions
+import metrics
+
+# Step Functions 없이 면접 한 건을 Interview_Sessions의 항목 하나로 진행하는 세션 엔진.
+# 항목은 finalizeInterview와 같은 기록 형식에 current_index/status만 더해 두고,
+# 답변 추가와 다음 질문 이동을 조건부 update_item 한 번으로 처리한다.
+#
+# POST /express-sessions                          {"job_posting_id": ...}  -> 세션 생성 + 첫 질문
+# GET  /express-sessions/{session_id}                                      -> 현재 질문
+# POST /express-sessions/{session_id}/answers     {"index": n, "answer": ...} -> 답변 저장 + 다음 질문
+
+sessions_table = finalizeInterview.sessions_table
+
+STATUS_IN_PROGRESS = 'IN_PROGRESS'
+STATUS_COMPLETED = 'COMPLETED'
+
+
+class SessionConflict(Exception):
+    """이미 다른 요청이 처리한 인덱스이거나 종료된 세션."""
+
+
+def _response(status_code, body):
+    return {'statusCode': status_code, 'body': json.dumps(body, ensure_ascii=False)}
+
+
+def session_view(item):
+    """클라이언트에 돌려줄 현재 진행 상태 (질문 목록 전체는 보내지 않음)."""
+    index = int(item.get('current_index', 0))  # finalizeInterview가 쓴 기록에는 없음
+    questions = item['questions']
+    view = {'session_id': item['session_id'], 'status': item['status'], 'question_count': len(questions)}
+    if item['status'] == STATUS_IN_PROGRESS and index < len(questions):
+        view.update(index=index, question=questions[index])
+    return view
+
+
+def start_session(job_posting_id):
+    """공고의 질문 목록으로 새 세션 항목을 만듭니다."""
+    questions = getInterviewQuestions.assemble_questions(job_posting_id)
+    item = finalizeInterview.build_session_record(str(uuid.uuid4()), job_posting_id, questions, [],
+                                                  status=STATUS_IN_PROGRESS if questions else STATUS_COMPLETED)
+    item.update(current_index=0, updated_at=int(time.time()))
+    sessions_table.put_item(Item=item, ConditionExpression='attribute_not_exists(session_id)')
+    return item
+
+
+def get_session(session_id):
+    # finalizeInterview가 저장한 완료 기록은 질문/답변이 압축되어 있을 수 있음
+    return attributeCodec.decode_item(sessions_table.get_item(Key={'session_id': session_id},
+                                                              ConsistentRead=True).get('Item'))
+
+
+def _advance(session_id, index, answer, last):
+    """답변 추가 + 다음 질문 이동. last면 같은 업데이트에서 COMPLETED로 바꿉니다 (조건이 맞지 않으면 ClientError)."""
+    update = "SET answers = list_append(answers, :a), current_index = current_index + :one, updated_at = :now"
+    values = {':a': [answer], ':one': 1, ':i': index, ':next': index + 1, ':now': int(time.time()),
+              ':in_progress': STATUS_IN_PROGRESS}
+    if last:
+        update += ", #s = :completed"
+        values[':completed'] = STATUS_COMPLETED
+    return sessions_table.update_item(
+        Key={'session_id': session_id},
+        UpdateExpression=update,
+        # 마지막 답변: 질문 수 = index + 1, 그 외: 질문 수 > index + 1
+        ConditionExpression="current_index = :i AND #s = :in_progress AND size(questions) "
+                            + ("= :next" if last else "> :next"),
+        ExpressionAttributeNames={'#s': 'status'},
+        ExpressionAttributeValues=values,
+        ReturnValues='ALL_NEW'
+    )['Attributes']
+
+
+def submit_answer(session_id, index, answer):
+    """index번째 질문의 답변을 추가하고 다음 질문으로 넘깁니다.
+
+    current_index가 index와 같을 때만 성공하므로 중복 제출/동시 제출은 SessionConflict가 됩니다.
+    마지막 답변이면 답변 추가와 COMPLETED 변경이 같은 조건부 업데이트에 들어가므로 중간 상태가 남지 않습니다.
+    (대부분은 마지막이 아니므로 그 조건으로 먼저 시도하고, 실패하면 마지막 답변 조건으로 한 번 더 시도)
+    """
+    from botocore.exceptions import ClientError
+    for last in (False, True):
+        try:
+            return _advance(session_id, index, answer, last)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+                raise
+    raise SessionConflict(f"세션 {session_id}의 {index}번 답변은 이미 처리되었거나 세션이 종료되었습니다.")
+
+
+@metrics.handler('expressSession')
+def lambda_handler(event, context):
+    method = event.get('httpMethod') or event.get('requestContext', {}).get('http', {}).get('method', 'GET')
+    session_id = (event.get('pathParameters') or {}).get('session_id')
+    try:
+        body = json.loads(event.get('body') or '{}')
+    except json.JSONDecodeError as e:
+        return _response(400, {'error': f'body 파싱 실패: {e}'})
+
+    # 1. 세션 시작
+    if method == 'POST' and not session_id:
+        job_posting_id = body.get('job_posting_id')
+        if not job_posting_id:
+            return _response(400, {'error': 'job_posting_id is required.'})
+        item = start_session(job_posting_id)
+        print(f"[Info] 세션 시작: {item['session_id']} (질문 {len(item['questions'])}개)")
+        return _response(201, session_view(item))
+
+    if not session_id:
+        return _response(400, {'error': 'session_id is required.'})
+
+    # 2. 현재 질문 조회
+    if method == 'GET':
+        item = get_session(session_id)
+        if not item:
+            return _response(404, {'error': 'Session not found.'})
+        return _response(200, session_view(item))
+
+    # 3. 답변 제출 + 다음 질문
+    if method == 'POST':
+        answer = body.get('answer')
+        index = body.get('index')
+        if answer is None or not isinstance(index, int):
+            return _response(400, {'error': 'index and answer are required.'})
+        try:
+            item = submit_answer(session_id, index, answer)
+        except SessionConflict as e:
+            current = get_session(session_id)
+            if not current:
+                return _response(404, {'error': 'Session not found.'})
+            return _response(409, dict(session_view(current), error=str(e)))
+        return _response(200, session_view(item))
+
+    return _response(405, {'error': f'Unsupported method: {method}'})
+
+awsClients.prime_on_init()
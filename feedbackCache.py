@@ -0,0 +1,157 @@
+import os
+import re
+import threading
+import zlib
+from collections import OrderedDict
+
+try:
+    import numpy as np
+except ImportError:  # numpy가 없는 배포에서는 캐시를 끄고 항상 모델을 호출한다
+    np = None
+
+# 공통 질문 답변 피드백 유사도 캐시.
+# 답변을 문자 n-gram 해싱 벡터(L2 정규화)로 만들고, 질문별로 저장된 벡터 행렬과 한 번의 행렬곱으로
+# 코사인 유사도를 계산해 임계값 이상이면 이전에 생성한 피드백/꼬리 질문을 그대로 돌려준다.
+#   FEEDBACK_CACHE_ENABLED           : '0'이면 사용 안 함
+#   FEEDBACK_CACHE_THRESHOLD         : 코사인 유사도 임계값
+#   FEEDBACK_CACHE_DIM               : 해싱 벡터 차원
+#   FEEDBACK_CACHE_MAX_PER_QUESTION  : 질문별 최대 항목 수 (초과 시 가장 오래 안 쓴 항목 교체)
+#   FEEDBACK_CACHE_MAX_QUESTIONS     : 최대 질문(범위) 수 (초과 시 가장 오래 안 쓴 질문 제거)
+# 메모리 상한: MAX_QUESTIONS * MAX_PER_QUESTION * DIM * 4바이트 (기본값 16 * 256 * 2048 * 4 = 32MB)
+
+FEEDBACK_CACHE_ENABLED = os.environ.get('FEEDBACK_CACHE_ENABLED', '1') == '1'
+FEEDBACK_CACHE_THRESHOLD = float(os.environ.get('FEEDBACK_CACHE_THRESHOLD', '0.92'))
+FEEDBACK_CACHE_DIM = int(os.environ.get('FEEDBACK_CACHE_DIM', '2048'))
+FEEDBACK_CACHE_MAX_PER_QUESTION = int(os.environ.get('FEEDBACK_CACHE_MAX_PER_QUESTION', '256'))
+FEEDBACK_CACHE_MAX_QUESTIONS = int(os.environ.get('FEEDBACK_CACHE_MAX_QUESTIONS', '16'))
+NGRAM_SIZES = (2, 3)
+
+_NOISE_RE = re.compile(r'[\s\W_]+', re.UNICODE)
+
+_lock = threading.Lock()
+_scopes = OrderedDict()  # scope -> _Scope (가장 최근에 쓴 범위가 뒤)
+_stats = {'lookups': 0, 'hits': 0, 'misses': 0, 'inserts': 0, 'evictions': 0}
+
+
+def is_enabled():
+    return FEEDBACK_CACHE_ENABLED and np is not None
+
+
+def _normalize(text):
+    """대소문자/띄어쓰기/문장부호 차이를 없앱니다."""
+    return _NOISE_RE.sub('', (text or '').lower())
+
+
+def vectorize(text, dim=None):
+    """문자 n-gram을 crc32로 해싱한 L2 정규화 벡터. 빈 텍스트면 None."""
+    dim = dim or FEEDBACK_CACHE_DIM
+    text = _normalize(text)
+    grams = [text[i:i + n] for n in NGRAM_SIZES for i in range(len(text) - n + 1)]
+    if not grams:
+        return None
+    indices = np.fromiter((zlib.crc32(g.encode('utf-8')) % dim for g in grams), dtype=np.int64, count=len(grams))
+    vector = np.bincount(indices, minlength=dim).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+class _Scope:
+    """질문 하나에 대한 벡터 행렬 + 값 목록. 최근 사용 시각(tick)으로 LRU 교체."""
+
+    def __init__(self, capacity, dim):
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.last_used = np.zeros(capacity, dtype=np.int64)
+        self.values = [None] * capacity
+        self.size = 0
+        self.hits = 0
+        self.lookups = 0
+
+    def best_match(self, vector):
+        if not self.size:
+            return -1, 0.0
+        similarities = self.vectors[:self.size] @ vector
+        index = int(np.argmax(similarities))
+        return index, float(similarities[index])
+
+    def insert(self, vector, value, tick):
+        """빈 칸이 있으면 채우고, 없으면 가장 오래 안 쓴 칸을 교체합니다. 교체했으면 True."""
+        evicted = self.size == len(self.values)
+        index = int(np.argmin(self.last_used)) if evicted else self.size
+        self.vectors[index] = vector
+        self.values[index] = value
+        self.last_used[index] = tick
+        self.size = max(self.size, index + 1)
+        return evicted
+
+
+_tick = 0
+
+
+def _next_tick():
+    global _tick
+    _tick += 1
+    return _tick
+
+
+def lookup(scope, answer):
+    """비슷한 답변에 대한 캐시 값을 반환합니다. 없으면 None.
+
+    반환: {'value': 저장된 값, 'similarity': 코사인 유사도}
+    """
+    if not is_enabled():
+        return None
+    vector = vectorize(answer)
+    if vector is None:
+        return None
+    with _lock:
+        _stats['lookups'] += 1
+        entry = _scopes.get(scope)
+        if entry is not None:
+            _scopes.move_to_end(scope)
+            entry.lookups += 1
+            index, similarity = entry.best_match(vector)
+            if index >= 0 and similarity >= FEEDBACK_CACHE_THRESHOLD:
+                entry.last_used[index] = _next_tick()
+                entry.hits += 1
+                _stats['hits'] += 1
+                return {'value': entry.values[index], 'similarity': similarity}
+        _stats['misses'] += 1
+        return None
+
+
+def store(scope, answer, value):
+    """답변과 생성된 값을 저장합니다."""
+    if not is_enabled() or value is None:
+        return
+    vector = vectorize(answer)
+    if vector is None:
+        return
+    with _lock:
+        entry = _scopes.get(scope)
+        if entry is None:
+            entry = _scopes[scope] = _Scope(FEEDBACK_CACHE_MAX_PER_QUESTION, FEEDBACK_CACHE_DIM)
+            while len(_scopes) > FEEDBACK_CACHE_MAX_QUESTIONS:
+                _, dropped = _scopes.popitem(last=False)
+                _stats['evictions'] += dropped.size
+        _scopes.move_to_end(scope)
+        if entry.insert(vector, value, _next_tick()):
+            _stats['evictions'] += 1
+        _stats['inserts'] += 1
+
+
+def clear():
+    with _lock:
+        _scopes.clear()
+
+
+def get_stats():
+    """전체/질문별 적중률과 항목 수."""
+    with _lock:
+        stats = dict(_stats)
+        stats['hit_rate'] = round(stats['hits'] / stats['lookups'], 4) if stats['lookups'] else 0.0
+        stats['entries'] = sum(s.size for s in _scopes.values())
+        stats['scopes'] = {
+            scope: {'entries': s.size, 'lookups': s.lookups, 'hits': s.hits,
+                    'hit_rate': round(s.hits / s.lookups, 4) if s.lookups else 0.0}
+            for scope, s in _scopes.items()
+        }
+        return stats
@@ -1,27 +1,43 @@
 import json
-import boto3
 import uuid
+import attributeCodec
+import awsClients
+import interviewState
+import metrics
 
-dynamodb = boto3.resource('dynamodb')
-sessions_table = dynamodb.Table('Interview_Sessions')
+sessions_table = awsClients.lazy_table('Interview_Sessions')
 
+# 완료된 면접 기록에서 압축 저장하는 큰 속성 (진행 중인 expressSession 항목은 list_append/size()를 쓰므로 압축하지 않음)
+COMPRESSED_FIELDS = ('questions', 'answers')
+
+def build_session_record(session_id, job_posting_id, questions, answers, status='COMPLETED'):
+    """Interview_Sessions 테이블에 저장하는 면접 기록 형식."""
+    return {
+        'session_id': session_id,
+        'job_posting_id': job_posting_id,
+        'questions': questions,
+        'answers': answers,
+        'status': status
+    }
+
+@metrics.handler('finalizeInterview')
 def lambda_handler(event, context):
     # Step Functions의 최종 상태를 받음
     final_state = event
 
+    # 클레임 체크 모드면 여기서 한 번만 전체 기록(질문/답변)을 읽어 옴
+    if interviewState.is_claim_check(final_state):
+        final_state = dict(final_state, **interviewState.load(final_state['state_ref']))
+
     session_id = str(uuid.uuid4())
 
-    sessions_table.put_item(
-        Item={
-            'session_id': session_id,
-            'job_posting_id': final_state['job_posting_id'],
-            'questions': final_state['questions'],
-            'answers': final_state['answers'],
-            'status': 'COMPLETED'
-        }
-    )
+    record = build_session_record(session_id, final_state['job_posting_id'],
+                                  final_state['questions'], final_state['answers'])
+    sessions_table.put_item(Item=attributeCodec.encode_item(record, COMPRESSED_FIELDS))
 
     return {
         'status': 'success',
         'session_id': session_id
     }
+
+awsClients.prime_on_init()
@@ -1,20 +1,64 @@
 import json
-import boto3
 import os
 import urllib.parse
 import re
+import awsClients
+import batchRecords
+import jsonExtract
+import llmCache
+import incrementalScoring
+import llmGateway
+import modelCascade
+import metrics
+import promptCompiler
 
 # --- 기본 설정 ---
 BEDROCK_REGION = os.environ.get('AWS_REGION', 'us-east-1') # Lambda 환경 변수에서 리전 가져오기
 MODEL_ID = "anthropic.claude-3-sonnet-20240229-v1:0" # 사용할 Bedrock 모델
 
 # --- Boto3 클라이언트 초기화 ---
-# Lambda 함수가 실행될 때마다 새로 생성되지 않도록 핸들러 함수 밖에 선언
-s3_client = boto3.client('s3')
-bedrock_runtime = boto3.client('bedrock-runtime', region_name=BEDROCK_REGION)
+# 핸들러 밖에 선언하되 실제 생성은 첫 사용 시점으로 미뤄 콜드 스타트 비용을 줄임
+# (bedrock-runtime 클라이언트는 llmGateway가 커넥션 풀과 함께 관리)
+s3_client = awsClients.lazy_client('s3')
+
+# --- Bedrock 응답 JSON 스키마 ---
+JOB_POSTING_QUESTIONS_SCHEMA = {
+    'type': 'array', 'minItems': 1,
+    'items': {'type': 'object', 'required': ['question'], 'properties': {'question': {'type': 'string'}}}
+}
+RESUME_QUESTIONS_SCHEMA = {
+    'type': 'array', 'minItems': 1,
+    'items': {'type': 'object', 'required': ['id', 'text'],
+              'properties': {'id': {'type': 'string'}, 'text': {'type': 'string'}}}
+}
+
+# --- 이력서 질문 프롬프트 (모듈 로드 시 한 번 공백 정규화) ---
+RESUME_PROMPT = promptCompiler.PromptTemplate('resume_questions', """Human: 당신은 지원자를 평가하는 면접관입니다. 다음은 지원자의 이력서 내용입니다.
+
+<resume_content>
+{resume}
+</resume_content>
+
+이 지원자는 **{major}을(를) 전공**했으며 **{desired_job}({experience})**을(를) 희망하고 있습니다.
+이력서에 구체적인 프로젝트나 경력 사항은 부족할 수 있습니다.
+
+지원자의 **전공 지식, 학습 능력, 문제 해결 능력, 성장 가능성** 등을 파악할 수 있는 **기본적이면서도 의미 있는 질문 2개**를 생성해주세요.
+
+[규칙]
+1. 자기소개, 강점/약점 같은 너무 일반적인 질문은 제외합니다.
+2. 위 **전공**이나 **희망 직무**와 관련된 질문을 우선적으로 고려합니다.
+3. 질문 앞에 번호(1., 2.)를 붙여주세요.
+4. 질문 외 다른 설명은 하지 마세요.
+5. 반드시 다음 JSON 배열 형식으로만 대답해 주세요. 다른 설명은 모두 제외하고 JSON 코드만 반환해야 합니다.
+[
+  {{ "id": "q_resume_1", "text": "첫 번째 질문 내용" }},
+  {{ "id": "q_resume_2", "text": "두 번째 질문 내용" }}
+]
+
+Assistant:""", budget=int(os.environ.get('RESUME_PROMPT_TOKEN_BUDGET', '3000')))
 
 # --- Bedrock: 채용 공고 질문 생성 함수 ---
-def generate_job_posting_questions(ideal_candidate_text):
+def generate_job_posting_questions(ideal_candidate_text, job_id=None):
     """Bedrock을 호출하여 채용 공고 인재상 기반 질문 3개를 생성합니다."""
     prompt = f"""Human: 다음은 우리 회사의 인재상(idealCandidate) 설명입니다.
 
@@ -34,47 +78,26 @@ def generate_job_posting_questions(ideal_candidate_text):
 Assistant:
 """
     try:
-        bedrock_request_body = {
-            "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 1000, # 충분한 토큰 설정
-            "messages": [{"role": "user", "content": [{"type": "text", "text": prompt}]}]
-        }
-        # --- 👈 [수정] Guardrail 파라미터 주석 처리 ---
-        response = bedrock_runtime.invoke_model(
-            body=json.dumps(bedrock_request_body),
-            modelId=MODEL_ID,
-            accept='application/json',
-            contentType='application/json'
-            # guardrailIdentifier="gi0pmpvfbz8t",       # 👈 주석 처리
-            # guardrailVersion="DRAFT"                  # 👈 주석 처리
-        )
-        response_body = json.loads(response.get('body').read())
-        generated_text = response_body['content'][0]['text']
-
-        # 생성된 텍스트가 JSON 형식이 맞는지 확인 후 파싱
-        generated_questions = json.loads(generated_text)
+        # 같은 인재상으로 다시 업로드된 공고는 캐시된 결과를 재사용 (Bedrock 호출 없음)
+        # 스키마에 맞는 JSON을 추출 (서두/```json 펜스 허용, 실패 시에만 복구 요청)
+        # MODEL_CASCADE=1 이면 빠른 모델을 먼저 쓰고 스키마 검증에 실패할 때만 MODEL_ID로 올림
+        generated_questions, cascade_info = modelCascade.invoke_json(
+            'job_posting_questions', prompt, JOB_POSTING_QUESTIONS_SCHEMA, MODEL_ID, max_tokens=1000,
+            region=BEDROCK_REGION, job_id=job_id, use_cache=True)
+        if cascade_info['cached']:
+            print(f"[Info] 캐시된 채용 공고 질문 사용: {llmCache.get_stats()}")
         print(f"[Info] Bedrock이 생성한 채용 공고 질문: {generated_questions}")
-
-        # 간단한 형식 검증
-        if isinstance(generated_questions, list) and len(generated_questions) > 0 and 'question' in generated_questions[0]:
-            return generated_questions[:3] # 최대 3개 반환
-        else:
-            print("[Error] Bedrock 채용 공고 질문 응답 형식이 예상과 다릅니다.")
-            return []
-    except json.JSONDecodeError as json_err:
+        return generated_questions[:3] # 최대 3개 반환
+    except jsonExtract.JSONExtractionError as json_err:
         print(f"[Error] Bedrock 채용 공고 질문 JSON 파싱 실패: {json_err}")
-        # Bedrock 원본 응답도 함께 로깅하면 디버깅에 도움됨
-        try:
-            print(f"Bedrock 원본 응답 (파싱 실패): {generated_text}")
-        except NameError: # generated_text 변수가 정의되기 전에 에러난 경우
-             pass
+        llmCache.invalidate_for(MODEL_ID, prompt, llmGateway.bedrock_cache_params(1000)) # 잘못된 응답은 캐시에서 제거
         return []
     except Exception as e:
         print(f"[Error] Bedrock 채용 공고 질문 생성 실패: {e}")
         return []
 
 # --- Bedrock: 이력서 질문 생성 함수 ---
-def generate_resume_questions(resume_text):
+def generate_resume_questions(resume_text, job_id=None):
     """Bedrock을 호출하여 이력서 내용 기반 질문 2개를 생성합니다."""
     try:
         # 1. resume_text (JSON 문자열)를 파이썬 딕셔너리로 파싱
@@ -85,77 +108,39 @@ def generate_resume_questions(resume_text):
         actual_experience = resume_data.get('jobPreference', {}).get('experienceLevel', '알 수 없음')
     except json.JSONDecodeError:
         print("[Error] 이력서 JSON 파싱 실패. 기본 프롬프트 사용.")
+        resume_data = None
         actual_major = "해당 전공"
         actual_desired_job = "지원 직무"
         actual_experience = "경력 수준"
 
-    # 3. 추출한 정보로 프롬프트 동적 생성
-    prompt = f"""Human: 당신은 지원자를 평가하는 면접관입니다. 다음은 지원자의 이력서 내용입니다.
-
-<resume_content>
-{resume_text}
-</resume_content>
-
-이 지원자는 **{actual_major}을(를) 전공**했으며 **{actual_desired_job}({actual_experience})**을(를) 희망하고 있습니다.
-이력서에 구체적인 프로젝트나 경력 사항은 부족할 수 있습니다.
-
-지원자의 **전공 지식, 학습 능력, 문제 해결 능력, 성장 가능성** 등을 파악할 수 있는 **기본적이면서도 의미 있는 질문 2개**를 생성해주세요.
-
-[규칙]
-1. 자기소개, 강점/약점 같은 너무 일반적인 질문은 제외합니다.
-2. **학력({actual_major})**이나 **희망 직무({actual_desired_job})**와 관련된 질문을 우선적으로 고려합니다.
-3. 질문 앞에 번호(1., 2.)를 붙여주세요.
-4. 질문 외 다른 설명은 하지 마세요.
-5. 반드시 다음 JSON 배열 형식으로만 대답해 주세요. 다른 설명은 모두 제외하고 JSON 코드만 반환해야 합니다.
-[
-  {{ "id": "q_resume_1", "text": "첫 번째 질문 내용" }},
-  {{ "id": "q_resume_2", "text": "두 번째 질문 내용" }}
-]
-
-Assistant:
-"""
+    # 3. 추출한 정보로 프롬프트 생성 (이력서는 빈 값/개인정보 필드를 뺀 압축 JSON, 예산 초과 시 이력서 뒷부분부터 잘림)
+    if resume_data is not None:
+        resume_section = promptCompiler.section(promptCompiler.project_resume(resume_data), priority=1, raw=resume_text)
+    else: # 이력서 JSON 파싱 실패 시 원문을 공백만 정리해서 사용
+        resume_section = promptCompiler.section(resume_text, priority=1)
+    prompt, _ = RESUME_PROMPT.render(resume=resume_section, major=actual_major,
+                                     desired_job=actual_desired_job, experience=actual_experience)
     try:
-        bedrock_request_body = {
-            "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 500,
-            "messages": [{"role": "user", "content": [{"type": "text", "text": prompt}]}]
-        }
-        # --- 👈 [수정] Guardrail 파라미터 주석 처리 ---
-        response = bedrock_runtime.invoke_model(
-            body=json.dumps(bedrock_request_body),
-            modelId=MODEL_ID,
-            accept='application/json',
-            contentType='application/json'
-            # guardrailIdentifier="gi0pmpvfbz8t",       # 👈 주석 처리
-            # guardrailVersion="DRAFT"                  # 👈 주석 처리
-        )
-        response_body = json.loads(response.get('body').read())
-        generated_text = response_body['content'][0]['text']
-
-        # 생성된 텍스트가 JSON 형식이 맞는지 확인 후 파싱
-        generated_questions = json.loads(generated_text)
+        # 스키마에 맞는 JSON을 추출 (서두/```json 펜스 허용, 실패 시에만 복구 요청)
+        generated_questions, _ = modelCascade.invoke_json(
+            'resume_questions', prompt, RESUME_QUESTIONS_SCHEMA, MODEL_ID, max_tokens=500,
+            region=BEDROCK_REGION, job_id=job_id)
         print(f"[Info] Bedrock이 생성한 이력서 질문: {generated_questions}")
-
-        # 간단한 형식 검증
-        if isinstance(generated_questions, list) and len(generated_questions) > 0 and 'id' in generated_questions[0] and 'text' in generated_questions[0]:
-            return generated_questions[:2] # 최대 2개 반환
-        else:
-            print("[Error] Bedrock 이력서 질문 응답 형식이 예상과 다릅니다.")
-            return []
-    except json.JSONDecodeError as json_err:
+        return generated_questions[:2] # 최대 2개 반환
+    except jsonExtract.JSONExtractionError as json_err:
         print(f"[Error] Bedrock 이력서 질문 JSON 파싱 실패: {json_err}")
-        # Bedrock 원본 응답도 함께 로깅하면 디버깅에 도움됨
-        try:
-             print(f"Bedrock 원본 응답 (파싱 실패): {generated_text}")
-        except NameError: # generated_text 변수가 정의되기 전에 에러난 경우
-             pass
         return []
     except Exception as e:
         print(f"[Error] Bedrock 이력서 질문 생성 실패: {e}")
         return []
 
 # --- 메인 Lambda 핸들러 함수 ---
+@metrics.handler('generate-custom-questions')
 def lambda_handler(event, context):
+    # 여러 레코드(S3 배치 알림, SQS 배치)는 모두 처리하고 실패한 항목만 보고
+    if batchRecords.is_batch_event(event):
+        return batchRecords.process_batch(event, process_object)
+
     try:
         # 1. S3 이벤트 정보 추출
         bucket = event['Records'][0]['s3']['bucket']['name']
@@ -164,6 +149,18 @@ def lambda_handler(event, context):
         print(f"[Error] S3 이벤트 파싱 오류: {e}")
         return {'statusCode': 400, 'body': 'S3 이벤트 파싱 오류'}
 
+    return process_object(bucket, key)
+
+# --- S3 객체 하나 처리 ---
+def _job_id(response):
+    """캐스케이드 지표에 붙일 채용 공고 ID (사용자 메타데이터 job-id, 없으면 None → 'unknown'으로 집계).
+
+    지표 라벨 용도일 뿐이므로 메타데이터가 없어도 처리는 그대로 진행한다.
+    """
+    return response.get('Metadata', {}).get(incrementalScoring.JOB_ID_METADATA_KEY)
+
+def process_object(bucket, key):
+    """채용 공고/이력서 파일 하나로 질문을 생성해 S3에 저장합니다."""
     print(f"[Info] 감지된 버킷: {bucket}, 파일: {key}")
 
     output_key = "N/A" # 결과 파일 경로 초기화
@@ -176,6 +173,7 @@ def lambda_handler(event, context):
         try:
             # S3에서 파일 읽기
             response = s3_client.get_object(Bucket=bucket, Key=key)
+            job_id = _job_id(response)
             content = response['Body'].read().decode('utf-8')
             job_posting_data = json.loads(content)
             ideal_candidate_text = job_posting_data.get('idealCandidate')
@@ -185,7 +183,8 @@ def lambda_handler(event, context):
                 return {'statusCode': 400, 'body': "'idealCandidate' 필드 누락"}
 
             # Bedrock 호출
-            generated_questions = generate_job_posting_questions(ideal_candidate_text)
+            generated_questions = generate_job_posting_questions(
+                ideal_candidate_text, job_id=job_id)
 
             # 결과 저장
             if generated_questions:
@@ -211,12 +210,14 @@ def lambda_handler(event, context):
         try:
             # S3에서 파일 읽기
             response = s3_client.get_object(Bucket=bucket, Key=key)
+            job_id = _job_id(response)
             content = response['Body'].read().decode('utf-8')
             # resume_data = json.loads(content) # resume_text_for_prompt 만 필요하므로 파싱 생략 가능
             resume_text_for_prompt = content # JSON 문자열 그대로 사용
 
             # Bedrock 호출
-            generated_questions = generate_resume_questions(resume_text_for_prompt)
+            generated_questions = generate_resume_questions(
+                resume_text_for_prompt, job_id=job_id)
 
             # 결과 저장
             if generated_questions:
@@ -244,5 +245,8 @@ def lambda_handler(event, context):
     # --- 3. 최종 성공 응답 ---
     return {
         'statusCode': 200,
-        'body': json.dumps(f'S3 파일({key}) 처리 완료. 생성된 질문 파일: {output_key if generated_questions else "없음"}')
+        'body': json.dumps(f'S3 파일({key}) 처리 완료. 생성된 질문 파일: {output_key if generated_questions else "없음"}'),
+        'outputKey': output_key if generated_questions else None # 일괄 처리(bulkIngest)에서 성공 여부 확인용
     }
+
+awsClients.prime_on_init()
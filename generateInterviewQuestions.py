@@ -1,12 +1,14 @@
 # lambda_function.py
 import json
-import boto3
-import os
+import attributeCodec
+import awsClients
+import metrics
+import questionBank
 
-bedrock_runtime = boto3.client('bedrock-runtime', region_name='us-east-1')
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table(os.environ['DYNAMODB_TABLE'])
+bedrock_runtime = awsClients.lazy_client('bedrock-runtime', region_name='us-east-1')
+table = awsClients.lazy_table(env_var='DYNAMODB_TABLE')
 
+@metrics.handler('generateInterviewQuestions')
 def lambda_handler(event, context):
     # 1. API Gateway로부터 job_posting_id와 기업 지정 질문 받기
     path_params = event.get('pathParameters', {})
@@ -21,7 +23,7 @@ def lambda_handler(event, context):
     if not item:
         return {'statusCode': 404, 'body': 'Job posting not found'}
 
-    core_competencies = item['analysis']['core_competencies']
+    core_competencies = attributeCodec.decode(item['analysis'])['core_competencies']
 
     # 3. LLM에 질문 생성을 요청하는 프롬프트 구성
     prompt = f"""
@@ -55,13 +57,14 @@ def lambda_handler(event, context):
     ]
     # --- 예시 데이터 끝 ---
 
-    # 5. DynamoDB에 기업 지정 질문과 AI 생성 질문 업데이트
+    # 5. DynamoDB에 기업 지정 질문과 AI 생성 질문 업데이트 (질문 뱅크 버전도 함께 올림, 큰 목록은 압축 저장)
     table.update_item(
         Key={'job_posting_id': job_posting_id},
-        UpdateExpression="SET company_questions = :c, generated_questions = :g",
+        UpdateExpression="SET company_questions = :c, generated_questions = :g " + questionBank.BUMP_VERSION_EXPRESSION,
         ExpressionAttributeValues={
-            ':c': company_questions,
-            ':g': generated_questions
+            ':c': attributeCodec.encode(company_questions),
+            ':g': attributeCodec.encode(generated_questions),
+            **questionBank.BUMP_VERSION_VALUES
         }
     )
 
@@ -69,3 +72,5 @@ def lambda_handler(event, context):
         'statusCode': 200,
         'body': json.dumps({'message': 'Questions generated and saved successfully'})
     }
+
+awsClients.prime_on_init()
@@ -1,29 +1,80 @@
 import json
-import boto3
+import os
+import random
+import time
+import awsClients
+import metrics
 
-dynamodb = boto3.resource('dynamodb')
-tasks_table = dynamodb.Table('Interview_Tasks')
+tasks_table = awsClients.lazy_table('Interview_Tasks')
 
+# 롱 폴링 설정: ?wait=초 로 요청하면 질문이 준비될 때까지 서버에서 기다림 (API Gateway 29초 제한 고려)
+LONG_POLL_MAX_SECONDS = float(os.environ.get('LONG_POLL_MAX_SECONDS', '20'))
+LONG_POLL_INITIAL_DELAY = float(os.environ.get('LONG_POLL_INITIAL_DELAY', '0.1'))
+LONG_POLL_MAX_DELAY = float(os.environ.get('LONG_POLL_MAX_DELAY', '1.0'))
+LAMBDA_TIMEOUT_MARGIN_MS = 1000  # Lambda 제한 시간 전에 여유를 두고 응답
+
+def claim_question(execution_arn):
+    """준비된 질문이 있으면 가져가며 삭제하고, 없으면 None을 반환합니다.
+
+    빈 폴링마다 쓰기 용량을 쓰지 않도록 먼저 읽고(최종 일관성 읽기), 질문이 있을 때만
+    읽은 taskToken 조건으로 삭제합니다 (ReturnValues=ALL_OLD). 동시에 여러 요청이 와도 조건부 삭제에
+    성공하는 것은 하나뿐이라 같은 질문이 두 번 전달되지 않습니다.
+    """
+    from botocore.exceptions import ClientError
+    item = tasks_table.get_item(Key={'executionArn': execution_arn}, ProjectionExpression='taskToken').get('Item')
+    if not item:
+        return None
+    try:
+        response = tasks_table.delete_item(
+            Key={'executionArn': execution_arn},
+            ConditionExpression='taskToken = :t',
+            ExpressionAttributeValues={':t': item['taskToken']},
+            ReturnValues='ALL_OLD'
+        )
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+            raise
+        return None  # 다른 요청이 먼저 가져갔거나 새 질문으로 바뀜 → 다음 폴링에서 다시 확인
+    return response.get('Attributes')
+
+def _wait_seconds(event, context):
+    params = event.get('queryStringParameters') or {}
+    try:
+        wait = min(max(float(params.get('wait', 0)), 0.0), LONG_POLL_MAX_SECONDS)
+    except (TypeError, ValueError):
+        wait = 0.0
+    if context is not None and hasattr(context, 'get_remaining_time_in_millis'):
+        wait = min(wait, max(0.0, (context.get_remaining_time_in_millis() - LAMBDA_TIMEOUT_MARGIN_MS) / 1000.0))
+    return wait
+
+@metrics.handler('getCurrentQuestion')
 def lambda_handler(event, context):
     # API 경로에서 executionArn을 가져옴 (예: /interviews/arn:...)
     execution_arn = event['pathParameters']['executionArn']
 
-    response = tasks_table.get_item(Key={'executionArn': execution_arn})
-
-    if 'Item' in response:
-        item = response['Item']
-        # 한 번 전달한 질문은 다시 전달하지 않도록 테이블에서 삭제
-        tasks_table.delete_item(Key={'executionArn': execution_arn})
-        return {
-            'statusCode': 200,
-            'body': json.dumps({
-                'question': item['question'],
-                'taskToken': item['taskToken'] # 프론트엔드가 답변 제출 시 사용할 열쇠
-            })
-        }
-    else:
-        # 아직 Step Functions가 질문을 준비하지 못함
-        return {
-            'statusCode': 204, # No Content
-            'body': json.dumps({'message': 'Question not ready yet. Please wait.'})
-        }
+    deadline = time.monotonic() + _wait_seconds(event, context)
+    delay = LONG_POLL_INITIAL_DELAY
+    while True:
+        item = claim_question(execution_arn)
+        if item:
+            return {
+                'statusCode': 200,
+                'body': json.dumps({
+                    'question': item['question'],
+                    'taskToken': item['taskToken'] # 프론트엔드가 답변 제출 시 사용할 열쇠
+                })
+            }
+        # prepareQuestion이 질문을 쓸 때까지 지수 백오프(+jitter)로 대기, 기한을 넘기면 중단
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        time.sleep(min(remaining, delay * random.uniform(0.5, 1.0)))
+        delay = min(delay * 2, LONG_POLL_MAX_DELAY)
+
+    # 아직 Step Functions가 질문을 준비하지 못함
+    return {
+        'statusCode': 204, # No Content
+        'body': json.dumps({'message': 'Question not ready yet. Please wait.'})
+    }
+
+awsClients.prime_on_init()
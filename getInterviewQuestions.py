@@ -1,20 +1,36 @@
 import json
-import boto3
+import awsClients
+import interviewState
+import metrics
+import questionBank
 
-dynamodb = boto3.resource('dynamodb')
-postings_table = dynamodb.Table('AI_Interview_Data')
+def assemble_questions(job_posting_id):
+    """공고의 기업 지정 질문 뒤에 AI 생성 질문을 붙여 면접 질문 목록을 만듭니다.
 
+    질문 뱅크는 웜 인보크 캐시에서 가져오고, bank_version이 바뀐 경우에만 다시 읽습니다.
+    """
+    bank = questionBank.get_bank(job_posting_id)
+
+    company_q = bank['company_questions']
+    generated_q_dicts = bank['generated_questions']
+    generated_q = [q['question'] for q in generated_q_dicts]
+
+    return company_q + generated_q
+
+@metrics.handler('getInterviewQuestions')
 def lambda_handler(event, context):
     job_posting_id = event['job_posting_id']
 
-    response = postings_table.get_item(Key={'job_posting_id': job_posting_id})
-    item = response.get('Item', {})
+    all_questions = assemble_questions(job_posting_id)
 
-    company_q = item.get('company_questions', [])
-    generated_q_dicts = item.get('generated_questions', [])
-    generated_q = [q['question'] for q in generated_q_dicts]
-
-    all_questions = company_q + generated_q
+    # 클레임 체크 모드: 질문 목록은 DynamoDB에 두고 상태에는 참조만 전달 (256KB 상태 제한 회피)
+    if interviewState.CLAIM_CHECK_MODE:
+        return {
+            'job_posting_id': job_posting_id,
+            'state_ref': interviewState.create(job_posting_id, all_questions),
+            'question_count': len(all_questions),
+            'current_index': 0
+        }
 
     # Step Functions에 전달할 결과물
     return {
@@ -24,3 +40,5 @@ def lambda_handler(event, context):
         'answers': [],
         'current_index': 0
     }
+
+awsClients.prime_on_init()
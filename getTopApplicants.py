@@ -0,0 +1,39 @@
+import json
+import awsClients
+import metrics
+import scoreRanking
+
+# GET /jobs/{jobId}/top-applicants?limit=20&cursor=...
+# InterviewScores의 점수 정렬 GSI를 쿼리 한 번으로 읽어 상위 지원자를 반환한다 (테이블 스캔/클라이언트 정렬 없음).
+
+
+def _response(status_code, body):
+    return {
+        'statusCode': status_code,
+        'headers': {'Content-Type': 'application/json'},
+        'body': json.dumps(body, ensure_ascii=False)
+    }
+
+
+@metrics.handler('getTopApplicants')
+def lambda_handler(event, context):
+    # 1. 파라미터 추출
+    params = event.get('queryStringParameters') or {}
+    job_id = (event.get('pathParameters') or {}).get('jobId') or params.get('jobId')
+    if not job_id:
+        return _response(400, {'error': 'jobId is required.'})
+    try:
+        limit = int(params.get('limit', 20))
+    except ValueError:
+        return _response(400, {'error': 'limit must be an integer.'})
+
+    # 2. 순위 쿼리
+    try:
+        result = scoreRanking.top_applicants(job_id, limit=limit, cursor=params.get('cursor'))
+    except ValueError as e:  # 잘리거나 조작된 cursor (scoreRanking.decode_cursor에서 검증)
+        return _response(400, {'error': f'잘못된 cursor: {e}'})
+
+    print(f"[Info] 상위 지원자 조회: jobId={job_id}, {len(result['items'])}명")
+    return _response(200, dict(result, jobId=job_id))
+
+awsClients.prime_on_init()
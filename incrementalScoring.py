@@ -0,0 +1,184 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import answerBundle
+import modelCascade
+import promptCompiler
+
+# 답변별 점진 채점
+# - processAnswerUpload: _answer.txt가 올라올 때마다 그 답변 하나만 채점해 세션 답변 번들 항목에 partial_score로 저장
+#   (답변 객체의 사용자 메타데이터 job-id(x-amz-meta-job-id)로 채용 공고를 찾는다. 없으면 건너뜀)
+# - calculate-scores(_END.txt): 저장된 답변별 점수를 합산하고 총평만 짧게 한 번 생성
+#   아직 점수가 없는 답변이 INCREMENTAL_MAX_BACKFILL 개 이하면 그 자리에서 동시에 채점하고,
+#   그보다 많으면 None을 돌려 기존 방식(전체 답변 한 번에 채점)으로 처리하게 한다.
+# - 합산 총점은 답변별 점수의 평균이라 기존 전체 채점의 총점(답변 전체를 보고 매긴 점수)과 기준이 다르므로
+#   INCREMENTAL_SCORING=1 로 명시적으로 켤 때만 사용한다.
+
+INCREMENTAL_SCORING = os.environ.get('INCREMENTAL_SCORING', '0') == '1'
+INCREMENTAL_MAX_BACKFILL = int(os.environ.get('INCREMENTAL_MAX_BACKFILL', '3'))
+SCORING_MODEL_ID = os.environ.get('SCORING_MODEL_ID', "us.anthropic.claude-3-7-sonnet-20250219-v1:0")  # 프롬프트 캐시 지원 모델
+BEDROCK_REGION = "us-east-1"
+JOB_ID_METADATA_KEY = 'job-id'
+JOB_POSTING_CACHE_TTL = int(os.environ.get('JOB_POSTING_CACHE_TTL', '300'))
+
+# 답변 하나 채점 (공고 기준 부분은 같은 jobId의 모든 답변이 공유하는 캐시 접두부)
+ANSWER_PREFIX = promptCompiler.PromptTemplate('answer_scoring_prefix', """Human: 당신은 채용 공고 기준으로 면접 답변 하나를 평가하는 전문 HR 평가자입니다.
+아래 <채용공고 기준>과 뒤에 이어지는 <답변>을 엄격하게 비교하여, 다른 설명 없이 다음 JSON만 출력하세요.
+
+<채용공고 기준>
+{criteria}
+</채용공고 기준>
+
+[출력 형식]
+{{
+  "score": "이 답변의 100점 만점 점수 (숫자만 입력)",
+  "ideal_candidate_fit": "인재상 적합도 (1에서 5 사이 숫자만 입력)",
+  "job_description_fit": "직무 적합도 (1에서 5 사이 숫자만 입력)",
+  "strength": "이 답변에서 드러난 강점 한 문장",
+  "weakness": "이 답변의 약점 또는 부족한 점 한 문장"
+}}
+""", budget=int(os.environ.get('SCORING_PREFIX_TOKEN_BUDGET', '20000')))
+ANSWER_SUFFIX = promptCompiler.PromptTemplate('answer_scoring', """
+<답변 id="{question_id}">
+{answer}
+</답변>
+
+Assistant:
+""", budget=int(os.environ.get('ANSWER_PROMPT_TOKEN_BUDGET', '4000')))
+ANSWER_SCORE_SCHEMA = {
+    'type': 'object',
+    'required': ['score', 'ideal_candidate_fit', 'job_description_fit', 'strength', 'weakness'],
+    'properties': {
+        'score': {'type': ['string', 'number']},
+        'ideal_candidate_fit': {'type': ['string', 'number']},
+        'job_description_fit': {'type': ['string', 'number']},
+    }
+}
+
+# 총평 (답변별 요약만 보내므로 짧은 호출)
+SYNTHESIS_PROMPT = promptCompiler.PromptTemplate('scoring_synthesis', """Human: 아래는 한 지원자의 면접 답변별 평가 요약과 합산 점수입니다.
+채용공고 기준에 비추어 지원자 전체에 대한 총평을 다른 설명 없이 다음 JSON으로만 작성하세요.
+{{"overall_comment": "1~2줄 요약 평가", "strengths": "강점 1~2가지 요약", "weaknesses": "약점 1~2가지 요약"}}
+
+<채용공고 기준>
+{criteria}
+</채용공고 기준>
+
+<답변별 평가>
+{answer_notes}
+</답변별 평가>
+
+합산 총점: {overall_score}
+
+Assistant:
+""", budget=int(os.environ.get('SYNTHESIS_PROMPT_TOKEN_BUDGET', '6000')))
+SYNTHESIS_SCHEMA = {
+    'type': 'object',
+    'required': ['overall_comment', 'strengths', 'weaknesses'],
+}
+
+_lock = threading.Lock()
+_job_postings = {}  # (bucket, job_id) -> (만료 시각, 공고 dict)
+
+
+def build_criteria(job_posting_data):
+    """채점 프롬프트에 넣는 채용공고 기준 텍스트."""
+    return f"""
+    - 인재상(idealCandidate): {job_posting_data.get('idealCandidate', 'N/A')}
+    - 주요 업무(jobDescription): {job_posting_data.get('jobDescription', 'N/A')}
+    - 자격 요건(qualifications): {job_posting_data.get('qualifications', 'N/A')}
+    """
+
+
+def load_job_posting(s3_client, bucket, job_id):
+    """job-postings/{job_id}를 읽습니다 (웜 인보크 사이에 JOB_POSTING_CACHE_TTL 초 동안 재사용)."""
+    now = time.time()
+    with _lock:
+        cached = _job_postings.get((bucket, job_id))
+    if cached and cached[0] > now:
+        return cached[1]
+    response = s3_client.get_object(Bucket=bucket, Key=f"job-postings/{job_id}")
+    job_posting_data = json.loads(response['Body'].read().decode('utf-8'))
+    with _lock:
+        _job_postings[(bucket, job_id)] = (now + JOB_POSTING_CACHE_TTL, job_posting_data)
+    return job_posting_data
+
+
+def _number(value):
+    return float(str(value).split('점')[0].strip())
+
+
+def score_answer(job_id, job_posting_data, question_id, answer):
+    """답변 하나를 채점해 partial_score dict를 반환합니다."""
+    prefix, _ = ANSWER_PREFIX.render(criteria=promptCompiler.section(build_criteria(job_posting_data), priority=1))
+    prompt, _ = ANSWER_SUFFIX.render(question_id=promptCompiler.section(question_id),
+                                     answer=promptCompiler.section(answer, priority=1))
+    result, info = modelCascade.invoke_json('answer_score', prompt, ANSWER_SCORE_SCHEMA, SCORING_MODEL_ID,
+                                            max_tokens=400, region=BEDROCK_REGION, job_id=job_id,
+                                            cache_prefix=prefix)
+    return {
+        'score': _number(result['score']),
+        'ideal_candidate_fit': _number(result['ideal_candidate_fit']),
+        'job_description_fit': _number(result['job_description_fit']),
+        'strength': result['strength'],
+        'weakness': result['weakness'],
+        'model_id': info['model_id'],
+    }
+
+
+def score_and_store(s3_client, bucket, session_id, answer_key, answer_text, job_id):
+    """답변 하나를 채점해 번들 항목에 저장합니다. 답변이 그 사이 바뀌었으면 False."""
+    job_posting_data = load_job_posting(s3_client, bucket, job_id)
+    partial = score_answer(job_id, job_posting_data, answerBundle.question_id_from_key(answer_key), answer_text)
+    stored = answerBundle.annotate(s3_client, bucket, session_id, answer_key, answer_text, partial_score=partial)
+    print(f"[Info] 답변별 채점 {'저장' if stored else '건너뜀 (답변 변경됨)'}: {answer_key} -> {partial['score']}")
+    return stored
+
+
+def _round(value, digits=1):
+    return round(value, digits) if value != int(value) else int(value)
+
+
+def aggregate(partials):
+    """답변별 점수를 총점/적합도 평균으로 합칩니다."""
+    count = len(partials)
+    return {
+        'overall_score': _round(sum(p['score'] for p in partials) / count),
+        'suitability_score': {
+            'ideal_candidate_fit': _round(sum(p['ideal_candidate_fit'] for p in partials) / count),
+            'job_description_fit': _round(sum(p['job_description_fit'] for p in partials) / count),
+        },
+    }
+
+
+def build_report(job_id, job_posting_data, answers):
+    """저장된 답변별 점수로 최종 리포트를 만듭니다. 점수 없는 답변이 너무 많으면 None.
+
+    answers: calculate-scores.load_answers 결과 ({'id', 'answer', 'partial_score'(있으면)})
+    """
+    missing = [a for a in answers if not a.get('partial_score')]
+    if not answers or len(missing) > INCREMENTAL_MAX_BACKFILL:
+        print(f"[Info] 답변별 점수 부족 ({len(answers) - len(missing)}/{len(answers)}): 전체 채점으로 처리")
+        return None
+    if missing:
+        print(f"[Info] 점수 없는 답변 {len(missing)}개를 바로 채점합니다.")
+        with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+            scored = executor.map(lambda a: score_answer(job_id, job_posting_data, a['id'], a['answer']), missing)
+            for answer, partial in zip(missing, scored):
+                answer['partial_score'] = partial
+
+    partials = [a['partial_score'] for a in answers]
+    report = aggregate(partials)
+    answer_notes = "\n".join(f"- {a['id']} ({a['partial_score']['score']}점): 강점 {a['partial_score']['strength']}"
+                             f" / 약점 {a['partial_score']['weakness']}" for a in answers)
+    prompt, _ = SYNTHESIS_PROMPT.render(criteria=promptCompiler.section(build_criteria(job_posting_data), priority=2),
+                                        answer_notes=promptCompiler.section(answer_notes, priority=1),
+                                        overall_score=report['overall_score'])
+    synthesis, _ = modelCascade.invoke_json('scoring_synthesis', prompt, SYNTHESIS_SCHEMA, SCORING_MODEL_ID,
+                                            max_tokens=500, region=BEDROCK_REGION, job_id=job_id)
+    report.update(overall_comment=synthesis['overall_comment'], strengths=synthesis['strengths'],
+                  weaknesses=synthesis['weaknesses'], scoring_mode='incremental',
+                  answer_scores=[dict(a['partial_score'], id=a['id']) for a in answers])
+    return report
@@ -0,0 +1,64 @@
+import os
+import time
+import uuid
+import awsClients
+
+# 클레임 체크 모드: 질문/답변은 DynamoDB에 두고 Step Functions 상태에는 참조(state_ref)와 인덱스만 싣는다.
+CLAIM_CHECK_MODE = os.environ.get('CLAIM_CHECK_MODE', '0') == '1'
+INTERVIEW_STATE_TABLE = os.environ.get('INTERVIEW_STATE_TABLE', 'Interview_State')  # PK: state_id, TTL 속성: expires_at
+INTERVIEW_STATE_TTL_SECONDS = int(os.environ.get('INTERVIEW_STATE_TTL_SECONDS', str(7 * 24 * 3600)))
+
+state_table = awsClients.lazy_table(INTERVIEW_STATE_TABLE)
+
+
+def is_claim_check(state):
+    """Step Functions 상태가 클레임 체크 형식(state_ref 보유)인지 여부."""
+    return 'state_ref' in state
+
+
+def create(job_posting_id, questions):
+    """질문 목록을 저장하고 상태에 실을 참조 ID를 반환합니다."""
+    state_id = str(uuid.uuid4())
+    state_table.put_item(Item={
+        'state_id': state_id,
+        'job_posting_id': job_posting_id,
+        'questions': questions,
+        'answers': [],
+        'expires_at': int(time.time()) + INTERVIEW_STATE_TTL_SECONDS
+    })
+    return state_id
+
+
+def get_question(state_id, index):
+    """index번째 질문 하나만 읽습니다 (ProjectionExpression으로 목록 전체를 가져오지 않음)."""
+    response = state_table.get_item(
+        Key={'state_id': state_id},
+        ProjectionExpression=f"questions[{int(index)}]",
+        ConsistentRead=True
+    )
+    return response['Item']['questions'][0]
+
+
+def append_answer(state_id, index, answer):
+    """index번째 답변을 추가합니다.
+
+    답변 수가 index와 같을 때만 추가하므로 saveAnswer가 재시도되어도 중복 저장되지 않습니다.
+    """
+    from botocore.exceptions import ClientError
+    try:
+        state_table.update_item(
+            Key={'state_id': state_id},
+            UpdateExpression="SET answers = list_append(answers, :a)",
+            ConditionExpression="size(answers) = :i",
+            ExpressionAttributeValues={':a': [answer], ':i': int(index)}
+        )
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+            raise
+        print(f"[Info] 이미 저장된 답변 (state={state_id}, index={index}) - 건너뜀")
+
+
+def load(state_id):
+    """저장된 전체 면접 기록(질문/답변)을 읽습니다."""
+    response = state_table.get_item(Key={'state_id': state_id}, ConsistentRead=True)
+    return response['Item']
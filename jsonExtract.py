@@ -0,0 +1,217 @@
+import json
+import os
+
+import llmGateway
+import metrics
+
+# --- 기본 설정 ---
+# 추출이 정말 실패했을 때만 쓰는 저렴한 복구(re-ask) 모델
+JSON_REPAIR_MODEL_ID = os.environ.get('JSON_REPAIR_MODEL_ID', 'anthropic.claude-3-haiku-20240307-v1:0')
+
+_decoder = json.JSONDecoder()
+
+
+class JSONExtractionError(ValueError):
+    """LLM 출력에서 스키마에 맞는 JSON 값을 찾지 못함."""
+
+
+# --- 스키마 검증 (JSON Schema의 작은 부분집합: type/required/properties/items/minItems) ---
+_TYPES = {
+    'object': dict, 'array': list, 'string': str, 'boolean': bool,
+    'number': (int, float), 'integer': int,
+}
+
+
+def validate(value, schema, path='$'):
+    """스키마 위반 목록을 반환합니다 (비어 있으면 통과)."""
+    if not schema:
+        return []
+    errors = []
+    expected = schema.get('type')
+    if expected:
+        types = expected if isinstance(expected, list) else [expected]
+        ok = any(isinstance(value, _TYPES[t]) and not (t in ('number', 'integer') and isinstance(value, bool))
+                 for t in types)
+        if not ok:
+            return [f"{path}: {'/'.join(types)} 타입이어야 합니다."]
+    if isinstance(value, dict):
+        for name in schema.get('required', []):
+            if name not in value:
+                errors.append(f"{path}.{name}: 필수 필드가 없습니다.")
+        for name, sub_schema in schema.get('properties', {}).items():
+            if name in value:
+                errors.extend(validate(value[name], sub_schema, f"{path}.{name}"))
+    if isinstance(value, list):
+        if len(value) < schema.get('minItems', 0):
+            errors.append(f"{path}: 항목이 최소 {schema['minItems']}개 필요합니다.")
+        if 'items' in schema:
+            for i, item in enumerate(value):
+                errors.extend(validate(item, schema['items'], f"{path}[{i}]"))
+    return errors
+
+
+# --- 추출 ---
+def iter_json_values(text):
+    """텍스트에서 완결된 JSON 객체/배열 후보를 앞에서부터 차례로 yield 합니다."""
+    index = 0
+    while True:
+        starts = [i for i in (text.find('{', index), text.find('[', index)) if i != -1]
+        if not starts:
+            return
+        start = min(starts)
+        try:
+            value, end = _decoder.raw_decode(text, start)
+        except json.JSONDecodeError:
+            index = start + 1
+            continue
+        yield value
+        index = end
+
+
+def find_json(text, schema=None):
+    """스키마를 통과하는 첫 번째 JSON 값을 반환합니다. 없으면 JSONExtractionError."""
+    last_errors = []
+    for value in iter_json_values(text or ''):
+        errors = validate(value, schema)
+        if not errors:
+            return value
+        last_errors = errors
+    detail = f" (스키마 위반: {'; '.join(last_errors[:3])})" if last_errors else ''
+    raise JSONExtractionError(f"응답에서 유효한 JSON을 찾을 수 없습니다{detail}")
+
+
+class IncrementalExtractor:
+    """스트리밍 조각을 받으면서 첫 번째 완결 JSON 값이 닫히는 즉시 반환합니다."""
+
+    def __init__(self, schema=None):
+        self.schema = schema
+        self.buffer = ''
+        self.value = None
+        self.done = False
+        self._reset_scan(0)
+
+    def _reset_scan(self, position):
+        self._pos = position
+        self._start = None
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk):
+        """조각을 추가합니다. 값이 완성되면 그 값을, 아니면 None을 반환합니다."""
+        if self.done:
+            return self.value
+        self.buffer += chunk
+        text = self.buffer
+        while self._pos < len(text):
+            ch = text[self._pos]
+            self._pos += 1
+            if self._start is None:
+                if ch in '{[':
+                    self._start = self._pos - 1
+                    self._stack = [ch]
+                continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in '{[':
+                self._stack.append(ch)
+            elif ch in '}]':
+                opener = self._stack.pop() if self._stack else None
+                if (opener, ch) not in (('{', '}'), ('[', ']')):
+                    self._reset_scan(self._start + 1)  # 괄호 짝이 안 맞으면 다음 후보부터 다시
+                    continue
+                if not self._stack:
+                    candidate = text[self._start:self._pos]
+                    try:
+                        value = json.loads(candidate)
+                    except json.JSONDecodeError:
+                        value = None
+                    if value is not None and not validate(value, self.schema):
+                        self.value, self.done = value, True
+                        return value
+                    self._reset_scan(self._start + 1)
+        return None
+
+    def finish(self):
+        """스트림 종료 시 호출. 완성된 값이 없으면 전체 버퍼로 한 번 더 찾아봅니다."""
+        if self.done:
+            return self.value
+        return find_json(self.buffer, self.schema)
+
+
+# --- 지표 ---
+OUTCOMES = ('Direct', 'Extracted', 'Repaired', 'Failed')
+
+
+def _record(name, outcome):
+    """추출 한 번의 결과를 호출 지점별 EMF 지표로 남깁니다 (성공률/복구율은 Attempts 대비 합계로 계산)."""
+    values = dict({o: int(o == outcome) for o in OUTCOMES}, Attempts=1)
+    metrics.emit({'JsonExtract': name}, values, units={k: 'Count' for k in values})
+
+
+def extract(text, schema=None, name='default', repair=None):
+    """LLM 출력에서 스키마에 맞는 JSON 값을 꺼냅니다.
+
+    repair(text, error)가 주어지면 추출이 실패했을 때만 한 번 호출해 새 텍스트로 다시 시도합니다.
+    """
+    try:
+        value = json.loads(text)
+        if not validate(value, schema):
+            _record(name, 'Direct')
+            return value
+    except (TypeError, ValueError):
+        pass
+    try:
+        value = find_json(text, schema)
+        _record(name, 'Extracted')
+        return value
+    except JSONExtractionError as e:
+        error = e
+    if repair is not None:
+        print(f"[Warn] JSON 추출 실패, 복구 요청 시도 ({name}): {error}")
+        try:
+            value = find_json(repair(text, error), schema)
+            _record(name, 'Repaired')
+            return value
+        except Exception as e:
+            error = JSONExtractionError(f"복구 후에도 JSON 추출 실패: {e}")
+    _record(name, 'Failed')
+    raise error
+
+
+def extract_stream(chunks, schema=None, name='default', repair=None):
+    """스트리밍 조각(iterable)을 읽으면서 JSON 값이 닫히는 즉시 반환합니다 (나머지 조각은 읽지 않음).
+
+    스트림이 끝날 때까지 값이 완성되지 않으면 모은 전체 텍스트로 extract()와 같은 처리(복구 포함)를 합니다.
+    """
+    extractor = IncrementalExtractor(schema)
+    for chunk in chunks:
+        value = extractor.feed(chunk)
+        if extractor.done:
+            _record(name, 'Direct' if extractor.buffer.strip().startswith(('{', '[')) else 'Extracted')
+            return value
+    return extract(extractor.buffer, schema, name=name, repair=repair)
+
+
+def bedrock_repairer(schema, region=None, model_id=None, max_tokens=1000):
+    """저렴한 모델에 '스키마에 맞는 JSON만 다시 출력'을 요청하는 repair 함수를 만듭니다."""
+    def _repair(text, error):
+        prompt = (
+            "Human: 아래 <output>은 JSON으로 응답해야 했지만 파싱에 실패한 텍스트입니다.\n"
+            f"오류: {error}\n"
+            f"<schema>{json.dumps(schema, ensure_ascii=False)}</schema>\n"
+            f"<output>\n{text}\n</output>\n"
+            "내용은 바꾸지 말고 스키마에 맞는 JSON 값만 출력하세요. 다른 설명은 붙이지 마세요.\n\n"
+            "Assistant:"
+        )
+        result = llmGateway.invoke_bedrock(prompt, model_id=model_id or JSON_REPAIR_MODEL_ID,
+                                           max_tokens=max_tokens, temperature=0, region=region)
+        return result['text']
+    return _repair
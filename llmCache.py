@@ -0,0 +1,207 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import awsClients
+
+# --- 기본 설정 ---
+# 둘 중 하나를 지정하면 해당 저장소를 사용하고, 둘 다 없으면 프로세스 메모리 캐시만 사용
+LLM_CACHE_TABLE = os.environ.get('LLM_CACHE_TABLE')        # DynamoDB 테이블 (PK: cache_key, TTL 속성: expires_at)
+LLM_CACHE_BUCKET = os.environ.get('LLM_CACHE_BUCKET')      # S3 버킷
+LLM_CACHE_PREFIX = os.environ.get('LLM_CACHE_PREFIX', 'llm-cache/')
+LLM_CACHE_TTL_SECONDS = int(os.environ.get('LLM_CACHE_TTL_SECONDS', str(7 * 24 * 3600)))
+LLM_CACHE_MEMORY_SIZE = int(os.environ.get('LLM_CACHE_MEMORY_SIZE', '256'))
+
+_lock = threading.Lock()
+_memory = OrderedDict()  # cache_key -> (expires_at, value), 웜 인보크 사이에서 재사용
+_store = None
+_stats = {'hits': 0, 'misses': 0, 'memory_hits': 0, 'store_hits': 0, 'expired': 0,
+          'writes': 0, 'invalidations': 0, 'errors': 0}
+
+
+# --- 키 생성 ---
+def normalize_prompt(prompt):
+    """들여쓰기/공백 차이만 있는 프롬프트가 같은 키가 되도록 정규화합니다."""
+    lines = [re.sub(r'[ \t]+', ' ', line).strip() for line in prompt.strip().splitlines()]
+    return re.sub(r'\n{3,}', '\n\n', '\n'.join(lines))
+
+
+def cache_key(model_id, prompt, params=None):
+    """(모델 ID, 정규화된 프롬프트, 추론 파라미터)의 SHA-256 해시."""
+    material = json.dumps({'model_id': model_id, 'prompt': normalize_prompt(prompt), 'params': params or {}},
+                          sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+# --- 저장소 ---
+class DynamoDBStore:
+    """DynamoDB 저장소. 테이블의 TTL 속성을 expires_at 으로 설정해 두면 만료 항목이 자동 삭제된다."""
+
+    def __init__(self, table_name):
+        self.table = awsClients.get_table(table_name)
+
+    def get(self, key):
+        item = self.table.get_item(Key={'cache_key': key}).get('Item')
+        if not item:
+            return None
+        return int(item['expires_at']), json.loads(item['value'])
+
+    def put(self, key, value, expires_at):
+        self.table.put_item(Item={'cache_key': key, 'value': json.dumps(value, ensure_ascii=False),
+                                  'expires_at': expires_at})
+
+    def delete(self, key):
+        self.table.delete_item(Key={'cache_key': key})
+
+
+class S3Store:
+    """S3 저장소. 만료 시각은 객체 본문에 함께 기록한다 (버킷 수명 주기 규칙으로 정리 권장)."""
+
+    def __init__(self, bucket, prefix):
+        self.s3 = awsClients.get_client('s3')
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def get(self, key):
+        from botocore.exceptions import ClientError
+        try:
+            response = self.s3.get_object(Bucket=self.bucket, Key=f"{self.prefix}{key}.json")
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('NoSuchKey', '404'):
+                return None
+            raise
+        record = json.loads(response['Body'].read().decode('utf-8'))
+        return int(record['expires_at']), record['value']
+
+    def put(self, key, value, expires_at):
+        self.s3.put_object(Bucket=self.bucket, Key=f"{self.prefix}{key}.json",
+                           Body=json.dumps({'expires_at': expires_at, 'value': value}, ensure_ascii=False),
+                           ContentType='application/json')
+
+    def delete(self, key):
+        self.s3.delete_object(Bucket=self.bucket, Key=f"{self.prefix}{key}.json")
+
+
+def get_store():
+    """환경 변수에 맞는 영구 저장소를 반환합니다 (없으면 None)."""
+    global _store
+    if _store is None:
+        if LLM_CACHE_TABLE:
+            _store = DynamoDBStore(LLM_CACHE_TABLE)
+        elif LLM_CACHE_BUCKET:
+            _store = S3Store(LLM_CACHE_BUCKET, LLM_CACHE_PREFIX)
+    return _store
+
+
+# --- 메모리 캐시 ---
+def _memory_get(key, now):
+    with _lock:
+        entry = _memory.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            del _memory[key]
+            return None
+        _memory.move_to_end(key)
+        return entry[1]
+
+
+def _memory_put(key, value, expires_at):
+    with _lock:
+        _memory[key] = (expires_at, value)
+        _memory.move_to_end(key)
+        while len(_memory) > LLM_CACHE_MEMORY_SIZE:
+            _memory.popitem(last=False)
+
+
+def _count(name):
+    with _lock:
+        _stats[name] += 1
+
+
+# --- 공개 API ---
+def get(key):
+    """캐시된 값을 반환합니다. 없거나 만료되었으면 None."""
+    now = int(time.time())
+    value = _memory_get(key, now)
+    if value is not None:
+        _count('hits'); _count('memory_hits')
+        return value
+    store = get_store()
+    if store is not None:
+        try:
+            record = store.get(key)
+        except Exception as e:
+            print(f"[Warn] LLM 캐시 조회 실패 (무시): {e}")
+            _count('errors')
+            record = None
+        if record is not None:
+            expires_at, value = record
+            if expires_at > now:
+                _memory_put(key, value, expires_at)
+                _count('hits'); _count('store_hits')
+                return value
+            _count('expired')
+    _count('misses')
+    return None
+
+
+def put(key, value, ttl_seconds=None):
+    expires_at = int(time.time()) + (LLM_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds)
+    _memory_put(key, value, expires_at)
+    store = get_store()
+    if store is not None:
+        try:
+            store.put(key, value, expires_at)
+        except Exception as e:
+            print(f"[Warn] LLM 캐시 저장 실패 (무시): {e}")
+            _count('errors')
+            return
+    _count('writes')
+
+
+def invalidate(key):
+    """캐시 항목을 명시적으로 삭제합니다."""
+    with _lock:
+        _memory.pop(key, None)
+    store = get_store()
+    if store is not None:
+        try:
+            store.delete(key)
+        except Exception as e:
+            print(f"[Warn] LLM 캐시 삭제 실패 (무시): {e}")
+            _count('errors')
+            return
+    _count('invalidations')
+
+
+def invalidate_for(model_id, prompt, params=None):
+    invalidate(cache_key(model_id, prompt, params))
+
+
+def cached_call(model_id, prompt, params, compute, ttl_seconds=None):
+    """캐시에 있으면 그 값을, 없으면 compute()를 호출해 저장한 뒤 반환합니다.
+
+    반환값: (value, hit 여부)
+    """
+    key = cache_key(model_id, prompt, params)
+    value = get(key)
+    if value is not None:
+        return value, True
+    value = compute()
+    put(key, value, ttl_seconds)
+    return value, False
+
+
+def get_stats():
+    """히트/미스 카운터 스냅샷 (hit_rate 포함)."""
+    with _lock:
+        stats = dict(_stats)
+        stats['memory_entries'] = len(_memory)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+    return stats
@@ -0,0 +1,369 @@
+import json
+import os
+import random
+import threading
+import time
+
+import awsClients
+import llmCache
+import metrics
+import promptCompiler
+
+# boto3/requests는 import 비용이 커서 실제 호출 경로에서만 불러온다 (콜드 스타트 단축)
+
+# --- 기본 설정 ---
+DEFAULT_BEDROCK_REGION = os.environ.get('BEDROCK_REGION', 'us-east-1')
+OPENAI_API_URL = os.environ.get('OPENAI_API_URL', 'https://api.openai.com/v1/chat/completions')
+LLM_POOL_SIZE = int(os.environ.get('LLM_POOL_SIZE', '16'))       # 호스트당 keep-alive 커넥션 수
+LLM_MAX_RETRIES = int(os.environ.get('LLM_MAX_RETRIES', '3'))    # 스로틀링 시 추가 재시도 횟수
+LLM_RETRY_BASE_DELAY = float(os.environ.get('LLM_RETRY_BASE_DELAY', '0.5'))
+LLM_RETRY_MAX_DELAY = float(os.environ.get('LLM_RETRY_MAX_DELAY', '8'))
+ANTHROPIC_VERSION = "bedrock-2023-05-31"
+# Bedrock 프롬프트 캐시(cache_control)를 지원하는 모델 ID 조각 (지원하지 않는 모델은 접두부를 그냥 이어 붙여 보냄)
+PROMPT_CACHE_MODELS = [m.strip() for m in os.environ.get(
+    'PROMPT_CACHE_MODELS', 'claude-3-5-haiku,claude-3-7-sonnet,claude-sonnet-4,claude-opus-4,claude-haiku-4'
+).split(',') if m.strip()]
+# 모델별 최소 캐시 길이(토큰). cache_control 지점까지가 이보다 짧으면 Bedrock이 캐시하지 않음 (오류 없이 무시)
+PROMPT_CACHE_MIN_TOKENS = {'claude-3-5-haiku': 2048, 'claude-haiku-4': 2048}
+PROMPT_CACHE_DEFAULT_MIN_TOKENS = 1024
+
+# 재시도 대상 오류
+RETRYABLE_BEDROCK_ERRORS = {
+    'ThrottlingException', 'TooManyRequestsException', 'ServiceUnavailableException',
+    'ModelNotReadyException', 'InternalServerException',
+}
+RETRYABLE_HTTP_STATUS = {429, 500, 502, 503, 504}
+
+# 웜 인보크 사이에 재사용되는 커넥션 풀 (핸들러 밖에 보관)
+_lock = threading.Lock()
+_http_session = None
+# Bedrock 호출 전후에 거치는 쿼터 제한기 (rateLimiter.QuotaLimiter 등, 없으면 제한 없음)
+_rate_limiter = None
+
+
+class LLMError(Exception):
+    """LLM 호출 실패. 상위 API 응답이 있으면 status_code/body를 함께 담는다."""
+
+    def __init__(self, message, status_code=None, body=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.body = body
+
+
+# --- 커넥션 풀 ---
+BEDROCK_CLIENT_CONFIG = {
+    'max_pool_connections': LLM_POOL_SIZE,
+    'tcp_keepalive': True,
+    'connect_timeout': 5,
+    'read_timeout': 120,
+    'retries': {'max_attempts': 1, 'mode': 'standard'},  # 재시도는 아래에서 직접 처리
+}
+
+
+def get_bedrock_client(region=None):
+    """리전별 bedrock-runtime 클라이언트를 한 번만 만들어 재사용합니다."""
+    return awsClients.get_client('bedrock-runtime', region or DEFAULT_BEDROCK_REGION, BEDROCK_CLIENT_CONFIG)
+
+
+def get_http_session():
+    """OpenAI 호출용 keep-alive requests 세션을 반환합니다."""
+    global _http_session
+    if _http_session is None:
+        with _lock:
+            if _http_session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=LLM_POOL_SIZE, max_retries=0)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _http_session = session
+    return _http_session
+
+
+# --- 쿼터 제한 ---
+def set_rate_limiter(limiter):
+    """모든 Bedrock 호출(재시도 포함)이 limiter.acquire(model_id, tokens)/settle(model_id, reserved, used)를 거치게 합니다.
+
+    None을 넘기면 해제하며, 이전 제한기를 반환합니다.
+    """
+    global _rate_limiter
+    previous, _rate_limiter = _rate_limiter, limiter
+    return previous
+
+
+def _used_tokens(payload):
+    usage = payload.get('usage') or {}
+    if 'input_tokens' not in usage:
+        return None  # 사용량을 알려 주지 않는 모델은 예약량을 그대로 사용
+    return sum(usage.get(name) or 0 for name in ('input_tokens', 'output_tokens', 'cache_read_input_tokens',
+                                                  'cache_creation_input_tokens'))
+
+
+# --- 재시도 ---
+def _backoff_delay(attempt):
+    """지수 백오프에 full jitter를 적용한 대기 시간(초)."""
+    return random.uniform(0, min(LLM_RETRY_MAX_DELAY, LLM_RETRY_BASE_DELAY * (2 ** attempt)))
+
+
+def _call_with_retry(call, is_retryable, max_retries):
+    attempt = 0
+    while True:
+        try:
+            return call()
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                raise
+            delay = _backoff_delay(attempt)
+            print(f"[Warn] LLM 호출 재시도 {attempt + 1}/{max_retries} ({delay:.2f}s 후): {e}")
+            time.sleep(delay)
+            attempt += 1
+
+
+def _is_retryable_bedrock_error(e):
+    from botocore.exceptions import ClientError
+    return isinstance(e, ClientError) and e.response.get('Error', {}).get('Code') in RETRYABLE_BEDROCK_ERRORS
+
+
+def _is_retryable_http_error(e):
+    import requests
+    if isinstance(e, LLMError):
+        return e.status_code in RETRYABLE_HTTP_STATUS
+    return isinstance(e, requests.ConnectionError)
+
+
+# --- Bedrock 요청/응답 정규화 ---
+def is_legacy_text_model(model_id):
+    """claude-v2 / claude-instant 처럼 Text Completions API를 쓰는 모델인지 여부."""
+    return model_id.startswith('anthropic.claude-v') or model_id.startswith('anthropic.claude-instant')
+
+
+def supports_prompt_cache(model_id):
+    return any(name in model_id for name in PROMPT_CACHE_MODELS)
+
+
+def prompt_cache_min_tokens(model_id):
+    return next((tokens for name, tokens in PROMPT_CACHE_MIN_TOKENS.items() if name in model_id),
+                PROMPT_CACHE_DEFAULT_MIN_TOKENS)
+
+
+_short_prefix_logged = set()  # 같은 모델/접두부 길이 안내를 컨테이너당 한 번만
+
+
+def _log_short_prefix(model_id, cache_prefix):
+    """접두부가 최소 캐시 길이보다 짧으면 (캐시 읽기가 0으로 나오는 이유를 알 수 있게) 로그를 남깁니다."""
+    tokens = promptCompiler.estimate_tokens(cache_prefix)
+    minimum = prompt_cache_min_tokens(model_id)
+    if tokens < minimum and model_id not in _short_prefix_logged:
+        _short_prefix_logged.add(model_id)
+        print(f"[Warn] 캐시 접두부가 최소 캐시 길이보다 짧아 캐시되지 않습니다 ({model_id}: 약 {tokens} < {minimum} 토큰)")
+
+
+# 캐시 접두부와 뒷부분 사이 구분자 (접두부 끝에 붙여 캐시 블록에 포함시키므로 jobId별 캐시 키는 그대로 유지)
+PREFIX_SEPARATOR = "\n\n"
+
+
+def _cached_block(cache_prefix):
+    """캐시 접두부 블록 텍스트 (구분자로 끝나도록 맞춤)."""
+    return cache_prefix.rstrip('\n') + PREFIX_SEPARATOR
+
+
+def full_prompt(prompt, cache_prefix=None):
+    """캐시 접두부를 포함한 전체 프롬프트 (응답 캐시 키/토큰 추정용)."""
+    return _cached_block(cache_prefix) + prompt.lstrip('\n') if cache_prefix else prompt
+
+
+def build_bedrock_body(prompt, model_id, max_tokens, temperature=None, system=None, cache_prefix=None):
+    """모델 종류에 맞는 invoke_model 요청 본문(dict)을 만듭니다.
+
+    cache_prefix: 여러 요청이 똑같이 앞에 보내는 부분. 지원 모델이면 cache_control 지점으로 표시해
+    Bedrock 프롬프트 캐시에서 읽게 하고, 아니면 prompt 앞에 그대로 이어 붙입니다.
+    """
+    if is_legacy_text_model(model_id):
+        text = full_prompt(prompt, cache_prefix).strip()
+        if not text.startswith('Human:'):
+            text = f"Human: {text}\n\nAssistant:"
+        body = {"prompt": f"\n\n{text}", "max_tokens_to_sample": max_tokens}
+    else:
+        if cache_prefix and supports_prompt_cache(model_id):
+            _log_short_prefix(model_id, _cached_block(cache_prefix))
+            content = [{"type": "text", "text": _cached_block(cache_prefix), "cache_control": {"type": "ephemeral"}},
+                       {"type": "text", "text": prompt.lstrip('\n')}]
+        else:
+            content = [{"type": "text", "text": full_prompt(prompt, cache_prefix)}]
+        body = {
+            "anthropic_version": ANTHROPIC_VERSION,
+            "max_tokens": max_tokens,
+            "messages": [{"role": "user", "content": content}],
+        }
+        if system:
+            body["system"] = system
+    if temperature is not None:
+        body["temperature"] = temperature
+    return body
+
+
+def parse_bedrock_response(model_id, payload):
+    """invoke_model 응답 본문을 {'text', 'usage', 'stop_reason', 'model_id'} 형태로 정규화합니다.
+
+    usage의 input_tokens는 캐시를 거치지 않은 입력이며, 캐시 읽기/생성 토큰은 따로 담습니다.
+    """
+    if is_legacy_text_model(model_id):
+        text = payload.get('completion', '')
+        usage = {}
+    else:
+        text = ''.join(block.get('text', '') for block in payload.get('content', []) if block.get('type') == 'text')
+        usage = payload.get('usage', {})
+    return {
+        'text': text.strip(),
+        'usage': {
+            'input_tokens': usage.get('input_tokens', 0),
+            'output_tokens': usage.get('output_tokens', 0),
+            'cache_read_input_tokens': usage.get('cache_read_input_tokens') or 0,
+            'cache_creation_input_tokens': usage.get('cache_creation_input_tokens') or 0,
+        },
+        'stop_reason': payload.get('stop_reason'),
+        'model_id': model_id,
+    }
+
+
+def bedrock_cache_params(max_tokens, temperature=None, system=None):
+    """캐시 키에 들어가는 추론 파라미터."""
+    return {'max_tokens': max_tokens, 'temperature': temperature, 'system': system}
+
+
+def invoke_bedrock(prompt, model_id, max_tokens=1000, temperature=None, system=None, region=None,
+                   max_retries=None, use_cache=False, cache_ttl=None, cache_prefix=None):
+    """Bedrock 모델을 호출하고 정규화된 결과 dict를 반환합니다.
+
+    use_cache=True 이면 llmCache를 먼저 조회하고, 결과에 'cached' 여부를 표시합니다.
+    cache_prefix를 주면 Bedrock 프롬프트 캐시 대상 접두부로 보냅니다 (build_bedrock_body 참고).
+    """
+    client = get_bedrock_client(region)
+    body = json.dumps(build_bedrock_body(prompt, model_id, max_tokens, temperature, system, cache_prefix))
+
+    def _call():
+        limiter = _rate_limiter
+        if limiter is None:
+            response = client.invoke_model(body=body, modelId=model_id, accept='application/json',
+                                           contentType='application/json')
+            return json.loads(response['body'].read())
+        # 입력 추정치 + 최대 출력 토큰을 예약하고, 끝나면 실제 사용량으로 정산 (실패한 호출은 토큰을 모두 돌려줌)
+        reserved = limiter.acquire(model_id, promptCompiler.estimate_tokens(full_prompt(prompt, cache_prefix))
+                                   + promptCompiler.estimate_tokens(system) + max_tokens)
+        try:
+            response = client.invoke_model(body=body, modelId=model_id, accept='application/json',
+                                           contentType='application/json')
+            payload = json.loads(response['body'].read())
+        except Exception:
+            limiter.settle(model_id, reserved, 0)
+            raise
+        limiter.settle(model_id, reserved, _used_tokens(payload))
+        return payload
+
+    def _invoke():
+        retries = LLM_MAX_RETRIES if max_retries is None else max_retries
+        with metrics.span(f"llm:{model_id}"):
+            payload = _call_with_retry(_call, _is_retryable_bedrock_error, retries)
+        result = parse_bedrock_response(model_id, payload)
+        metrics.record_tokens(f"llm:{model_id}", result['usage'])
+        return result
+
+    if not use_cache:
+        return dict(_invoke(), cached=False)
+    params = bedrock_cache_params(max_tokens, temperature, system)
+    result, hit = llmCache.cached_call(model_id, full_prompt(prompt, cache_prefix), params, _invoke, cache_ttl)
+    return dict(result, cached=hit)
+
+
+# --- OpenAI ---
+def build_openai_body(messages, model, temperature=None, max_tokens=None):
+    body = {"model": model, "messages": messages}
+    if temperature is not None:
+        body["temperature"] = temperature
+    if max_tokens is not None:
+        body["max_tokens"] = max_tokens
+    return body
+
+
+def parse_openai_response(payload):
+    """chat/completions 응답을 {'text', 'usage', 'stop_reason', 'model_id'} 형태로 정규화합니다."""
+    choice = (payload.get('choices') or [{}])[0]
+    usage = payload.get('usage') or {}
+    return {
+        'text': (choice.get('message', {}).get('content') or '').strip(),
+        'usage': {
+            'input_tokens': usage.get('prompt_tokens', 0),
+            'output_tokens': usage.get('completion_tokens', 0),
+        },
+        'stop_reason': choice.get('finish_reason'),
+        'model_id': payload.get('model'),
+    }
+
+
+def chat_openai(messages, model='gpt-4o-mini', temperature=None, max_tokens=None, timeout=25, api_key=None,
+                max_retries=None):
+    """OpenAI chat/completions를 호출하고 정규화된 결과 dict를 반환합니다."""
+    api_key = api_key or os.environ.get('OPENAI_API_KEY')
+    session = get_http_session()
+    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+    body = build_openai_body(messages, model, temperature, max_tokens)
+
+    def _call():
+        response = session.post(OPENAI_API_URL, headers=headers, json=body, timeout=timeout)
+        if response.status_code != 200:
+            raise LLMError(f"OpenAI 응답 오류 ({response.status_code})", response.status_code, response.text)
+        return response.json()
+
+    retries = LLM_MAX_RETRIES if max_retries is None else max_retries
+    with metrics.span(f"llm:{model}"):
+        payload = _call_with_retry(_call, _is_retryable_http_error, retries)
+    result = parse_openai_response(payload)
+    metrics.record_tokens(f"llm:{model}", result['usage'])
+    return result
+
+
+def iter_sse_deltas(lines):
+    """chat/completions SSE 스트림의 각 줄에서 텍스트 조각(delta.content)을 꺼냅니다."""
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if not line.startswith('data:'):
+            continue  # 빈 줄, 주석(:keep-alive), event: 줄은 무시
+        data = line[len('data:'):].strip()
+        if data == '[DONE]':
+            return
+        chunk = json.loads(data)
+        for choice in chunk.get('choices') or []:
+            content = (choice.get('delta') or {}).get('content')
+            if content:
+                yield content
+
+
+def stream_openai(messages, model='gpt-4o-mini', temperature=None, max_tokens=None, timeout=25, api_key=None,
+                  max_retries=None):
+    """OpenAI chat/completions를 stream=True로 호출해 텍스트 조각을 순서대로 yield 합니다.
+
+    재시도는 첫 조각을 받기 전(연결/상태 코드 단계)에만 수행합니다.
+    """
+    api_key = api_key or os.environ.get('OPENAI_API_KEY')
+    session = get_http_session()
+    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json",
+               "Accept": "text/event-stream"}
+    body = dict(build_openai_body(messages, model, temperature, max_tokens), stream=True)
+
+    def _open():
+        response = session.post(OPENAI_API_URL, headers=headers, json=body, timeout=timeout, stream=True)
+        if response.status_code != 200:
+            text = response.text
+            response.close()
+            raise LLMError(f"OpenAI 응답 오류 ({response.status_code})", response.status_code, text)
+        return response
+
+    retries = LLM_MAX_RETRIES if max_retries is None else max_retries
+    with metrics.span(f"llm:{model}:stream-open"):
+        response = _call_with_retry(_open, _is_retryable_http_error, retries)
+    try:
+        yield from iter_sse_deltas(response.iter_lines())
+    finally:
+        response.close()
@@ -0,0 +1,168 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# 실시간 LLM 호출의 꼬리 지연 보호
+# - 헤지 요청: 첫 요청이 최근 지연 시간의 p95를 넘기면 같은 요청을 하나 더 보내고 먼저 끝난 쪽을 사용
+#   (진 쪽 요청은 취소할 수 없어 백그라운드에서 끝나며, discard 콜백으로 정리)
+# - 회로 차단기: 연속 실패가 BREAKER_FAILURE_THRESHOLD 번이면 BREAKER_RESET_SECONDS 동안 호출을 막고,
+#   그 뒤 한 번만 시험 호출(half-open)해서 성공하면 다시 연다
+# 두 상태 모두 모듈에 보관되어 웜 인보크 사이에 이어진다.
+
+HEDGE_ENABLED = os.environ.get('HEDGE_ENABLED', '1') == '1'
+HEDGE_PERCENTILE = float(os.environ.get('HEDGE_PERCENTILE', '95'))
+HEDGE_WINDOW = int(os.environ.get('HEDGE_WINDOW', '200'))                       # 지연 시간 표본 수
+HEDGE_MIN_SAMPLES = int(os.environ.get('HEDGE_MIN_SAMPLES', '20'))              # 이보다 적으면 기본 지연 사용
+HEDGE_DEFAULT_DELAY_MS = float(os.environ.get('HEDGE_DEFAULT_DELAY_MS', '3000'))
+HEDGE_MIN_DELAY_MS = float(os.environ.get('HEDGE_MIN_DELAY_MS', '200'))         # 너무 이른 헤지 방지
+BREAKER_FAILURE_THRESHOLD = int(os.environ.get('BREAKER_FAILURE_THRESHOLD', '3'))
+BREAKER_RESET_SECONDS = float(os.environ.get('BREAKER_RESET_SECONDS', '30'))
+
+_executor = ThreadPoolExecutor(max_workers=int(os.environ.get('HEDGE_MAX_WORKERS', '8')))
+
+
+class CircuitOpenError(Exception):
+    """회로 차단기가 열려 있어 호출하지 않음."""
+
+
+class LatencyTracker:
+    """최근 지연 시간(ms)의 백분위수로 헤지 대기 시간을 정합니다."""
+
+    def __init__(self, window=HEDGE_WINDOW):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, elapsed_ms):
+        with self._lock:
+            self._samples.append(elapsed_ms)
+
+    def hedge_delay_ms(self, percentile=HEDGE_PERCENTILE):
+        with self._lock:
+            if len(self._samples) < HEDGE_MIN_SAMPLES:
+                return HEDGE_DEFAULT_DELAY_MS
+            ordered = sorted(self._samples)
+        index = max(0, min(len(ordered) - 1, int(round(percentile / 100.0 * len(ordered) + 0.5)) - 1))
+        return max(HEDGE_MIN_DELAY_MS, ordered[index])
+
+
+class CircuitBreaker:
+    """closed → (연속 실패) → open → (대기 후) half_open → 성공 시 closed / 실패 시 open."""
+
+    def __init__(self, name, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_seconds=BREAKER_RESET_SECONDS,
+                 clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """지금 호출해도 되는지 여부. half_open 상태에서는 시험 호출 하나만 허용합니다."""
+        with self._lock:
+            if self.state == 'open' and self.clock() - self.opened_at >= self.reset_seconds:
+                self.state = 'half_open'
+                self._trial_in_flight = False
+            if self.state == 'closed':
+                return True
+            if self.state == 'half_open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != 'closed':
+                print(f"[Info] 회로 차단기 닫힘 ({self.name})")
+            self.state, self.failures, self._trial_in_flight = 'closed', 0, False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                if self.state != 'open':
+                    print(f"[Warn] 회로 차단기 열림 ({self.name}): 연속 실패 {self.failures}회, {self.reset_seconds}s 동안 호출 차단")
+                self.state, self.opened_at, self._trial_in_flight = 'open', self.clock(), False
+
+
+class GuardedCall:
+    """헤지 요청 + 회로 차단기를 함께 적용하는 호출 래퍼 (호출 종류마다 하나씩 만들어 재사용)."""
+
+    def __init__(self, name, is_failure=None, hedge=HEDGE_ENABLED):
+        self.name = name
+        self.tracker = LatencyTracker()
+        self.breaker = CircuitBreaker(name)
+        self.is_failure = is_failure or (lambda e: True)
+        self.hedge = hedge
+        self._stats = {'calls': 0, 'hedged': 0, 'hedge_wins': 0, 'rejected': 0, 'failures': 0}
+        self._lock = threading.Lock()
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _timed(self, call):
+        started = time.perf_counter()
+        result = call()
+        return result, (time.perf_counter() - started) * 1000
+
+    def _hedged(self, call, discard):
+        futures = {_executor.submit(self._timed, call): 'primary'}
+        done, _ = wait(futures, timeout=self.tracker.hedge_delay_ms() / 1000.0)
+        if not done:
+            self._count('hedged')
+            futures[_executor.submit(self._timed, call)] = 'hedge'
+        error = None
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result, elapsed_ms = future.result()
+                except Exception as e:
+                    error = error or e
+                    continue
+                if futures[future] == 'hedge':
+                    self._count('hedge_wins')
+                self.tracker.record(elapsed_ms)
+                if discard is not None:
+                    # 늦게 끝나는 나머지 요청은 결과가 나오면 정리
+                    for loser in pending:
+                        loser.add_done_callback(lambda f: f.exception() is None and discard(f.result()[0]))
+                return result
+        raise error
+
+    def call(self, call, discard=None):
+        """call()을 실행해 결과를 반환합니다. 회로가 열려 있으면 CircuitOpenError를 발생시킵니다.
+
+        discard(result): 헤지 경쟁에서 진 요청의 결과를 정리하는 콜백 (스트림 닫기 등)
+        """
+        if not self.breaker.allow():
+            self._count('rejected')
+            raise CircuitOpenError(f"{self.name} 회로 차단기 열림")
+        self._count('calls')
+        try:
+            if self.hedge:
+                result = self._hedged(call, discard)
+            else:
+                result, elapsed_ms = self._timed(call)
+                self.tracker.record(elapsed_ms)
+        except Exception as e:
+            if self.is_failure(e):
+                self._count('failures')
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()  # 요청 자체의 문제(4xx 등)는 상위 서비스 장애로 보지 않음
+            raise
+        self.breaker.record_success()
+        return result
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self._stats, state=self.breaker.state,
+                        hedge_delay_ms=round(self.tracker.hedge_delay_ms(), 1))
@@ -0,0 +1,1085 @@
+import argparse
+import contextlib
+import copy
+import hashlib
+import importlib
+import io
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import types
+import uuid
+from decimal import Decimal
+
+# 로컬 이벤트 재생 하네스: AWS 없이 각 Lambda 핸들러를 실행하고 지연 시간 분포와 요청 수를 측정한다.
+# - S3 / DynamoDB / Step Functions / bedrock-runtime / OpenAI 엔드포인트를 메모리 대역으로 바꿔 끼움
+#   (awsClients.set_override, llmGateway의 HTTP 세션 교체)
+# - 서비스별로 지연(ms) / 지터 / 스로틀 비율 / 오류 비율을 주입
+# - events/<모듈 이름>/*.json 이벤트를 각 핸들러에 재생, events/seed.json 은 호출 전 초기 데이터
+#
+# 사용 예:
+#   python localHarness.py                                    # 모든 핸들러, 이벤트당 5회
+#   python localHarness.py calculate-scores --runs 20 --latency bedrock-runtime=800
+#   python localHarness.py --throttle dynamodb=0.1 --error openai=0.05 --json result.json
+#   python localHarness.py --compare result.json --max-regression 0.2   # p50 20% 이상 느려지면 종료 코드 1
+
+# 핸들러 모듈이 import 시점에 읽는 환경 변수 기본값 (이미 지정된 값은 유지)
+HARNESS_ENV = {
+    'AWS_DEFAULT_REGION': 'us-east-1',
+    'OPENAI_API_KEY': 'harness-key',
+    'DYNAMODB_TABLE': 'AI_Interview_Data',
+    'STATE_MACHINE_ARN': 'arn:aws:states:us-east-1:000000000000:stateMachine:Interview',
+}
+for _name, _value in HARNESS_ENV.items():
+    os.environ.setdefault(_name, _value)
+
+import awsClients  # noqa: E402 (환경 변수 설정 후 import)
+import llmGateway  # noqa: E402
+import promptCompiler  # noqa: E402
+
+from botocore.exceptions import ClientError  # noqa: E402
+
+DEFAULT_EVENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'events')
+SEED_FILENAME = 'seed.json'
+
+# 서비스별 기본 지연(ms)
+DEFAULT_LATENCY_MS = {'s3': 15, 'dynamodb': 6, 'stepfunctions': 25, 'bedrock-runtime': 450, 'openai': 350}
+DEFAULT_JITTER_RATIO = 0.3
+
+# 테이블 키 구조 (없는 테이블은 첫 Key/Item의 첫 속성을 파티션 키로 사용)
+TABLE_SCHEMAS = {
+    'AI_Interview_Data': {'keys': ['job_posting_id']},
+    'Interview_Tasks': {'keys': ['executionArn']},
+    'Interview_Sessions': {'keys': ['session_id']},
+    'Interview_State': {'keys': ['state_id']},
+    'Interview_Chat_Sessions': {'keys': ['session_id']},
+    'InterviewScores': {'keys': ['jobId', 'applicantEmail'],
+                        'indexes': {'jobId-scoreRank-index': ['jobId', 'scoreRank']}},
+}
+
+
+# --- 요청 집계 / 장애 주입 ---
+class RequestStats:
+    """핸들러별 '서비스.오퍼레이션' 요청 수와 주입된 장애 수."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.current = None
+        self.requests = {}
+        self.faults = {}
+
+    def count(self, service, operation, fault=None):
+        name = f"{service}.{operation}"
+        with self._lock:
+            bucket = self.requests.setdefault(self.current, {})
+            bucket[name] = bucket.get(name, 0) + 1
+            if fault:
+                faults = self.faults.setdefault(self.current, {})
+                faults[f"{name}:{fault}"] = faults.get(f"{name}:{fault}", 0) + 1
+
+
+class FaultProfile:
+    """서비스 하나의 지연/스로틀/오류 주입 설정."""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=None, throttle_rate=0.0, error_rate=0.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = latency_ms * DEFAULT_JITTER_RATIO if jitter_ms is None else jitter_ms
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+
+
+def client_error(code, status, operation, message=None):
+    """botocore가 던지는 것과 같은 형식의 ClientError."""
+    return ClientError({'Error': {'Code': code, 'Message': message or code},
+                        'ResponseMetadata': {'HTTPStatusCode': status}}, operation)
+
+
+class FakeService:
+    service = None
+    throttle_error = ('ThrottlingException', 400)
+    server_error = ('InternalServerError', 500)
+
+    def __init__(self, profile, stats, rng):
+        self.profile = profile
+        self.stats = stats
+        self.rng = rng
+        self._lock = threading.RLock()
+
+    def _inject(self, operation):
+        """지연을 주고, 주입할 장애 종류('throttle' / 'error' / None)를 반환합니다."""
+        profile = self.profile
+        with self._lock:
+            jitter = self.rng.uniform(0, profile.jitter_ms) if profile.jitter_ms else 0.0
+            roll = self.rng.random()
+        fault = None
+        if roll < profile.throttle_rate:
+            fault = 'throttle'
+        elif roll < profile.throttle_rate + profile.error_rate:
+            fault = 'error'
+        self.stats.count(self.service, operation, fault)
+        delay = profile.latency_ms + jitter
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+        return fault
+
+    def _request(self, operation):
+        fault = self._inject(operation)
+        if fault:
+            code, status = self.throttle_error if fault == 'throttle' else self.server_error
+            raise client_error(code, status, operation)
+
+
+# --- S3 ---
+class _Paginator:
+    def __init__(self, s3):
+        self.s3 = s3
+
+    def paginate(self, **kwargs):
+        token = None
+        while True:
+            page = self.s3.list_objects_v2(**dict(kwargs, ContinuationToken=token) if token else kwargs)
+            yield page
+            token = page.get('NextContinuationToken')
+            if not token:
+                return
+
+
+class FakeS3(FakeService):
+    service = 's3'
+    throttle_error = ('SlowDown', 503)
+    server_error = ('InternalError', 500)
+
+    def __init__(self, profile, stats, rng):
+        super().__init__(profile, stats, rng)
+        self.buckets = {}  # bucket -> {key: (bytes, etag)}
+        self.metadata = {}  # (bucket, key) -> 사용자 메타데이터 (x-amz-meta-*)
+
+    def _bucket(self, name):
+        return self.buckets.setdefault(name, {})
+
+    def load(self, bucket, key, body):
+        if not isinstance(body, (str, bytes)):
+            body = json.dumps(body, ensure_ascii=False)
+        data = body.encode('utf-8') if isinstance(body, str) else body
+        self._bucket(bucket)[key] = (data, '"%s"' % hashlib.md5(data).hexdigest())
+
+    def get_object(self, Bucket, Key, **kwargs):
+        self._request('GetObject')
+        with self._lock:
+            obj = self._bucket(Bucket).get(Key)
+        if obj is None:
+            raise client_error('NoSuchKey', 404, 'GetObject', f"{Key} 없음")
+        data, etag = obj
+        return {'Body': io.BytesIO(data), 'ETag': etag, 'ContentLength': len(data),
+                'Metadata': dict(self.metadata.get((Bucket, Key), {}))}
+
+    def head_object(self, Bucket, Key, **kwargs):
+        self._request('HeadObject')
+        with self._lock:
+            obj = self._bucket(Bucket).get(Key)
+        if obj is None:
+            raise client_error('404', 404, 'HeadObject')
+        return {'ETag': obj[1], 'ContentLength': len(obj[0]), 'Metadata': dict(self.metadata.get((Bucket, Key), {}))}
+
+    def put_object(self, Bucket, Key, Body=b'', IfMatch=None, IfNoneMatch=None, Metadata=None, **kwargs):
+        self._request('PutObject')
+        data = Body.encode('utf-8') if isinstance(Body, str) else (Body.read() if hasattr(Body, 'read') else Body)
+        etag = '"%s"' % hashlib.md5(data).hexdigest()
+        with self._lock:
+            current = self._bucket(Bucket).get(Key)
+            if IfNoneMatch == '*' and current is not None:
+                raise client_error('PreconditionFailed', 412, 'PutObject')
+            if IfMatch is not None and (current is None or current[1] != IfMatch):
+                raise client_error('PreconditionFailed', 412, 'PutObject')
+            self._bucket(Bucket)[Key] = (data, etag)
+            self.metadata[(Bucket, Key)] = dict(Metadata or {})
+        return {'ETag': etag}
+
+    def delete_object(self, Bucket, Key, **kwargs):
+        self._request('DeleteObject')
+        with self._lock:
+            self._bucket(Bucket).pop(Key, None)
+            self.metadata.pop((Bucket, Key), None)
+        return {}
+
+    def list_objects_v2(self, Bucket, Prefix='', ContinuationToken=None, MaxKeys=1000, **kwargs):
+        self._request('ListObjectsV2')
+        with self._lock:
+            keys = sorted(k for k in self._bucket(Bucket) if k.startswith(Prefix))
+        start = int(ContinuationToken or 0)
+        page = keys[start:start + MaxKeys]
+        response = {'Contents': [{'Key': k, 'Size': len(self.buckets[Bucket][k][0]), 'ETag': self.buckets[Bucket][k][1]}
+                                 for k in page],
+                    'KeyCount': len(page), 'IsTruncated': start + MaxKeys < len(keys)}
+        if response['IsTruncated']:
+            response['NextContinuationToken'] = str(start + MaxKeys)
+        return response
+
+    def get_paginator(self, operation_name):
+        if operation_name != 'list_objects_v2':
+            raise NotImplementedError(f"하네스 S3 대역이 지원하지 않는 페이지네이터: {operation_name}")
+        return _Paginator(self)
+
+
+# --- DynamoDB 식 (조건 / 업데이트 / 프로젝션) ---
+_TOKEN_RE = re.compile(r"\s*(?:(#\w+)|(:\w+)|(\[\d+\])|(<>|<=|>=|=|<|>|\+|-|\(|\)|,|\.)|(\w+))")
+_MISSING = object()
+
+
+def _tokenize(expression):
+    tokens, pos = [], 0
+    expression = expression.strip()
+    while pos < len(expression):
+        match = _TOKEN_RE.match(expression, pos)
+        if not match or match.end() == pos:
+            raise ValueError(f"해석할 수 없는 식: {expression[pos:]!r}")
+        tokens.append(next(group for group in match.groups() if group is not None))
+        pos = match.end()
+    return tokens
+
+
+class _Expression:
+    """DynamoDB 식의 하네스용 최소 구현 (이 저장소가 쓰는 문법 범위)."""
+
+    def __init__(self, expression, names=None, values=None):
+        self.tokens = _tokenize(expression)
+        self.pos = 0
+        self.names = names or {}
+        self.values = values or {}
+
+    def peek(self, offset=0):
+        index = self.pos + offset
+        return self.tokens[index] if index < len(self.tokens) else None
+
+    def take(self, expected=None):
+        token = self.peek()
+        if token is None or (expected is not None and token.upper() != expected.upper()):
+            raise ValueError(f"식 오류: {expected!r} 필요, {token!r} 발견")
+        self.pos += 1
+        return token
+
+    def at_keyword(self, *keywords):
+        token = self.peek()
+        return token is not None and token.upper() in keywords
+
+    # 경로: a.b[0].c, #name
+    def path(self):
+        segments = [self._name(self.take())]
+        while self.peek() is not None and (self.peek() == '.' or self.peek().startswith('[')):
+            token = self.take()
+            segments.append(self._name(self.take()) if token == '.' else int(token[1:-1]))
+        return segments
+
+    def _name(self, token):
+        return self.names[token] if token.startswith('#') else token
+
+    def value(self, token):
+        if token not in self.values:
+            raise ValueError(f"ExpressionAttributeValues에 {token} 없음")
+        return _to_dynamo(self.values[token])
+
+    # 조건식
+    def condition(self):
+        node = self._and()
+        while self.at_keyword('OR'):
+            self.take()
+            left, right = node, self._and()
+            node = lambda item, l=left, r=right: l(item) or r(item)
+        return node
+
+    def _and(self):
+        node = self._not()
+        while self.at_keyword('AND'):
+            self.take()
+            left, right = node, self._not()
+            node = lambda item, l=left, r=right: l(item) and r(item)
+        return node
+
+    def _not(self):
+        if self.at_keyword('NOT'):
+            self.take()
+            inner = self._not()
+            return lambda item: not inner(item)
+        return self._primary()
+
+    def _primary(self):
+        if self.peek() == '(':
+            self.take('(')
+            node = self.condition()
+            self.take(')')
+            return node
+        function = (self.peek() or '').lower()
+        if function in ('attribute_exists', 'attribute_not_exists', 'begins_with', 'contains') and self.peek(1) == '(':
+            self.take()
+            self.take('(')
+            path = self.path()
+            operand = None
+            if self.peek() == ',':
+                self.take(',')
+                operand = self.operand()
+            self.take(')')
+            if function == 'attribute_exists':
+                return lambda item: _get_path(item, path) is not _MISSING
+            if function == 'attribute_not_exists':
+                return lambda item: _get_path(item, path) is _MISSING
+            if function == 'begins_with':
+                return lambda item: str(_get_path(item, path)).startswith(str(operand(item)))
+            return lambda item: operand(item) in (_get_path(item, path) if _get_path(item, path) is not _MISSING else ())
+        left = self.operand()
+        comparator = self.take()
+        right = self.operand()
+        compare = {
+            '=': lambda a, b: a == b, '<>': lambda a, b: a != b, '<': lambda a, b: a < b,
+            '<=': lambda a, b: a <= b, '>': lambda a, b: a > b, '>=': lambda a, b: a >= b,
+        }[comparator]
+
+        def _compare(item):
+            a, b = left(item), right(item)
+            if a is _MISSING or b is _MISSING:
+                return comparator == '<>' and a is not b
+            try:
+                return compare(a, b)
+            except TypeError:
+                return False
+        return _compare
+
+    def operand(self):
+        token = self.peek()
+        if token.startswith(':'):
+            value = self.value(self.take())
+            return lambda item: value
+        if token.lower() == 'size' and self.peek(1) == '(':
+            self.take()
+            self.take('(')
+            path = self.path()
+            self.take(')')
+
+            def _size(item):
+                value = _get_path(item, path)
+                return _MISSING if value is _MISSING else Decimal(len(value))
+            return _size
+        path = self.path()
+        return lambda item: _get_path(item, path)
+
+    # 업데이트식: SET / ADD / REMOVE
+    def update_actions(self):
+        actions = []
+        while self.peek() is not None:
+            clause = self.take().upper()
+            while True:
+                if clause == 'SET':
+                    path = self.path()
+                    self.take('=')
+                    actions.append(('SET', path, self._set_value()))
+                elif clause == 'ADD':
+                    path = self.path()
+                    actions.append(('ADD', path, self.value(self.take())))
+                elif clause == 'REMOVE':
+                    actions.append(('REMOVE', self.path(), None))
+                else:
+                    raise ValueError(f"지원하지 않는 업데이트 절: {clause}")
+                if self.peek() != ',':
+                    break
+                self.take(',')
+        return actions
+
+    def _set_value(self):
+        left = self._set_operand()
+        if self.peek() in ('+', '-'):
+            sign = self.take()
+            right = self._set_operand()
+            return lambda item: left(item) + right(item) if sign == '+' else left(item) - right(item)
+        return left
+
+    def _set_operand(self):
+        function = (self.peek() or '').lower()
+        if function in ('list_append', 'if_not_exists') and self.peek(1) == '(':
+            self.take()
+            self.take('(')
+            first = self.path() if function == 'if_not_exists' else self._set_operand()
+            self.take(',')
+            second = self._set_operand()
+            self.take(')')
+            if function == 'list_append':
+                return lambda item: list(first(item)) + list(second(item))
+            return lambda item: _get_path(item, first) if _get_path(item, first) is not _MISSING else second(item)
+        operand = self.operand()
+
+        def _required(item):
+            value = operand(item)
+            if value is _MISSING:
+                raise client_error('ValidationException', 400, 'UpdateItem',
+                                   'The provided expression refers to an attribute that does not exist in the item')
+            return value
+        return _required
+
+    def projection(self):
+        paths = [self.path()]
+        while self.peek() == ',':
+            self.take(',')
+            paths.append(self.path())
+        return paths
+
+
+def _to_dynamo(value):
+    """boto3 리소스와 같은 규칙으로 값을 변환합니다 (int -> Decimal, float는 거부)."""
+    if isinstance(value, bool) or value is None or isinstance(value, (str, bytes, Decimal)):
+        return value
+    if isinstance(value, int):
+        return Decimal(value)
+    if isinstance(value, float):
+        raise TypeError('Float types are not supported. Use Decimal types instead.')
+    if isinstance(value, dict):
+        return {k: _to_dynamo(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_dynamo(v) for v in value]
+    if isinstance(value, set):
+        return {_to_dynamo(v) for v in value}
+    raise TypeError(f"DynamoDB에 저장할 수 없는 형식: {type(value)}")
+
+
+def _get_path(item, path):
+    current = item
+    for segment in path:
+        if isinstance(segment, int):
+            if not isinstance(current, list) or segment >= len(current):
+                return _MISSING
+            current = current[segment]
+        else:
+            if not isinstance(current, dict) or segment not in current:
+                return _MISSING
+            current = current[segment]
+    return current
+
+
+def _set_path(item, path, value):
+    current = item
+    for segment in path[:-1]:
+        current = current[segment]
+    if isinstance(path[-1], int) and path[-1] >= len(current):
+        current.append(value)
+    else:
+        current[path[-1]] = value
+
+
+def _remove_path(item, path):
+    parent = _get_path(item, path[:-1]) if len(path) > 1 else item
+    if parent is _MISSING:
+        return
+    if isinstance(path[-1], int):
+        if path[-1] < len(parent):
+            del parent[path[-1]]
+    else:
+        parent.pop(path[-1], None)
+
+
+def _project(item, paths):
+    result = {}
+    for path in paths:
+        value = _get_path(item, path)
+        if value is _MISSING:
+            continue
+        if len(path) == 2 and isinstance(path[1], int):
+            result.setdefault(path[0], []).append(value)  # questions[3] -> {'questions': [값]}
+        else:
+            target = result
+            for segment in path[:-1]:
+                target = target.setdefault(segment, {})
+            target[path[-1]] = value
+    return result
+
+
+# --- DynamoDB ---
+class FakeTable(FakeService):
+    service = 'dynamodb'
+    throttle_error = ('ProvisionedThroughputExceededException', 400)
+
+    def __init__(self, name, profile, stats, rng, keys=None, indexes=None):
+        super().__init__(profile, stats, rng)
+        self.name = name
+        self.table_name = name
+        self.keys = list(keys or [])
+        self.indexes = dict(indexes or {})
+        self.items = {}
+
+    def _key(self, key_or_item):
+        if not self.keys:
+            self.keys = [next(iter(key_or_item))]
+        try:
+            return tuple(key_or_item[k] for k in self.keys)
+        except KeyError as e:
+            raise client_error('ValidationException', 400, 'Key', f"키 속성 누락: {e}")
+
+    def _check(self, item, condition, names, values, operation):
+        if condition and not _Expression(condition, names, values).condition()(item or {}):
+            raise client_error('ConditionalCheckFailedException', 400, operation, 'The conditional request failed')
+
+    def load(self, item):
+        item = _to_dynamo(item)
+        self.items[self._key(item)] = item
+
+    def get_item(self, Key, ProjectionExpression=None, ExpressionAttributeNames=None, ConsistentRead=False, **kwargs):
+        self._request('GetItem')
+        with self._lock:
+            item = self.items.get(self._key(_to_dynamo(Key)))
+            if item is None:
+                return {}
+            if ProjectionExpression:
+                item = _project(item, _Expression(ProjectionExpression, ExpressionAttributeNames).projection())
+            return {'Item': copy.deepcopy(item)}
+
+    def put_item(self, Item, ConditionExpression=None, ExpressionAttributeNames=None,
+                 ExpressionAttributeValues=None, ReturnValues='NONE', **kwargs):
+        self._request('PutItem')
+        item = _to_dynamo(copy.deepcopy(Item))
+        with self._lock:
+            key = self._key(item)
+            old = self.items.get(key)
+            self._check(old, ConditionExpression, ExpressionAttributeNames, ExpressionAttributeValues, 'PutItem')
+            self.items[key] = item
+        return {'Attributes': copy.deepcopy(old)} if ReturnValues == 'ALL_OLD' and old else {}
+
+    def update_item(self, Key, UpdateExpression, ConditionExpression=None, ExpressionAttributeNames=None,
+                    ExpressionAttributeValues=None, ReturnValues='NONE', **kwargs):
+        self._request('UpdateItem')
+        key_attrs = _to_dynamo(Key)
+        actions = _Expression(UpdateExpression, ExpressionAttributeNames, ExpressionAttributeValues).update_actions()
+        with self._lock:
+            key = self._key(key_attrs)
+            old = self.items.get(key)
+            self._check(old, ConditionExpression, ExpressionAttributeNames, ExpressionAttributeValues, 'UpdateItem')
+            item = copy.deepcopy(old) if old else dict(key_attrs)
+            for action, path, value in actions:
+                if action == 'SET':
+                    _set_path(item, path, value(item))
+                elif action == 'ADD':
+                    current = _get_path(item, path)
+                    if isinstance(value, set):
+                        _set_path(item, path, (current if current is not _MISSING else set()) | value)
+                    else:
+                        _set_path(item, path, (current if current is not _MISSING else Decimal(0)) + value)
+                else:
+                    _remove_path(item, path)
+            self.items[key] = item
+        if ReturnValues in ('ALL_NEW', 'UPDATED_NEW'):
+            return {'Attributes': copy.deepcopy(item)}
+        if ReturnValues in ('ALL_OLD', 'UPDATED_OLD') and old:
+            return {'Attributes': copy.deepcopy(old)}
+        return {}
+
+    def delete_item(self, Key, ConditionExpression=None, ExpressionAttributeNames=None,
+                    ExpressionAttributeValues=None, ReturnValues='NONE', **kwargs):
+        self._request('DeleteItem')
+        with self._lock:
+            key = self._key(_to_dynamo(Key))
+            old = self.items.get(key)
+            self._check(old, ConditionExpression, ExpressionAttributeNames, ExpressionAttributeValues, 'DeleteItem')
+            self.items.pop(key, None)
+        return {'Attributes': copy.deepcopy(old)} if ReturnValues == 'ALL_OLD' and old else {}
+
+    def _page(self, items, sort_attrs, key_attrs, forward, limit, start_key, filter_fn):
+        items = sorted(items, key=lambda i: tuple(str(i.get(a, '')) if not isinstance(i.get(a), Decimal)
+                                                  else i.get(a) for a in sort_attrs), reverse=not forward)
+        if start_key:
+            start = _to_dynamo(start_key)
+            for position, item in enumerate(items):
+                if all(item.get(k) == v for k, v in start.items()):
+                    items = items[position + 1:]
+                    break
+        last_key = None
+        if limit is not None and len(items) > limit:
+            items = items[:limit]
+            last_key = {k: items[-1][k] for k in dict.fromkeys(key_attrs + self.keys) if k in items[-1]}
+        scanned = len(items)
+        if filter_fn:
+            items = [i for i in items if filter_fn(i)]
+        response = {'Items': copy.deepcopy(items), 'Count': len(items), 'ScannedCount': scanned}
+        if last_key:
+            response['LastEvaluatedKey'] = copy.deepcopy(last_key)
+        return response
+
+    def query(self, KeyConditionExpression, ExpressionAttributeValues=None, ExpressionAttributeNames=None,
+              IndexName=None, ScanIndexForward=True, Limit=None, ExclusiveStartKey=None, FilterExpression=None,
+              **kwargs):
+        self._request('Query')
+        key_attrs = self.indexes[IndexName] if IndexName else self.keys
+        key_condition = _Expression(KeyConditionExpression, ExpressionAttributeNames,
+                                    ExpressionAttributeValues).condition()
+        filter_fn = FilterExpression and _Expression(FilterExpression, ExpressionAttributeNames,
+                                                     ExpressionAttributeValues).condition()
+        with self._lock:
+            # GSI는 키 속성이 모두 있는 항목만 포함 (희소 인덱스)
+            items = [i for i in self.items.values() if all(k in i for k in key_attrs) and key_condition(i)]
+            return self._page(items, key_attrs[1:] + self.keys, key_attrs, ScanIndexForward, Limit,
+                              ExclusiveStartKey, filter_fn)
+
+    def scan(self, FilterExpression=None, ExpressionAttributeNames=None, ExpressionAttributeValues=None,
+             Limit=None, ExclusiveStartKey=None, **kwargs):
+        self._request('Scan')
+        filter_fn = FilterExpression and _Expression(FilterExpression, ExpressionAttributeNames,
+                                                     ExpressionAttributeValues).condition()
+        with self._lock:
+            return self._page(list(self.items.values()), self.keys, self.keys, True, Limit, ExclusiveStartKey,
+                              filter_fn)
+
+
+class _FakeDynamoResource:
+    def __init__(self, harness):
+        self.harness = harness
+        self.meta = types.SimpleNamespace(client=None)
+
+    def Table(self, name):
+        return self.harness.table(name)
+
+
+# --- Step Functions ---
+class FakeStepFunctions(FakeService):
+    service = 'states'
+
+    def __init__(self, profile, stats, rng):
+        super().__init__(profile, stats, rng)
+        self.executions = []
+        self.task_results = []
+
+    def start_execution(self, stateMachineArn, input='{}', name=None, **kwargs):
+        self._request('StartExecution')
+        execution_arn = f"{stateMachineArn.replace(':stateMachine:', ':execution:')}:{name or uuid.uuid4()}"
+        with self._lock:
+            self.executions.append({'executionArn': execution_arn, 'input': json.loads(input)})
+        return {'executionArn': execution_arn, 'startDate': time.time()}
+
+    def send_task_success(self, taskToken, output, **kwargs):
+        self._request('SendTaskSuccess')
+        with self._lock:
+            self.task_results.append({'taskToken': taskToken, 'output': json.loads(output)})
+        return {}
+
+    def send_task_failure(self, taskToken, error=None, cause=None, **kwargs):
+        self._request('SendTaskFailure')
+        with self._lock:
+            self.task_results.append({'taskToken': taskToken, 'error': error, 'cause': cause})
+        return {}
+
+    def send_task_heartbeat(self, taskToken, **kwargs):
+        self._request('SendTaskHeartbeat')
+        return {}
+
+
+# --- Bedrock ---
+def default_bedrock_responder(model_id, prompt):
+    """저장소 프롬프트 종류별로 스키마에 맞는 고정 응답을 돌려줍니다."""
+    if 'suitability_score' in prompt:
+        return json.dumps({
+            'overall_score': 82, 'overall_comment': '직무 기준에 대체로 부합합니다.',
+            'strengths': '문제 해결 경험이 구체적입니다.', 'weaknesses': '협업 사례가 부족합니다.',
+            'suitability_score': {'ideal_candidate_fit': 4, 'job_description_fit': 4},
+        }, ensure_ascii=False)
+    if '총점만' in prompt:  # 채점 2차 의견 (modelCascade)
+        return json.dumps({'overall_score': 80})
+    if '"weakness"' in prompt:  # 답변별 채점 (incrementalScoring)
+        return json.dumps({'score': 80, 'ideal_candidate_fit': 4, 'job_description_fit': 4,
+                           'strength': '경험이 구체적입니다.', 'weakness': '결과 수치가 없습니다.'}, ensure_ascii=False)
+    if '<답변별 평가>' in prompt:  # 답변별 점수 총평 (incrementalScoring)
+        return json.dumps({'overall_comment': '직무 기준에 대체로 부합합니다.', 'strengths': '구체적인 경험.',
+                           'weaknesses': '정량적 근거 부족.'}, ensure_ascii=False)
+    if 'core_competencies' in prompt:
+        return json.dumps({
+            'ideal_candidate': ['도전', '협업'], 'philosophy': '고객 중심',
+            'core_competencies': ['문제 해결', '커뮤니케이션', '학습 능력', '책임감', '데이터 분석'],
+        }, ensure_ascii=False)
+    if 'q_resume_1' in prompt:
+        return json.dumps([{'id': 'q_resume_1', 'text': '전공 프로젝트에서 맡은 역할은 무엇이었나요?'},
+                           {'id': 'q_resume_2', 'text': '최근 새로 배운 기술과 학습 방법을 설명해 주세요.'}],
+                          ensure_ascii=False)
+    if '<idealCandidate>' in prompt:
+        return json.dumps([{'question': f'인재상에 맞는 경험 {i}을(를) 말씀해 주세요.'} for i in range(1, 4)],
+                          ensure_ascii=False)
+    return '{}'
+
+
+class FakeBedrock(FakeService):
+    service = 'bedrock-runtime'
+
+    def __init__(self, profile, stats, rng, responder=None):
+        super().__init__(profile, stats, rng)
+        self.responder = responder or default_bedrock_responder
+        self.prompt_cache = set()
+
+    def invoke_model(self, body, modelId, **kwargs):
+        self._request('InvokeModel')
+        request = json.loads(body)
+        if 'prompt' in request:
+            prompt = request['prompt']
+        else:
+            content = request['messages'][-1]['content']
+            prompt = content if isinstance(content, str) else ''.join(b.get('text', '') for b in content)
+        text = self.responder(modelId, prompt)
+        usage = {'input_tokens': promptCompiler.estimate_tokens(prompt),
+                 'output_tokens': promptCompiler.estimate_tokens(text)}
+        # 프롬프트 캐시: cache_control 지점까지의 접두부를 처음 보면 생성, 다시 보면 읽기로 집계
+        if 'messages' in request and not isinstance(content, str):
+            marked = [i for i, b in enumerate(content) if b.get('cache_control')]
+            prefix = ''.join(b.get('text', '') for b in content[:marked[-1] + 1]) if marked else ''
+            cached_tokens = promptCompiler.estimate_tokens(prefix)
+            key = (modelId, prefix)
+            if marked and cached_tokens >= llmGateway.prompt_cache_min_tokens(modelId):  # 짧은 접두부는 캐시 안 됨
+                usage['input_tokens'] = max(0, usage['input_tokens'] - cached_tokens)
+                usage['cache_read_input_tokens' if key in self.prompt_cache else 'cache_creation_input_tokens'] = \
+                    cached_tokens
+                self.prompt_cache.add(key)
+        if llmGateway.is_legacy_text_model(modelId):
+            payload = {'completion': ' ' + text, 'stop_reason': 'stop_sequence'}
+        else:
+            payload = {'content': [{'type': 'text', 'text': text}], 'stop_reason': 'end_turn', 'usage': usage}
+        return {'body': io.BytesIO(json.dumps(payload, ensure_ascii=False).encode('utf-8')),
+                'contentType': 'application/json'}
+
+
+# --- OpenAI (requests.Session 대역) ---
+def default_openai_responder(messages):
+    return "좋은 답변입니다. 그 경험에서 본인이 직접 내린 결정 하나를 더 구체적으로 말씀해 주시겠어요?"
+
+
+class _FakeHTTPResponse:
+    def __init__(self, status_code, payload=None, lines=None):
+        self.status_code = status_code
+        self._payload = payload
+        self._lines = lines or []
+
+    @property
+    def text(self):
+        return json.dumps(self._payload, ensure_ascii=False)
+
+    def json(self):
+        return self._payload
+
+    def iter_lines(self):
+        yield from self._lines
+
+    def close(self):
+        pass
+
+
+class FakeOpenAI(FakeService):
+    service = 'openai'
+    STREAM_CHUNK_CHARS = 6
+    STREAM_CHUNK_MS = 4
+
+    def __init__(self, profile, stats, rng, responder=None):
+        super().__init__(profile, stats, rng)
+        self.responder = responder or default_openai_responder
+
+    def _stream_lines(self, text):
+        for start in range(0, len(text), self.STREAM_CHUNK_CHARS):
+            time.sleep(self.STREAM_CHUNK_MS / 1000.0)
+            chunk = {'choices': [{'delta': {'content': text[start:start + self.STREAM_CHUNK_CHARS]}}]}
+            yield f"data: {json.dumps(chunk, ensure_ascii=False)}".encode('utf-8')
+            yield b""
+        yield b"data: [DONE]"
+
+    def post(self, url, headers=None, json=None, timeout=None, stream=False, **kwargs):
+        fault = self._inject('ChatCompletions')
+        if fault == 'throttle':
+            return _FakeHTTPResponse(429, {'error': {'message': 'Rate limit reached', 'type': 'requests'}})
+        if fault == 'error':
+            return _FakeHTTPResponse(500, {'error': {'message': 'server error', 'type': 'server_error'}})
+        text = self.responder(json.get('messages', []))
+        if stream:
+            return _FakeHTTPResponse(200, lines=self._stream_lines(text))
+        prompt = ''.join(m.get('content', '') for m in json.get('messages', []))
+        return _FakeHTTPResponse(200, {
+            'model': json.get('model'),
+            'choices': [{'message': {'role': 'assistant', 'content': text}, 'finish_reason': 'stop'}],
+            'usage': {'prompt_tokens': promptCompiler.estimate_tokens(prompt),
+                      'completion_tokens': promptCompiler.estimate_tokens(text)},
+        })
+
+
+# --- 하네스 ---
+class Harness:
+    """대역 서비스 묶음. install()로 awsClients/llmGateway에 끼워 넣습니다."""
+
+    def __init__(self, profiles=None, seed=None, rng_seed=0, bedrock_responder=None, openai_responder=None):
+        self.stats = RequestStats()
+        self.rng = random.Random(rng_seed)
+        self.profiles = profiles or {}
+        self.seed = seed or {}
+        self.s3 = FakeS3(self._profile('s3'), self.stats, self.rng)
+        self.sfn = FakeStepFunctions(self._profile('stepfunctions'), self.stats, self.rng)
+        self.bedrock = FakeBedrock(self._profile('bedrock-runtime'), self.stats, self.rng, bedrock_responder)
+        self.openai = FakeOpenAI(self._profile('openai'), self.stats, self.rng, openai_responder)
+        self.tables = {}
+        self._lock = threading.Lock()
+        self.reset_state()
+
+    def _profile(self, service):
+        return self.profiles.get(service) or FaultProfile()
+
+    def table(self, name):
+        with self._lock:
+            table = self.tables.get(name)
+            if table is None:
+                schema = TABLE_SCHEMAS.get(name, {})
+                table = self.tables[name] = FakeTable(name, self._profile('dynamodb'), self.stats, self.rng,
+                                                      schema.get('keys'), schema.get('indexes'))
+            return table
+
+    def factory(self, kind, name, region_name=None):
+        if kind == 'table':
+            return self.table(name)
+        if kind == 'resource' and name == 'dynamodb':
+            return _FakeDynamoResource(self)
+        clients = {'s3': self.s3, 'stepfunctions': self.sfn, 'bedrock-runtime': self.bedrock}
+        if kind == 'client' and name in clients:
+            return clients[name]
+        raise ValueError(f"하네스에 대역이 없는 AWS 서비스: {kind}:{name}")
+
+    def install(self):
+        awsClients.set_override(self.factory)
+        llmGateway._http_session = self.openai
+        return self
+
+    def uninstall(self):
+        awsClients.set_override(None)
+        llmGateway._http_session = None
+
+    def reset_state(self):
+        """S3 객체/테이블 항목을 seed 상태로 되돌립니다."""
+        self.s3.buckets = {}
+        self.s3.metadata = {}
+        for table in self.tables.values():
+            table.items = {}
+        for bucket, objects in self.seed.get('s3', {}).items():
+            for key, body in objects.items():
+                self.s3.load(bucket, key, body if isinstance(body, str) else _plain(body))
+        for bucket, objects in self.seed.get('s3_metadata', {}).items():
+            for key, metadata in objects.items():
+                self.s3.metadata[(bucket, key)] = dict(metadata)
+        for table_name, items in self.seed.get('dynamodb', {}).items():
+            for item in items:
+                self.table(table_name).load(item)
+
+
+# --- 이벤트 재생 ---
+def _load_json(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f, parse_float=Decimal)
+
+
+def _plain(value):
+    """seed의 Decimal을 이벤트용 JSON 값으로 되돌립니다."""
+    return json.loads(json.dumps(value, default=lambda d: float(d) if d % 1 else int(d)))
+
+
+def discover_events(event_dir, modules=None):
+    """{모듈 이름: [(케이스 이름, 핸들러 함수 이름, 이벤트)]}"""
+    cases = {}
+    for module_dir in sorted(os.listdir(event_dir)):
+        path = os.path.join(event_dir, module_dir)
+        if not os.path.isdir(path) or (modules and module_dir not in modules):
+            continue
+        for filename in sorted(os.listdir(path)):
+            if not filename.endswith('.json'):
+                continue
+            data = _plain(_load_json(os.path.join(path, filename)))
+            # {"handler": "stream_handler", "event": {...}} 형식이면 지정한 함수로 호출
+            if isinstance(data, dict) and set(data) <= {'handler', 'event', 'description'} and 'event' in data:
+                cases.setdefault(module_dir, []).append(
+                    (filename[:-5], data.get('handler', 'lambda_handler'), data['event']))
+            else:
+                cases.setdefault(module_dir, []).append((filename[:-5], 'lambda_handler', data))
+    return cases
+
+
+class LambdaContext:
+    def __init__(self, function_name, timeout_ms=30000):
+        self.function_name = function_name
+        self.aws_request_id = str(uuid.uuid4())
+        self._deadline = time.monotonic() + timeout_ms / 1000.0
+
+    def get_remaining_time_in_millis(self):
+        return max(0, int((self._deadline - time.monotonic()) * 1000))
+
+
+def _outcome(result):
+    if isinstance(result, dict):
+        if result.get('batchItemFailures'):
+            return 'error'
+        status = result.get('statusCode')
+        if isinstance(status, int) and status >= 500:
+            return 'error'
+        if isinstance(status, int) and status >= 400:
+            return 'client_error'
+    return 'ok'
+
+
+def invoke(module, handler_name, event, verbose=False):
+    """핸들러를 한 번 호출하고 (지연 ms, 결과 종류, 결과 또는 예외)를 반환합니다."""
+    function = getattr(module, handler_name)
+    event = copy.deepcopy(event)  # saveAnswer처럼 이벤트를 직접 바꾸는 핸들러가 있음
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    started = time.perf_counter()
+    with output:
+        try:
+            result = function(event, LambdaContext(module.__name__))
+            if isinstance(result, types.GeneratorType):
+                result = b''.join(result)  # 스트리밍 핸들러는 끝까지 소비
+            kind = _outcome(result)
+        except Exception as e:
+            result, kind = e, 'exception'
+    return (time.perf_counter() - started) * 1000, kind, result
+
+
+def percentile(values, pct):
+    """nearest-rank 백분위수."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def replay(harness, cases, runs=5, warmup=1, fresh_state=True, verbose=False):
+    """케이스마다 warmup 회 호출 후 runs 회 측정합니다. 모듈별 보고서 dict를 반환합니다."""
+    report = {}
+    for module_name, module_cases in cases.items():
+        module = importlib.import_module(module_name)
+        latencies, outcomes, examples = [], {}, {}
+        for case_name, handler_name, event in module_cases:
+            for iteration in range(warmup + runs):
+                if fresh_state:
+                    harness.reset_state()
+                measuring = iteration >= warmup
+                harness.stats.current = module_name if measuring else None
+                elapsed, kind, result = invoke(module, handler_name, event, verbose)
+                if not measuring:
+                    continue
+                latencies.append(elapsed)
+                outcomes[kind] = outcomes.get(kind, 0) + 1
+                if kind != 'ok' and kind not in examples:
+                    examples[kind] = f"{case_name}: {str(result)[:200]}"
+        measured = len(latencies)
+        requests = harness.stats.requests.get(module_name, {})
+        report[module_name] = {
+            'invocations': measured,
+            'outcomes': outcomes,
+            'latency_ms': {
+                'p50': round(percentile(latencies, 50), 2), 'p90': round(percentile(latencies, 90), 2),
+                'p99': round(percentile(latencies, 99), 2), 'max': round(max(latencies or [0]), 2),
+                'mean': round(sum(latencies) / measured, 2) if measured else 0.0,
+            },
+            'requests': dict(sorted(requests.items())),
+            'requests_per_invocation': {k: round(v / measured, 2) for k, v in sorted(requests.items())} if measured else {},
+            'faults': dict(sorted(harness.stats.faults.get(module_name, {}).items())),
+            'failures': examples,
+        }
+    harness.stats.current = None
+    return report
+
+
+def print_report(report):
+    header = f"{'handler':<28}{'runs':>6}{'ok':>5}{'4xx':>5}{'err':>5}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}"
+    print(header)
+    print('-' * len(header))
+    for name, entry in report.items():
+        outcomes, latency = entry['outcomes'], entry['latency_ms']
+        errors = outcomes.get('error', 0) + outcomes.get('exception', 0)
+        print(f"{name:<28}{entry['invocations']:>6}{outcomes.get('ok', 0):>5}{outcomes.get('client_error', 0):>5}"
+              f"{errors:>5}{latency['p50']:>10.1f}{latency['p90']:>10.1f}{latency['p99']:>10.1f}{latency['max']:>10.1f}")
+        requests = ', '.join(f"{k}={v:g}" for k, v in entry['requests_per_invocation'].items())
+        print(f"{'':<4}요청/호출: {requests or '-'}")
+        if entry['faults']:
+            print(f"{'':<4}주입된 장애: {', '.join(f'{k}={v}' for k, v in entry['faults'].items())}")
+        for kind, example in entry['failures'].items():
+            print(f"{'':<4}[{kind}] {example}")
+
+
+def compare_reports(baseline, current, max_regression=None):
+    """기준 보고서 대비 p50/p99와 호출당 요청 수 변화를 출력합니다. 회귀가 있으면 False."""
+    ok = True
+    print(f"\n{'handler':<28}{'p50 기준':>12}{'p50 현재':>12}{'변화':>9}{'p99 변화':>10}{'요청 변화':>10}")
+    for name, entry in current.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        b50, c50 = base['latency_ms']['p50'], entry['latency_ms']['p50']
+        b99, c99 = base['latency_ms']['p99'], entry['latency_ms']['p99']
+        change = (c50 - b50) / b50 if b50 else 0.0
+        requests_change = (sum(entry['requests_per_invocation'].values())
+                           - sum(base['requests_per_invocation'].values()))
+        flag = ''
+        if max_regression is not None and change > max_regression:
+            ok, flag = False, '  <- 회귀'
+        print(f"{name:<28}{b50:>12.1f}{c50:>12.1f}{change:>+9.0%}"
+              f"{(c99 - b99) / b99 if b99 else 0.0:>+10.0%}{requests_change:>+10.2f}{flag}")
+    return ok
+
+
+def _parse_overrides(values, cast=float):
+    result = {}
+    for value in values or []:
+        service, _, amount = value.partition('=')
+        result[service] = cast(amount)
+    return result
+
+
+def build_profiles(latency=None, throttle=None, error=None, no_latency=False, jitter_ratio=DEFAULT_JITTER_RATIO):
+    latency_ms = {} if no_latency else dict(DEFAULT_LATENCY_MS)
+    latency_ms.update(latency or {})
+    profiles = {}
+    for service in set(DEFAULT_LATENCY_MS) | set(latency_ms) | set(throttle or {}) | set(error or {}):
+        base = latency_ms.get(service, 0.0)
+        profiles[service] = FaultProfile(base, base * jitter_ratio, (throttle or {}).get(service, 0.0),
+                                         (error or {}).get(service, 0.0))
+    return profiles
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='로컬 대역 서비스로 Lambda 핸들러 이벤트 재생 및 지연 측정')
+    parser.add_argument('modules', nargs='*', help='재생할 모듈 (기본: 이벤트가 있는 모든 모듈)')
+    parser.add_argument('--event-dir', default=DEFAULT_EVENT_DIR)
+    parser.add_argument('--runs', type=int, default=5, help='이벤트당 측정 횟수')
+    parser.add_argument('--warmup', type=int, default=1, help='이벤트당 측정 전 호출 횟수 (콜드 스타트 제외)')
+    parser.add_argument('--latency', action='append', metavar='SERVICE=MS', help='서비스 지연(ms) 지정')
+    parser.add_argument('--throttle', action='append', metavar='SERVICE=RATE', help='스로틀 비율 (0~1)')
+    parser.add_argument('--error', action='append', metavar='SERVICE=RATE', help='서버 오류 비율 (0~1)')
+    parser.add_argument('--no-latency', action='store_true', help='지연 주입 없이 실행 (CPU 비용만 측정)')
+    parser.add_argument('--keep-state', action='store_true', help='호출마다 seed 상태로 되돌리지 않음')
+    parser.add_argument('--seed', type=int, default=0, help='지터/장애 주입 난수 시드')
+    parser.add_argument('--json', help='보고서를 JSON 파일로 저장')
+    parser.add_argument('--compare', help='기준 보고서(JSON)와 비교')
+    parser.add_argument('--max-regression', type=float, help='--compare 시 허용할 p50 증가 비율 (초과하면 종료 코드 1)')
+    parser.add_argument('--verbose', action='store_true', help='핸들러 로그 출력')
+    args = parser.parse_args(argv)
+
+    seed_path = os.path.join(args.event_dir, SEED_FILENAME)
+    seed = _load_json(seed_path) if os.path.exists(seed_path) else {}
+    profiles = build_profiles(_parse_overrides(args.latency), _parse_overrides(args.throttle),
+                              _parse_overrides(args.error), args.no_latency)
+    harness = Harness(profiles, seed, rng_seed=args.seed).install()
+    cases = discover_events(args.event_dir, args.modules)
+    if not cases:
+        print(f"[Error] 재생할 이벤트가 없습니다: {args.event_dir}")
+        return 2
+
+    report = replay(harness, cases, runs=args.runs, warmup=args.warmup, fresh_state=not args.keep_state,
+                    verbose=args.verbose)
+    harness.uninstall()
+    print_report(report)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            if not compare_reports(json.load(f), report, args.max_regression):
+                return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
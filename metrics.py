@@ -0,0 +1,241 @@
+import functools
+import json
+import os
+import threading
+import time
+import types
+
+# 단계별 지연 시간/토큰 계측 (CloudWatch Embedded Metric Format).
+# - 핸들러: @metrics.handler('이름') 으로 감싸면 인보크가 끝날 때 단계별 EMF 줄을 한 번에 출력한다.
+# - AWS 호출: awsClients가 만든 클라이언트에 botocore 이벤트 훅을 걸어 '서비스.오퍼레이션' 단계로 자동 기록.
+# - LLM 호출: llmGateway가 'llm:<모델>' 단계로 지연 시간과 입력/출력 토큰(프롬프트 캐시 읽기/생성 포함)을 기록.
+# - 그 밖의 구간: with metrics.span('단계'): ...
+# METRICS_ENABLED=0 이면 데코레이터는 원래 함수를 그대로 돌려주고, 훅은 걸지 않으며, span은 빈 컨텍스트다.
+#
+# 출력 예 (Latency 값 목록으로 CloudWatch가 p50/p99를 계산):
+#   {"_aws": {...}, "Handler": "calculate-scores", "Stage": "s3.GetObject", "Latency": [12.1, 9.8], "Calls": 2, ...}
+
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+METRICS_NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'AIInterview')
+MAX_VALUES_PER_LINE = 100  # EMF 값 배열 최대 길이
+HANDLER_STAGE = 'handler'
+
+_lock = threading.Lock()
+_handler_name = None
+_stages = {}  # stage -> {'latency': [...], 'calls', 'errors', 'input_tokens', 'output_tokens', 'cache_*_tokens'}
+
+
+def _stage(name):
+    stage = _stages.get(name)
+    if stage is None:
+        stage = _stages[name] = {'latency': [], 'calls': 0, 'errors': 0, 'input_tokens': 0, 'output_tokens': 0,
+                                 'cache_read_tokens': 0, 'cache_write_tokens': 0}
+    return stage
+
+
+def record(stage, elapsed_ms, error=False, input_tokens=0, output_tokens=0):
+    """단계 호출 한 번을 기록합니다."""
+    if not METRICS_ENABLED:
+        return
+    with _lock:
+        entry = _stage(stage)
+        entry['latency'].append(round(elapsed_ms, 3))
+        entry['calls'] += 1
+        entry['errors'] += 1 if error else 0
+        entry['input_tokens'] += input_tokens or 0
+        entry['output_tokens'] += output_tokens or 0
+
+
+def record_tokens(stage, usage):
+    """지연 시간 없이 토큰 사용량만 더합니다.
+
+    usage: {'input_tokens', 'output_tokens', 'cache_read_input_tokens', 'cache_creation_input_tokens'}
+    (input_tokens는 프롬프트 캐시를 거치지 않은 입력 토큰)
+    """
+    if not METRICS_ENABLED or not usage:
+        return
+    with _lock:
+        entry = _stage(stage)
+        entry['input_tokens'] += usage.get('input_tokens', 0) or 0
+        entry['output_tokens'] += usage.get('output_tokens', 0) or 0
+        entry['cache_read_tokens'] += usage.get('cache_read_input_tokens', 0) or 0
+        entry['cache_write_tokens'] += usage.get('cache_creation_input_tokens', 0) or 0
+
+
+class _Span:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record(self.name, (time.perf_counter() - self.start) * 1000, error=exc_type is not None)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name):
+    """with 블록 구간의 지연 시간을 name 단계로 기록합니다."""
+    return _Span(name) if METRICS_ENABLED else _NOOP_SPAN
+
+
+# --- botocore 훅 ---
+def _before_call(model, context, **kwargs):
+    # before-call은 Stubber 등 응답을 가로채는 훅이 먼저 처리할 수 있어 before-parameter-build에서 시작한다
+    context['metrics_stage'] = f"{model.service_model.endpoint_prefix}.{model.name}"
+    context['metrics_start'] = time.perf_counter()
+
+
+def _finish_call(context, error):
+    start = context.pop('metrics_start', None)
+    if start is not None:
+        record(context.pop('metrics_stage'), (time.perf_counter() - start) * 1000, error=error)
+
+
+def _after_call(http_response, context, **kwargs):
+    _finish_call(context, getattr(http_response, 'status_code', 200) >= 400)
+
+
+def _after_call_error(context, **kwargs):
+    # 연결 실패 등으로 응답 자체를 받지 못한 경우
+    _finish_call(context, True)
+
+
+def instrument_client(client):
+    """boto3 클라이언트의 모든 API 호출을 계측합니다 (비활성화 시 아무것도 하지 않음)."""
+    if METRICS_ENABLED:
+        events = client.meta.events
+        events.register('before-parameter-build', _before_call, unique_id='metrics-before-call')
+        events.register('after-call', _after_call, unique_id='metrics-after-call')
+        events.register('after-call-error', _after_call_error, unique_id='metrics-after-call-error')
+    return client
+
+
+# --- EMF 출력 ---
+def _documents(handler_name, stage, entry):
+    latency = entry['latency']
+    for offset in range(0, max(len(latency), 1), MAX_VALUES_PER_LINE):
+        first = offset == 0
+        metrics, doc = [], {'Handler': handler_name, 'Stage': stage}
+        if latency:
+            metrics.append({'Name': 'Latency', 'Unit': 'Milliseconds'})
+            doc['Latency'] = latency[offset:offset + MAX_VALUES_PER_LINE]
+        if first:
+            # 횟수/토큰은 첫 줄에만 싣는다 (값 배열을 나눠 출력해도 중복 집계되지 않도록)
+            metrics += [{'Name': 'Calls', 'Unit': 'Count'}, {'Name': 'Errors', 'Unit': 'Count'}]
+            doc.update(Calls=entry['calls'], Errors=entry['errors'])
+            if entry['input_tokens'] or entry['output_tokens']:
+                metrics += [{'Name': 'InputTokens', 'Unit': 'Count'}, {'Name': 'OutputTokens', 'Unit': 'Count'}]
+                doc.update(InputTokens=entry['input_tokens'], OutputTokens=entry['output_tokens'])
+            if entry['cache_read_tokens'] or entry['cache_write_tokens']:
+                metrics += [{'Name': 'CacheReadTokens', 'Unit': 'Count'}, {'Name': 'CacheWriteTokens', 'Unit': 'Count'}]
+                doc.update(CacheReadTokens=entry['cache_read_tokens'], CacheWriteTokens=entry['cache_write_tokens'])
+        doc['_aws'] = {
+            'Timestamp': int(time.time() * 1000),
+            'CloudWatchMetrics': [{'Namespace': METRICS_NAMESPACE, 'Dimensions': [['Handler', 'Stage']],
+                                   'Metrics': metrics}]
+        }
+        yield doc
+
+
+def flush():
+    """모인 단계별 지표를 EMF 줄로 출력하고 비웁니다. 출력한 줄 수를 반환합니다."""
+    global _stages
+    with _lock:
+        stages, _stages = _stages, {}
+    handler_name = _handler_name or os.environ.get('AWS_LAMBDA_FUNCTION_NAME', 'unknown')
+    lines = 0
+    for stage, entry in stages.items():
+        for doc in _documents(handler_name, stage, entry):
+            print(json.dumps(doc, ensure_ascii=False))
+            lines += 1
+    return lines
+
+
+def emit(dimensions, values, units=None, dimension_sets=None, properties=None):
+    """집계 없이 EMF 줄 하나를 바로 출력합니다 (Handler/Stage와 다른 차원이 필요한 지표용).
+
+    dimension_sets를 주지 않으면 dimensions의 키 전체를 한 차원 묶음으로 씁니다.
+    properties는 로그에만 남는 속성입니다 (jobId처럼 값 종류가 많아 차원으로 쓰면 지표 수가 늘어나는 값, Logs Insights로 집계).
+    """
+    if not METRICS_ENABLED:
+        return
+    units = units or {}
+    doc = dict(properties or {}, **dimensions, **values)
+    doc['_aws'] = {
+        'Timestamp': int(time.time() * 1000),
+        'CloudWatchMetrics': [{'Namespace': METRICS_NAMESPACE,
+                               'Dimensions': dimension_sets or [list(dimensions)],
+                               'Metrics': [{'Name': name, 'Unit': units.get(name, 'None')} for name in values]}]
+    }
+    print(json.dumps(doc, ensure_ascii=False))
+
+
+def snapshot():
+    """현재까지 모인 단계별 지표 사본 (출력하지 않음)."""
+    with _lock:
+        return {stage: dict(entry, latency=list(entry['latency'])) for stage, entry in _stages.items()}
+
+
+def _begin(name):
+    global _handler_name
+    _handler_name = name
+    return time.perf_counter()
+
+
+def _end(start, error):
+    record(HANDLER_STAGE, (time.perf_counter() - start) * 1000, error=error)
+    flush()
+
+
+def _wrap_generator(generator, start):
+    error = False
+    try:
+        yield from generator
+    except BaseException:
+        error = True
+        raise
+    finally:
+        _end(start, error)
+
+
+def handler(name):
+    """Lambda 핸들러 데코레이터. 인보크 전체 시간을 'handler' 단계로 기록하고 끝나면 flush() 합니다.
+
+    생성기 핸들러(스트리밍)는 스트림이 끝날 때 flush 합니다.
+    """
+    def decorator(func):
+        if not METRICS_ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(event, context):
+            start = _begin(name)
+            try:
+                result = func(event, context)
+            except BaseException:
+                _end(start, True)
+                raise
+            if isinstance(result, types.GeneratorType):
+                return _wrap_generator(result, start)
+            status = result.get('statusCode', 200) if isinstance(result, dict) else 200
+            _end(start, isinstance(status, int) and status >= 500)
+            return result
+        return wrapper
+    return decorator
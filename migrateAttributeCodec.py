@@ -0,0 +1,124 @@
+import json
+import os
+import attributeCodec
+import awsClients
+import metrics
+import questionBank
+
+# 기존 항목의 큰 속성을 attributeCodec 형식(압축 Binary)으로 다시 쓰는 일회성 마이그레이션
+# - 테이블을 스캔하며 임계값 이상인 대상 속성만 update_item으로 교체 (이미 압축된 값/작은 값은 건너뜀)
+# - 스캔 중 다른 요청이 항목을 바꿨으면 조건부 쓰기가 실패하고 그 항목은 건너뜀 (다음 쓰기 때 압축됨)
+# - 남은 시간이 MIGRATION_TIME_MARGIN_MS보다 적으면 멈추고 start_key를 돌려준다 (같은 이벤트에 넣어 이어서 실행)
+#
+# 이벤트 예시
+#   {"target": "postings"}                        선택: "start_key", "segment", "total_segments", "dry_run"
+#   {"target": "sessions", "total_segments": 4, "segment": 0}
+
+MIGRATION_TIME_MARGIN_MS = int(os.environ.get('MIGRATION_TIME_MARGIN_MS', '20000'))
+MIGRATION_PAGE_SIZE = int(os.environ.get('MIGRATION_PAGE_SIZE', '100'))
+MIGRATION_AUTO_CONTINUE = os.environ.get('MIGRATION_AUTO_CONTINUE', '0') == '1'  # 미완료 시 자신을 비동기 재호출
+
+# 대상 테이블: 키 속성, 압축할 속성, 스캔 사이 변경을 감지하는 속성(guard), 대상 항목 조건
+TARGETS = {
+    'postings': {
+        'table': questionBank.QUESTION_BANK_TABLE, 'key': 'job_posting_id',
+        'fields': ('analysis', 'company_questions', 'generated_questions'),
+        'guard': 'bank_version',  # 질문 목록을 쓰는 쪽은 항상 bank_version을 올림
+        'eligible': lambda item: True,
+    },
+    'sessions': {
+        'table': 'Interview_Sessions', 'key': 'session_id',
+        'fields': ('questions', 'answers'),
+        'guard': 'status',
+        # 진행 중인 expressSession 항목은 list_append/size()로 갱신되므로 완료된 기록만
+        'eligible': lambda item: item.get('status') == 'COMPLETED',
+    },
+}
+
+
+def migrate_item(table, target, item, dry_run=False):
+    """항목 하나의 대상 속성을 압축해 씁니다. 바꾼 속성 이름 목록을 반환합니다."""
+    from botocore.exceptions import ClientError
+    if not target['eligible'](item):
+        return []
+    changes = {}
+    for field in target['fields']:
+        value = item.get(field)
+        if value is None or attributeCodec.is_encoded(value):
+            continue
+        encoded = attributeCodec.encode(value)
+        if encoded is not value:
+            changes[field] = encoded
+    if not changes or dry_run:
+        return list(changes)
+
+    names = {f'#f{i}': field for i, field in enumerate(changes)}
+    values = {f':f{i}': value for i, value in enumerate(changes.values())}
+    names.update({'#key': target['key'], '#guard': target['guard']})
+    if target['guard'] in item:
+        condition = "attribute_exists(#key) AND #guard = :guard"
+        values[':guard'] = item[target['guard']]
+    else:
+        condition = "attribute_exists(#key) AND attribute_not_exists(#guard)"
+    try:
+        table.update_item(
+            Key={target['key']: item[target['key']]},
+            UpdateExpression="SET " + ", ".join(f"#f{i} = :f{i}" for i in range(len(changes))),
+            ConditionExpression=condition,
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values
+        )
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+            raise
+        print(f"[Info] 스캔 이후 변경된 항목 (건너뜀): {item[target['key']]}")
+        return []
+    return list(changes)
+
+
+def _continue(event, context):
+    awsClients.get_client('lambda').invoke(FunctionName=context.invoked_function_arn, InvocationType='Event',
+                                           Payload=json.dumps(event).encode('utf-8'))
+    print("[Info] 남은 항목을 위해 비동기 재호출")
+
+
+@metrics.handler('migrateAttributeCodec')
+def lambda_handler(event, context):
+    # 1. 입력 확인
+    target = TARGETS.get(event.get('target'))
+    if target is None:
+        return {'statusCode': 400, 'body': json.dumps({'error': f"target은 {sorted(TARGETS)} 중 하나여야 합니다."})}
+    table = awsClients.get_table(target['table'])
+    dry_run = bool(event.get('dry_run'))
+    scan_kwargs = {'Limit': MIGRATION_PAGE_SIZE}
+    if event.get('total_segments'):
+        scan_kwargs.update(Segment=int(event.get('segment', 0)), TotalSegments=int(event['total_segments']))
+    start_key = event.get('start_key')
+
+    # 2. 페이지 단위로 스캔하며 압축
+    summary = {'scanned': 0, 'migrated': 0, 'fields': 0}
+    while True:
+        if start_key:
+            scan_kwargs['ExclusiveStartKey'] = start_key
+        page = table.scan(**scan_kwargs)
+        for item in page.get('Items', []):
+            summary['scanned'] += 1
+            changed = migrate_item(table, target, item, dry_run)
+            if changed:
+                summary['migrated'] += 1
+                summary['fields'] += len(changed)
+        start_key = page.get('LastEvaluatedKey')
+        if not start_key:
+            break
+        if context is not None and context.get_remaining_time_in_millis() < MIGRATION_TIME_MARGIN_MS:
+            break
+
+    # 3. 결과 (미완료면 start_key로 이어서 실행)
+    summary.update(status='incomplete' if start_key else 'complete', start_key=start_key, dry_run=dry_run,
+                   codec=attributeCodec.get_stats())
+    print(f"[Info] 속성 압축 마이그레이션 ({event.get('target')}): {summary}")
+    if start_key and MIGRATION_AUTO_CONTINUE and context is not None:
+        _continue(dict(event, start_key=start_key), context)
+    return {'statusCode': 200, 'body': json.dumps(summary, ensure_ascii=False, default=str)}
+
+awsClients.prime_on_init()
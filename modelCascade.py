@@ -0,0 +1,168 @@
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import jsonExtract
+import llmCache
+import llmGateway
+import metrics
+import promptCompiler
+
+# 모델 캐스케이드: 빠르고 저렴한 모델을 먼저 호출하고, 필요할 때만 큰 모델로 올린다.
+# 큰 모델로 올리는 경우 (reason)
+#   complexity   : 프롬프트 추정 토큰이 MODEL_CASCADE_COMPLEXITY_TOKENS를 넘음 (빠른 모델을 건너뜀)
+#   schema       : 빠른 모델 출력이 스키마 검증에 실패
+#   disagreement : 빠른 모델 결과가 별도의 짧은 2차 의견(빠른 모델, 동시 호출)과 어긋남
+#   fast_error   : 빠른 모델 호출 자체가 실패
+# MODEL_CASCADE=1 일 때만 동작하고, 꺼져 있으면 지정한 모델을 기존처럼 바로 호출한다.
+
+MODEL_CASCADE = os.environ.get('MODEL_CASCADE', '0') == '1'
+MODEL_CASCADE_FAST_MODEL_ID = os.environ.get('MODEL_CASCADE_FAST_MODEL_ID', 'anthropic.claude-3-haiku-20240307-v1:0')
+MODEL_CASCADE_COMPLEXITY_TOKENS = int(os.environ.get('MODEL_CASCADE_COMPLEXITY_TOKENS', '6000'))
+MODEL_CASCADE_WORKERS = int(os.environ.get('MODEL_CASCADE_WORKERS', '4'))  # 2차 의견 동시 호출용
+LATENCY_EWMA_ALPHA = 0.2  # 큰 모델 평균 지연 시간 갱신 비율
+
+# prompt/schema: 2차 의견 요청, agrees(주 결과, 2차 의견) -> 일치 여부
+SecondOpinion = namedtuple('SecondOpinion', ['prompt', 'schema', 'agrees'])
+
+_lock = threading.Lock()
+_executor = None
+_strong_latency_ms = {}  # 캐스케이드 이름 -> 큰 모델 평균 지연 시간(ms)
+_job_stats = {}  # job_id -> {'calls', 'escalations', 'reasons', 'latency_saved_ms'}
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=MODEL_CASCADE_WORKERS)
+    return _executor
+
+
+def _invoke(prompt, model_id, max_tokens, region, invoke_kwargs):
+    started = time.perf_counter()
+    result = llmGateway.invoke_bedrock(prompt, model_id=model_id, max_tokens=max_tokens, region=region,
+                                       **invoke_kwargs)
+    return result, (time.perf_counter() - started) * 1000
+
+
+def _invalidate(prompt, model_id, max_tokens, invoke_kwargs):
+    """잘못된 응답이 캐시에 남아 매번 같은 단계를 반복하지 않도록 캐시 항목을 지웁니다."""
+    if invoke_kwargs.get('use_cache'):
+        params = llmGateway.bedrock_cache_params(max_tokens, invoke_kwargs.get('temperature'),
+                                                 invoke_kwargs.get('system'))
+        llmCache.invalidate_for(model_id, llmGateway.full_prompt(prompt, invoke_kwargs.get('cache_prefix')), params)
+
+
+def _strong(name, prompt, schema, model_id, max_tokens, region, repair, invoke_kwargs):
+    result, elapsed_ms = _invoke(prompt, model_id, max_tokens, region, invoke_kwargs)
+    if not result.get('cached'):
+        with _lock:
+            previous = _strong_latency_ms.get(name)
+            _strong_latency_ms[name] = elapsed_ms if previous is None else \
+                previous + LATENCY_EWMA_ALPHA * (elapsed_ms - previous)
+    value = jsonExtract.extract(
+        result['text'], schema, name=name,
+        repair=jsonExtract.bedrock_repairer(schema, region=region) if repair else None)
+    return value, elapsed_ms, result
+
+
+def _fast(name, prompt, schema, max_tokens, region, second_opinion, invoke_kwargs):
+    """(빠른 모델 결과, 올려야 하는 이유 또는 None, 지연 시간, 호출 결과)를 반환합니다."""
+    opinion = None
+    if second_opinion is not None:
+        opinion = _get_executor().submit(_invoke, second_opinion.prompt, MODEL_CASCADE_FAST_MODEL_ID,
+                                         200, region, {'temperature': 0})
+    try:
+        result, elapsed_ms = _invoke(prompt, MODEL_CASCADE_FAST_MODEL_ID, max_tokens, region, invoke_kwargs)
+    except Exception as e:
+        print(f"[Warn] 빠른 모델 호출 실패 ({name}): {e}")
+        return None, 'fast_error', 0.0, None
+    try:
+        value = jsonExtract.extract(result['text'], schema, name=f"{name}:fast")
+    except jsonExtract.JSONExtractionError as e:
+        print(f"[Info] 빠른 모델 출력 스키마 불일치 ({name}): {e}")
+        _invalidate(prompt, MODEL_CASCADE_FAST_MODEL_ID, max_tokens, invoke_kwargs)
+        return None, 'schema', elapsed_ms, None
+
+    if opinion is not None:
+        try:
+            opinion_result, _ = opinion.result()
+            opinion_value = jsonExtract.extract(opinion_result['text'], second_opinion.schema,
+                                                name=f"{name}:second_opinion")
+        except Exception as e:
+            # 2차 의견을 얻지 못하면 빠른 모델 결과를 그대로 사용
+            print(f"[Warn] 2차 의견 확인 실패 ({name}): {e}")
+        else:
+            if not second_opinion.agrees(value, opinion_value):
+                print(f"[Info] 2차 의견 불일치 ({name}): {opinion_value}")
+                _invalidate(prompt, MODEL_CASCADE_FAST_MODEL_ID, max_tokens, invoke_kwargs)
+                return None, 'disagreement', elapsed_ms, None
+    return value, None, elapsed_ms, result
+
+
+def _result_info(result):
+    return {'cached': bool(result.get('cached')), 'usage': result.get('usage', {})}
+
+
+def _record(name, job_id, info):
+    job_id = job_id or 'unknown'
+    with _lock:
+        stats = _job_stats.setdefault(job_id, {'calls': 0, 'escalations': 0, 'reasons': {}, 'latency_saved_ms': 0.0})
+        stats['calls'] += 1
+        if info['escalated']:
+            stats['escalations'] += 1
+            stats['reasons'][info['reason']] = stats['reasons'].get(info['reason'], 0) + 1
+        stats['latency_saved_ms'] += info['latency_saved_ms'] or 0.0
+    metrics.emit({'Cascade': name},
+                  {'Escalated': 1 if info['escalated'] else 0, 'LatencySavedMs': info['latency_saved_ms'] or 0.0},
+                  units={'Escalated': 'Count', 'LatencySavedMs': 'Milliseconds'},
+                  properties={'JobId': job_id})
+    print(f"[Info] 모델 캐스케이드 ({name}, job={job_id}): {info['model_id']}"
+          f"{' (상향: ' + info['reason'] + ')' if info['escalated'] else ''}, 절감 {info['latency_saved_ms']}ms")
+
+
+def invoke_json(name, prompt, schema, model_id, max_tokens=1000, region=None, job_id=None,
+                second_opinion=None, repair=True, **invoke_kwargs):
+    """스키마에 맞는 JSON 결과를 얻습니다. 캐스케이드가 켜져 있으면 빠른 모델을 먼저 시도합니다.
+
+    model_id는 큰 모델이며, 반환값은 (value, info) 입니다.
+    info: {'model_id', 'escalated', 'reason', 'cached', 'usage', 'latency_ms', 'latency_saved_ms'}
+      usage: 최종 결과를 만든 호출의 토큰 사용량 (llmGateway.parse_bedrock_response 형식)
+      latency_saved_ms: 큰 모델 평균 지연 시간 대비 절감량 (상향된 경우 빠른 모델에 쓴 시간만큼 음수)
+    """
+    if not MODEL_CASCADE or model_id == MODEL_CASCADE_FAST_MODEL_ID:
+        value, elapsed_ms, result = _strong(name, prompt, schema, model_id, max_tokens, region, repair, invoke_kwargs)
+        return value, {'model_id': model_id, 'escalated': False, 'reason': None, **_result_info(result),
+                       'latency_ms': round(elapsed_ms, 1), 'latency_saved_ms': None}
+
+    fast_ms, result = 0.0, None
+    if promptCompiler.estimate_tokens(llmGateway.full_prompt(prompt, invoke_kwargs.get('cache_prefix'))) > \
+            MODEL_CASCADE_COMPLEXITY_TOKENS:
+        value, reason = None, 'complexity'
+    else:
+        value, reason, fast_ms, result = _fast(name, prompt, schema, max_tokens, region, second_opinion, invoke_kwargs)
+
+    if reason is None:
+        strong_avg = _strong_latency_ms.get(name)
+        info = {'model_id': MODEL_CASCADE_FAST_MODEL_ID, 'escalated': False, 'reason': None, **_result_info(result),
+                'latency_ms': round(fast_ms, 1),
+                'latency_saved_ms': round(strong_avg - fast_ms, 1) if strong_avg is not None else None}
+    else:
+        value, strong_ms, result = _strong(name, prompt, schema, model_id, max_tokens, region, repair, invoke_kwargs)
+        info = {'model_id': model_id, 'escalated': True, 'reason': reason, **_result_info(result),
+                'latency_ms': round(fast_ms + strong_ms, 1), 'latency_saved_ms': round(-fast_ms, 1) or 0.0}
+    _record(name, job_id, info)
+    return value, info
+
+
+def get_stats():
+    """job_id별 호출 수, 상향 수/비율, 누적 절감 시간."""
+    with _lock:
+        return {
+            job_id: dict(stats, reasons=dict(stats['reasons']), latency_saved_ms=round(stats['latency_saved_ms'], 1),
+                         escalation_rate=round(stats['escalations'] / stats['calls'], 4) if stats['calls'] else 0.0)
+            for job_id, stats in _job_stats.items()
+        }
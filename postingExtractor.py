@@ -0,0 +1,235 @@
+import codecs
+import hashlib
+import os
+import re
+from html.parser import HTMLParser
+
+# 채용 공고 전처리 (analyzeJobPostiong이 LLM에 보내기 전 단계)
+# - S3 본문을 POSTING_CHUNK_BYTES 단위로 읽고 POSTING_MAX_BYTES에서 멈춤 (전체를 메모리에 올리지 않음)
+# - HTML이면 태그/스크립트/스타일/내비게이션/머리말·꼬리말을 걷어내고 블록 단위로 줄을 나눔
+# - 공백을 정규화한 문단 해시로 반복 문단(복리후생/안내 문구 반복 등)을 제거
+# - 제목 줄로 섹션을 나눠 인재상/경영철학/핵심역량에 해당하는 섹션만 남김
+#   (관련 제목이 없거나 남은 내용이 POSTING_MIN_SECTION_CHARS보다 적으면 제목 구분이 안 된 공고로 보고 정리된 전체 본문 사용)
+# 모든 단계가 줄 단위로 이어져 있어 조각이 들어오는 대로 처리된다.
+
+POSTING_MAX_BYTES = int(os.environ.get('POSTING_MAX_BYTES', str(2 * 1024 * 1024)))
+POSTING_CHUNK_BYTES = int(os.environ.get('POSTING_CHUNK_BYTES', str(64 * 1024)))
+POSTING_MAX_CHARS = int(os.environ.get('POSTING_MAX_CHARS', '12000'))          # 결과 텍스트 상한
+POSTING_INTRO_CHARS = int(os.environ.get('POSTING_INTRO_CHARS', '800'))        # 첫 제목 전 회사 소개에서 남길 길이
+POSTING_MIN_SECTION_CHARS = int(os.environ.get('POSTING_MIN_SECTION_CHARS', '100'))
+POSTING_SECTION_FILTER = os.environ.get('POSTING_SECTION_FILTER', '1') == '1'
+
+# 남길 섹션 제목 (인재상/경영철학/핵심역량 판단에 쓰임). 공백/콜론을 뺀 제목 전체가 일치할 때만 인정
+RELEVANT_HEADINGS = frozenset((
+    '인재상', '찾는인재', '이런분을찾습니다', '이런분이면좋아요', '이런분과함께하고싶어요', '우대사항', '우대조건',
+    '경영철학', '비전', '미션', '핵심가치', '기업문화', '조직문화', '회사소개', '기업소개',
+    '핵심역량', '필요역량', '역량', '자격요건', '지원자격', '자격조건', '필수요건', '필수조건',
+    '주요업무', '담당업무', '업무내용', '직무내용', '직무소개', '하는일', '이런일을해요',
+    'idealcandidate', 'vision', 'mission', 'values', 'corevalues', 'culture', 'aboutus', 'qualifications',
+    'requirements', 'preferredqualifications', 'responsibilities', 'whatyoulldo', 'skills', 'competencies',
+))
+# 버릴 섹션 제목
+IRRELEVANT_HEADINGS = frozenset((
+    '복리후생', '복지', '혜택', '복지및혜택', '전형절차', '채용절차', '채용과정', '전형방법', '근무조건', '근무환경',
+    '근무지', '근무형태', '급여', '연봉', '처우', '접수기간', '접수방법', '지원방법', '제출서류', '문의', '문의처',
+    '기타', '기타사항', '유의사항', '참고사항', '마감일', 'benefits', 'perks', 'hiringprocess', 'howtoapply',
+    'salary', 'contact', 'notice',
+))
+# 어느 섹션에 있든 버리는 안내/법적 문구
+BOILERPLATE_PATTERNS = re.compile(
+    r'copyright|©|all rights reserved|개인정보|이용약관|쿠키|cookie|로그인|회원가입|공유하기|스크랩|'
+    r'사업자등록번호|통신판매|고객센터|허위|채용절차법|top\s*$', re.IGNORECASE)
+
+# 내용을 건너뛰는 HTML 요소 / 줄을 나누는 블록 요소
+_SKIP_TAGS = {'script', 'style', 'noscript', 'svg', 'nav', 'header', 'footer', 'form', 'button', 'select',
+              'iframe', 'template', 'head'}
+_BLOCK_TAGS = {'p', 'div', 'br', 'li', 'ul', 'ol', 'tr', 'td', 'th', 'table', 'section', 'article', 'main',
+               'aside', 'dl', 'dt', 'dd', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'blockquote', 'pre'}
+_HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'dt', 'th'}
+_HTML_RE = re.compile(r'<\s*(!doctype|html|head|body|div|p|br|span|table|ul|li|h[1-6])\b', re.IGNORECASE)
+# 제목 줄 형식: [제목] / 【제목】 …, # 제목, ■ 제목 (목록 기호 -, •, *, 1. 등으로 시작하는 줄은 제목이 아님)
+_BRACKET_HEADING_RE = re.compile(r'^[\[【「『<]\s*([^\]】」』>]{1,20})[\]】」』>]')
+_MARKED_HEADING_RE = re.compile(r'^(?:#{1,6}|[■□▶▷◆◇])\s*(.+)$')
+_BULLET_RE = re.compile(r'^(?:[\-–•·*●○※☞✔✓]|\d{1,2}[.)]\s)')
+_HEADING_MAX_CHARS = 40
+
+
+class _HTMLText(HTMLParser):
+    """HTML 조각을 받아 보이는 텍스트만 줄 단위로 넘깁니다."""
+
+    def __init__(self, emit):
+        super().__init__(convert_charrefs=True)
+        self.emit = emit
+        self._skip = 0
+        self._heading = 0
+        self._buffer = []
+
+    def _flush(self):
+        text = ''.join(self._buffer)
+        self._buffer = []
+        for line in text.splitlines():
+            self.emit(line, heading=self._heading > 0)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TAGS:
+            self._skip += 1
+        elif tag in _BLOCK_TAGS or tag in _HEADING_TAGS:
+            self._flush()
+            if tag in _HEADING_TAGS:
+                self._heading += 1
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in _BLOCK_TAGS:
+            self._flush()
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif tag in _BLOCK_TAGS or tag in _HEADING_TAGS:
+            self._flush()
+            if tag in _HEADING_TAGS:
+                self._heading = max(0, self._heading - 1)
+
+    def handle_data(self, data):
+        if not self._skip:
+            self._buffer.append(data)
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+def _normalize(line):
+    return re.sub(r'\s+', ' ', line).strip()
+
+
+def _heading_label(line, marked=False):
+    """제목 줄이면 제목 부분을, 아니면 None을 반환합니다. marked: HTML 제목 요소에서 나온 줄."""
+    bracketed = _BRACKET_HEADING_RE.match(line)
+    if bracketed:
+        # "[인재상] 도전하는 인재"처럼 제목과 내용이 한 줄에 있으면 괄호 안만 제목
+        return bracketed.group(1)
+    if marked:
+        return line
+    if _BULLET_RE.match(line) or len(line) > _HEADING_MAX_CHARS:
+        return None
+    hashed = _MARKED_HEADING_RE.match(line)
+    return hashed.group(1) if hashed else line  # 기호 없는 짧은 줄은 제목 전체가 일치할 때만 제목으로 인정
+
+
+def _heading_kind(line, marked=False):
+    """제목 줄이면 'keep'/'drop', 아니면 None."""
+    label = _heading_label(line, marked)
+    if label is None:
+        return None
+    label = re.sub(r"\(.*?\)$", '', label.strip())  # "자격 요건 (필수)"
+    label = re.sub(r"[\s:：'’]", '', label).lower()
+    if label in IRRELEVANT_HEADINGS:
+        return 'drop'
+    if label in RELEVANT_HEADINGS:
+        return 'keep'
+    return None
+
+
+class Extractor:
+    """조각 단위로 feed()하고 close()로 결과 텍스트를 받습니다."""
+
+    def __init__(self, html=False, section_filter=POSTING_SECTION_FILTER):
+        self.section_filter = section_filter
+        self._html = _HTMLText(self._line) if html else None
+        self._pending = ''
+        self._seen = set()
+        self._cleaned = []    # 중복/안내 문구를 뺀 전체 문단 (섹션 필터 결과가 부족할 때 사용)
+        self._kept = []       # 관련 섹션 문단
+        self._section = 'intro'
+        self._intro_chars = 0
+        self.stats = {'html': html, 'lines': 0, 'duplicates': 0, 'boilerplate': 0, 'sections': []}
+
+    def _line(self, line, heading=False):
+        line = _normalize(line)
+        if not line:
+            return
+        self.stats['lines'] += 1
+        if BOILERPLATE_PATTERNS.search(line) and len(line) < 200:
+            self.stats['boilerplate'] += 1
+            return
+        digest = hashlib.md5(line.lower().encode('utf-8')).digest()
+        if digest in self._seen:
+            self.stats['duplicates'] += 1
+            return
+        self._seen.add(digest)
+        self._cleaned.append(line)
+
+        kind = _heading_kind(line, marked=heading)
+        if kind is not None:
+            self._section = kind
+            if kind == 'keep':
+                self.stats['sections'].append(line[:_HEADING_MAX_CHARS])
+        if self._section == 'keep':
+            self._kept.append(line)
+        elif self._section == 'intro' and self._intro_chars < POSTING_INTRO_CHARS:
+            self._kept.append(line)
+            self._intro_chars += len(line)
+
+    def feed(self, text):
+        if self._html is not None:
+            self._html.feed(text)
+            return
+        lines = (self._pending + text).split('\n')
+        self._pending = lines.pop()
+        for line in lines:
+            self._line(line)
+
+    def close(self):
+        if self._html is not None:
+            self._html.close()
+        elif self._pending:
+            self._line(self._pending)
+            self._pending = ''
+        kept = self._kept if self.section_filter else self._cleaned
+        if self.section_filter and (not self.stats['sections']
+                                    or sum(len(line) for line in kept) < POSTING_MIN_SECTION_CHARS):
+            kept = self._cleaned  # 제목으로 섹션이 구분되지 않는 짧은/평문 공고
+            self.stats['sections'] = []
+        text = '\n'.join(kept)
+        self.stats['truncated_chars'] = max(0, len(text) - POSTING_MAX_CHARS)
+        return text[:POSTING_MAX_CHARS]
+
+
+def looks_like_html(sample, content_type=None):
+    return 'html' in (content_type or '').lower() or bool(_HTML_RE.search(sample[:4096]))
+
+
+def extract(body, content_type=None, max_bytes=POSTING_MAX_BYTES, chunk_bytes=POSTING_CHUNK_BYTES):
+    """S3 본문(스트림 또는 bytes/str)에서 분석할 텍스트를 뽑아 (text, stats)를 반환합니다."""
+    if isinstance(body, (bytes, str)):
+        data = body.encode('utf-8') if isinstance(body, str) else body
+        chunks = (data[i:i + chunk_bytes] for i in range(0, min(len(data), max_bytes + 1), chunk_bytes))
+    else:
+        chunks = iter(lambda: body.read(chunk_bytes), b'')
+
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    extractor = None
+    bytes_read = 0
+    truncated = False
+    for chunk in chunks:
+        if bytes_read + len(chunk) > max_bytes:
+            chunk = chunk[:max_bytes - bytes_read]
+            truncated = True
+        bytes_read += len(chunk)
+        text = decoder.decode(chunk)
+        if extractor is None:
+            extractor = Extractor(html=looks_like_html(text, content_type))
+        extractor.feed(text)
+        if truncated:
+            break
+    if extractor is None:
+        extractor = Extractor()
+    extractor.feed(decoder.decode(b'', final=True))
+    text = extractor.close()
+    stats = dict(extractor.stats, bytes_read=bytes_read, truncated=truncated, output_chars=len(text))
+    if truncated:
+        print(f"[Warn] 채용 공고가 {max_bytes} 바이트를 넘어 앞부분만 읽었습니다.")
+    print(f"[Info] 채용 공고 전처리: {bytes_read}B → {len(text)}자 (HTML {stats['html']}, 중복 {stats['duplicates']}, "
+          f"안내 문구 {stats['boilerplate']}, 섹션 {len(stats['sections'])}개)")
+    return text, stats
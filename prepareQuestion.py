@@ -1,17 +1,22 @@
 import json
-import boto3
+import awsClients
+import interviewState
+import metrics
 
-dynamodb = boto3.resource('dynamodb')
-tasks_table = dynamodb.Table('Interview_Tasks')
+tasks_table = awsClients.lazy_table('Interview_Tasks')
 
+@metrics.handler('prepareQuestion')
 def lambda_handler(event, context):
     # Step Functions가 이 람다를 호출할 때 자동으로 event에 정보를 넣어줌
     current_state = event['Payload']
     task_token = event['Token']
     execution_arn = event['Execution']['Id']
 
-    # 현재 질문 찾기
-    current_question = current_state['questions'][current_state['current_index']]
+    # 현재 질문 찾기 (클레임 체크 모드면 저장소에서 해당 질문 하나만 읽음)
+    if interviewState.is_claim_check(current_state):
+        current_question = interviewState.get_question(current_state['state_ref'], current_state['current_index'])
+    else:
+        current_question = current_state['questions'][current_state['current_index']]
 
     # '우체국' 테이블에 저장
     tasks_table.put_item(
@@ -22,3 +27,5 @@ def lambda_handler(event, context):
         }
     )
     return {} # 이 람다의 반환값은 중요하지 않음
+
+awsClients.prime_on_init()
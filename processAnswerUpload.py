@@ -0,0 +1,52 @@
+import awsClients
+import answerBundle
+import batchRecords
+import incrementalScoring
+import metrics
+
+# _answer.txt 업로드(S3 이벤트)를 받아 세션 답변 번들(answers.bundle.jsonl)에 추가합니다.
+# calculate-scores는 이 번들을 GET 한 번으로 읽습니다.
+# 답변 객체에 job-id 메타데이터가 있으면 그 답변만 바로 채점해 번들 항목에 저장합니다 (incrementalScoring).
+
+s3_client = awsClients.lazy_client('s3')
+
+@metrics.handler('processAnswerUpload')
+def lambda_handler(event, context):
+    # 여러 레코드(S3 배치 알림, SQS 배치)는 모두 처리하고 실패한 항목만 보고
+    if batchRecords.is_batch_event(event):
+        return batchRecords.process_batch(event, process_answer)
+
+    # 1. S3 이벤트 파싱
+    try:
+        bucket, key = batchRecords.s3_objects_from_record(event['Records'][0])[0]
+    except Exception as e:
+        print(f"[Error] S3 이벤트 파싱 오류: {e}")
+        return {'statusCode': 400, 'body': 'S3 이벤트 파싱 오류'}
+    return process_answer(bucket, key)
+
+def process_answer(bucket, key):
+    """답변 파일 하나를 읽어 세션 번들에 추가합니다."""
+    if not (key.startswith('interview-sessions/') and key.endswith(answerBundle.ANSWER_SUFFIX)):
+        print(f"[Info] 처리 대상 파일 아님 (무시): {key}")
+        return {'statusCode': 200, 'body': '처리 대상 아님'}
+
+    # 2. 답변 읽기
+    session_id = key.split('/')[1]
+    response = s3_client.get_object(Bucket=bucket, Key=key)
+    answer_text = response['Body'].read().decode('utf-8')
+
+    # 3. 번들에 추가 (조건부 쓰기, 충돌 시 재시도)
+    count = answerBundle.append(s3_client, bucket, session_id, key, answer_text, etag=response.get('ETag'))
+    print(f"[Success] 답변 번들 갱신: {answerBundle.bundle_key(session_id)} ({count}개)")
+
+    # 4. 답변별 채점 (실패해도 _END.txt 처리 시 다시 채점하므로 경고만 남김)
+    job_id = response.get('Metadata', {}).get(incrementalScoring.JOB_ID_METADATA_KEY)
+    if incrementalScoring.INCREMENTAL_SCORING and job_id:
+        try:
+            with metrics.span('score_answer'):
+                incrementalScoring.score_and_store(s3_client, bucket, session_id, key, answer_text, job_id)
+        except Exception as e:
+            print(f"[Warn] 답변별 채점 실패 (종료 시 다시 채점): {key} - {e}")
+    return {'statusCode': 200, 'body': '답변 번들 갱신 완료'}
+
+awsClients.prime_on_init()
@@ -0,0 +1,137 @@
+import json
+import re
+import textwrap
+import threading
+from collections import namedtuple
+
+# 프롬프트 구성 계층: 템플릿 사전 컴파일(공백 정규화), 이력서 필드 투영, 로컬 토큰 추정, 호출별 토큰 예산.
+
+TRIM_MARKER = "\n…(이하 생략)"
+
+_lock = threading.Lock()
+_stats = {}  # 프롬프트 이름별 누적 토큰 통계
+
+
+# --- 공백 정규화 / 토큰 추정 ---
+def compact(text):
+    """들여쓰기 제거, 연속 공백/빈 줄 축소."""
+    text = textwrap.dedent(text or '')
+    lines = [re.sub(r'[ \t]+', ' ', line).strip() for line in text.splitlines()]
+    return re.sub(r'\n{3,}', '\n\n', '\n'.join(lines)).strip()
+
+
+_ASCII_RE = re.compile(r'[\x00-\x7f]')
+
+
+def estimate_tokens(text):
+    """로컬 토큰 추정치. 영문/기호는 약 4자당 1토큰, 한글 등 비ASCII 문자는 1자당 약 1토큰으로 계산."""
+    if not text:
+        return 0
+    ascii_chars = len(_ASCII_RE.findall(text))
+    return int(ascii_chars / 4 + (len(text) - ascii_chars)) + 1
+
+
+# --- 이력서 투영 ---
+# 질문 생성에 필요 없는 개인정보/메타데이터 필드
+RESUME_EXCLUDED_FIELDS = {
+    'name', 'email', 'phone', 'phoneNumber', 'address', 'birth', 'birthDate', 'gender', 'photo', 'photoUrl',
+    'profileImage', 'id', 'userId', 'applicantId', 'password', 'createdAt', 'updatedAt', 'submittedAt',
+}
+
+
+def _prune(value):
+    if isinstance(value, dict):
+        pruned = {k: _prune(v) for k, v in value.items() if k not in RESUME_EXCLUDED_FIELDS}
+        return {k: v for k, v in pruned.items() if v not in (None, '', [], {})}
+    if isinstance(value, list):
+        return [v for v in (_prune(v) for v in value) if v not in (None, '', [], {})]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def project_resume(resume_data):
+    """이력서 dict에서 빈 값/개인정보 필드를 빼고 공백 없는 JSON 문자열로 만듭니다."""
+    return json.dumps(_prune(resume_data), ensure_ascii=False, separators=(',', ':'))
+
+
+# --- 템플릿 ---
+Section = namedtuple('Section', ['text', 'priority', 'raw'])
+
+
+def section(text, priority=0, raw=None, normalize=True):
+    """템플릿에 끼울 값. priority 0은 자르지 않고, 숫자가 클수록 예산 초과 시 먼저 잘립니다.
+
+    raw는 투영/정규화 이전 원문으로, 절감 토큰 계산에만 쓰입니다.
+    """
+    value = compact(text) if normalize else (text or '')
+    return Section(value, priority, text if raw is None else raw)
+
+
+def _trim(text, tokens_to_cut):
+    """텍스트 끝에서 대략 tokens_to_cut 만큼 잘라냅니다 (줄 단위 우선)."""
+    total = estimate_tokens(text)
+    if tokens_to_cut >= total:
+        return ''
+    keep_chars = max(0, int(len(text) * (total - tokens_to_cut) / total) - len(TRIM_MARKER))
+    cut = text[:keep_chars]
+    newline = cut.rfind('\n')
+    if newline > keep_chars * 0.8:
+        cut = cut[:newline]
+    return cut.rstrip() + TRIM_MARKER
+
+
+class PromptTemplate:
+    """모듈 로드 시 한 번 정규화해 두는 프롬프트 템플릿 ({이름} 자리표시자, JSON 예시는 {{ }})."""
+
+    def __init__(self, name, text, budget=None):
+        self.name = name
+        self.raw_template = text
+        self.template = compact(text)
+        self.budget = budget
+        self._fixed_tokens = estimate_tokens(re.sub(r'\{\w+\}', '', self.template))
+
+    def render(self, budget=None, **values):
+        """(prompt, report)를 반환합니다. 예산을 넘으면 priority가 낮은(숫자가 큰) 섹션부터 자릅니다."""
+        budget = budget or self.budget
+        sections = {k: v if isinstance(v, Section) else section(str(v)) for k, v in values.items()}
+        texts = {k: s.text for k, s in sections.items()}
+        trimmed = []
+
+        total = self._fixed_tokens + sum(estimate_tokens(t) for t in texts.values())
+        if budget and total > budget:
+            for key in sorted((k for k, s in sections.items() if s.priority > 0),
+                              key=lambda k: -sections[k].priority):
+                if total <= budget:
+                    break
+                before = estimate_tokens(texts[key])
+                texts[key] = _trim(texts[key], total - budget)
+                total -= before - estimate_tokens(texts[key])
+                trimmed.append(key)
+            if total > budget:
+                print(f"[Warn] 프롬프트({self.name})가 필수 섹션만으로 예산({budget})을 넘습니다: {total}")
+
+        prompt = self.template.format(**texts)
+        raw_tokens = estimate_tokens(self.raw_template) + sum(estimate_tokens(str(s.raw)) for s in sections.values())
+        report = {'name': self.name, 'raw_tokens': raw_tokens, 'tokens': estimate_tokens(prompt),
+                  'budget': budget, 'trimmed': trimmed}
+        report['saved_tokens'] = max(0, raw_tokens - report['tokens'])
+        _record(report)
+        print(f"[Info] 프롬프트({self.name}) 토큰 추정: {report['tokens']} (절감 {report['saved_tokens']}"
+              f"{', 잘린 섹션: ' + ', '.join(trimmed) if trimmed else ''})")
+        return prompt, report
+
+
+def _record(report):
+    with _lock:
+        stats = _stats.setdefault(report['name'], {'calls': 0, 'tokens': 0, 'saved_tokens': 0, 'trimmed_calls': 0})
+        stats['calls'] += 1
+        stats['tokens'] += report['tokens']
+        stats['saved_tokens'] += report['saved_tokens']
+        stats['trimmed_calls'] += 1 if report['trimmed'] else 0
+
+
+def get_stats():
+    """프롬프트 이름별 누적 토큰/절감 통계."""
+    with _lock:
+        return {name: dict(stats) for name, stats in _stats.items()}
@@ -0,0 +1,109 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+import attributeCodec
+import awsClients
+
+# 공고별 질문 뱅크(company_questions + generated_questions) 웜 인보크 캐시.
+# 질문을 쓰는 쪽(updateCompanyQuestions, generateInterviewQuestions)은 같은 update_item에서
+# bank_version을 1 올리고, 읽는 쪽은 캐시된 버전과 테이블의 bank_version을 비교해 같을 때만 캐시를 쓴다.
+#   QUESTION_BANK_CACHE_TTL     : 캐시 항목 보관 시간(초). 지나면 전체 항목을 다시 읽는다.
+#   QUESTION_BANK_TRUST_SECONDS : 버전 확인 없이 캐시를 그대로 쓰는 시간(초).
+#                                 0(기본값)이면 매번 강한 일관성 읽기로 bank_version만 확인하므로 오래된 질문을 주지 않는다.
+
+QUESTION_BANK_TABLE = os.environ.get('QUESTION_BANK_TABLE', 'AI_Interview_Data')
+QUESTION_BANK_CACHE_TTL = float(os.environ.get('QUESTION_BANK_CACHE_TTL', '300'))
+QUESTION_BANK_TRUST_SECONDS = float(os.environ.get('QUESTION_BANK_TRUST_SECONDS', '0'))
+QUESTION_BANK_CACHE_SIZE = int(os.environ.get('QUESTION_BANK_CACHE_SIZE', '256'))
+
+# 질문 뱅크를 쓰는 update_item의 UpdateExpression 끝에 붙일 버전 증가 절과 값
+BUMP_VERSION_EXPRESSION = "ADD bank_version :bank_version_one"
+BUMP_VERSION_VALUES = {':bank_version_one': 1}
+
+postings_table = awsClients.lazy_table(QUESTION_BANK_TABLE)
+
+_lock = threading.Lock()
+_cache = OrderedDict()  # job_posting_id -> {'version', 'bank', 'loaded_at', 'checked_at'}
+_stats = {'hits': 0, 'trusted_hits': 0, 'misses': 0, 'stale': 0}
+
+
+def _version(item):
+    return int(item.get('bank_version', 0))
+
+
+def _load(job_posting_id):
+    """항목 전체를 읽어 (version, bank)를 반환합니다."""
+    response = postings_table.get_item(
+        Key={'job_posting_id': job_posting_id},
+        ProjectionExpression='company_questions, generated_questions, bank_version',
+        ConsistentRead=True
+    )
+    item = attributeCodec.decode_item(response.get('Item', {}))  # 압축 저장된 질문 목록은 풀어서 사용
+    bank = {
+        'company_questions': item.get('company_questions', []),
+        'generated_questions': item.get('generated_questions', []),
+    }
+    return _version(item), bank
+
+
+def _current_version(job_posting_id):
+    """bank_version 속성만 읽습니다 (질문 목록은 전송하지 않음)."""
+    response = postings_table.get_item(
+        Key={'job_posting_id': job_posting_id},
+        ProjectionExpression='bank_version',
+        ConsistentRead=True
+    )
+    return _version(response.get('Item', {}))
+
+
+def _count(name):
+    with _lock:
+        _stats[name] += 1
+
+
+def get_bank(job_posting_id):
+    """공고의 질문 뱅크를 반환합니다: {'company_questions': [...], 'generated_questions': [...]}"""
+    now = time.time()
+    with _lock:
+        entry = _cache.get(job_posting_id)
+        if entry and now - entry['loaded_at'] >= QUESTION_BANK_CACHE_TTL:
+            del _cache[job_posting_id]
+            entry = None
+
+    if entry:
+        # 1. 신뢰 구간 안이면 읽기 없이 사용
+        if now - entry['checked_at'] < QUESTION_BANK_TRUST_SECONDS:
+            _count('trusted_hits')
+            return entry['bank']
+        # 2. 버전이 같으면 캐시 사용
+        if _current_version(job_posting_id) == entry['version']:
+            entry['checked_at'] = now
+            _count('hits')
+            return entry['bank']
+        _count('stale')
+    else:
+        _count('misses')
+
+    # 3. 캐시가 없거나 버전이 바뀌었으면 전체를 다시 읽음
+    version, bank = _load(job_posting_id)
+    with _lock:
+        _cache[job_posting_id] = {'version': version, 'bank': bank, 'loaded_at': now, 'checked_at': now}
+        _cache.move_to_end(job_posting_id)
+        while len(_cache) > QUESTION_BANK_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return bank
+
+
+def invalidate(job_posting_id=None):
+    """캐시 항목(없으면 전체)을 비웁니다."""
+    with _lock:
+        if job_posting_id is None:
+            _cache.clear()
+        else:
+            _cache.pop(job_posting_id, None)
+
+
+def get_stats():
+    with _lock:
+        return dict(_stats, size=len(_cache))
@@ -0,0 +1,81 @@
+import threading
+import time
+
+# Bedrock RPM/TPM 쿼터에 맞춘 토큰 버킷 제한기
+# - 모델별로 요청 버킷(RPM)과 토큰 버킷(TPM)을 둔다 (Bedrock 쿼터는 모델 단위)
+# - acquire 시점에 필요한 양을 먼저 차감(예약)하고, 모자라면 모자란 만큼만 기다린다 (바쁜 대기 없음, 도착 순서대로 처리)
+# - 토큰은 입력 추정치 + max_tokens로 예약한 뒤, 호출이 끝나면 실제 사용량과의 차이를 돌려준다
+# llmGateway.set_rate_limiter()로 끼워 넣으면 모든 Bedrock 호출(재시도 포함)이 이 제한기를 거친다.
+
+
+class TokenBucket:
+    """분당 per_minute 만큼 채워지는 버킷. 잔량이 음수가 되는 예약을 허용합니다."""
+
+    def __init__(self, per_minute, burst=None, clock=time.monotonic):
+        self.rate = per_minute / 60.0
+        self.capacity = float(burst or per_minute)
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount):
+        """amount를 차감하고, 잔량이 다시 0이 될 때까지 기다려야 하는 시간(초)을 반환합니다."""
+        self._refill()
+        self.tokens -= amount
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def refund(self, amount):
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class QuotaLimiter:
+    """모델별 RPM/TPM 제한기."""
+
+    def __init__(self, rpm, tpm, clock=time.monotonic, sleep=time.sleep):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._buckets = {}  # model_id -> (요청 버킷, 토큰 버킷)
+        self._stats = {'acquired': 0, 'waited': 0, 'wait_ms': 0.0, 'max_wait_ms': 0.0, 'refunded_tokens': 0}
+
+    def _get_buckets(self, model_id):
+        buckets = self._buckets.get(model_id)
+        if buckets is None:
+            buckets = (TokenBucket(self.rpm, clock=self.clock), TokenBucket(self.tpm, clock=self.clock))
+            self._buckets[model_id] = buckets
+        return buckets
+
+    def acquire(self, model_id, tokens):
+        """요청 1건과 tokens를 예약하고 필요한 만큼 기다립니다. 예약한 토큰 수를 반환합니다."""
+        with self._lock:
+            requests_bucket, tokens_bucket = self._get_buckets(model_id)
+            delay = max(requests_bucket.reserve(1), tokens_bucket.reserve(tokens))
+            self._stats['acquired'] += 1
+            if delay > 0:
+                self._stats['waited'] += 1
+                self._stats['wait_ms'] += delay * 1000
+                self._stats['max_wait_ms'] = max(self._stats['max_wait_ms'], delay * 1000)
+        if delay > 0:
+            self.sleep(delay)
+        return tokens
+
+    def settle(self, model_id, reserved, used):
+        """호출이 끝난 뒤 예약량과 실제 사용량(used)의 차이를 돌려줍니다. used가 None이면 예약량을 그대로 둡니다."""
+        if used is None or used >= reserved:
+            return
+        with self._lock:
+            self._get_buckets(model_id)[1].refund(reserved - used)
+            self._stats['refunded_tokens'] += reserved - used
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self._stats, wait_ms=round(self._stats['wait_ms'], 1),
+                        max_wait_ms=round(self._stats['max_wait_ms'], 1))
@@ -1,12 +1,19 @@
 import json
+import interviewState
+import metrics
 
+@metrics.handler('saveAnswer')
 def lambda_handler(event, context):
     # 1. 'taskResult'에서 새로운 답변을 추출합니다.
     # 'Prepare Question and Wait' 단계의 출력 설정 때문에 답변이 여기에 들어옵니다.
     new_answer = event['taskResult']['answer']
     
     # 2. 기존 답변 리스트에 새로운 답변을 추가합니다.
-    event['answers'].append(new_answer)
+    # (클레임 체크 모드면 상태 대신 저장소에 추가하고, 상태에는 인덱스만 남깁니다.)
+    if interviewState.is_claim_check(event):
+        interviewState.append_answer(event['state_ref'], event['current_index'], new_answer)
+    else:
+        event['answers'].append(new_answer)
     
     # 3. 다음 질문으로 넘어가기 위해 인덱스를 1 증가시킵니다.
     event['current_index'] += 1
@@ -0,0 +1,107 @@
+import base64
+import json
+import os
+import time
+from decimal import Decimal
+import awsClients
+
+# InterviewScores 점수 순위 조회.
+# GSI(jobId-scoreRank-index): 파티션 키 jobId, 정렬 키 scoreRank(문자열)
+#   scoreRank = "<점수 10자리 0패딩>#<채점 시각 역순 13자리>#<applicantEmail>"
+# 내림차순으로 읽으면 점수가 높은 순, 동점이면 먼저 채점된 순, 그래도 같으면 이메일 역순으로 고정된다.
+
+SCORES_TABLE_NAME = os.environ.get('SCORES_TABLE_NAME', 'InterviewScores')
+SCORE_RANK_INDEX = os.environ.get('SCORE_RANK_INDEX', 'jobId-scoreRank-index')
+SCORES_REGION = os.environ.get('SCORES_REGION', 'us-east-1')
+MAX_PAGE_SIZE = 100
+_TS_MAX = 10 ** 13 - 1  # 밀리초 타임스탬프 역순 계산용
+
+score_table = awsClients.lazy_table(SCORES_TABLE_NAME, region_name=SCORES_REGION)
+
+
+def score_rank_key(score, applicant_email, scored_at_ms=None):
+    """GSI 정렬 키 문자열을 만듭니다 (문자열 정렬 = 점수 정렬)."""
+    scored_at_ms = int(time.time() * 1000) if scored_at_ms is None else int(scored_at_ms)
+    score = min(max(Decimal(str(score)), Decimal(0)), Decimal('99999.9999'))
+    return f"{score:010.4f}#{_TS_MAX - scored_at_ms:013d}#{applicant_email}"
+
+
+def encode_cursor(last_evaluated_key, rank_offset):
+    raw = json.dumps({'k': last_evaluated_key, 'r': rank_offset}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor, job_id=None):
+    """커서를 (ExclusiveStartKey, rank_offset)로 풉니다. 형식이 잘못됐거나 다른 jobId의 커서면 ValueError."""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"cursor를 해석할 수 없습니다: {e}") from e
+    key = data.get('k') if isinstance(data, dict) else None
+    rank_offset = data.get('r') if isinstance(data, dict) else None
+    if (not isinstance(key, dict) or not isinstance(key.get('scoreRank'), str)
+            or not all(isinstance(v, (str, int, float)) and not isinstance(v, bool) for v in key.values())):
+        raise ValueError("cursor의 시작 키 형식이 올바르지 않습니다.")
+    if job_id is not None and key.get('jobId') != job_id:
+        raise ValueError("다른 jobId의 cursor입니다.")
+    if not isinstance(rank_offset, int) or isinstance(rank_offset, bool) or rank_offset < 0:
+        raise ValueError("cursor의 순위 값이 올바르지 않습니다.")
+    return key, rank_offset
+
+
+def _json_number(value):
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    return value
+
+
+def top_applicants(job_id, limit=20, cursor=None):
+    """jobId의 상위 지원자를 점수 내림차순으로 쿼리 한 번에 가져옵니다.
+
+    반환: {'items': [...], 'next_cursor': 다음 페이지 커서 또는 None}
+    """
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    kwargs = {
+        'IndexName': SCORE_RANK_INDEX,
+        'KeyConditionExpression': 'jobId = :j',
+        'ExpressionAttributeValues': {':j': job_id},
+        'ScanIndexForward': False,
+        'Limit': limit,
+    }
+    rank_offset = 0
+    if cursor:
+        kwargs['ExclusiveStartKey'], rank_offset = decode_cursor(cursor, job_id)
+    response = score_table.query(**kwargs)
+
+    items = []
+    for i, item in enumerate(response.get('Items', [])):
+        items.append({
+            'rank': rank_offset + i + 1,
+            'applicantEmail': item.get('applicantEmail'),
+            'applicantName': item.get('applicantName'),
+            'overallScore': _json_number(item.get('overallScore')),
+            'reportS3Key': item.get('reportS3Key'),
+        })
+    last_key = response.get('LastEvaluatedKey')
+    return {'items': items, 'next_cursor': encode_cursor(last_key, rank_offset + len(items)) if last_key else None}
+
+
+def backfill_score_ranks(job_id=None):
+    """scoreRank가 없는 기존 항목에 정렬 키를 채웁니다 (기존 데이터 이전용, 한 번만 실행)."""
+    kwargs = {'FilterExpression': 'attribute_not_exists(scoreRank) AND attribute_exists(overallScore)'}
+    updated = 0
+    while True:
+        response = score_table.scan(**kwargs)
+        for item in response.get('Items', []):
+            if job_id and item['jobId'] != job_id:
+                continue
+            score_table.update_item(
+                Key={'jobId': item['jobId'], 'applicantEmail': item['applicantEmail']},
+                UpdateExpression='SET scoreRank = :r',
+                ConditionExpression='attribute_not_exists(scoreRank)',
+                ExpressionAttributeValues={':r': score_rank_key(item['overallScore'], item['applicantEmail'], 0)}
+            )
+            updated += 1
+        if 'LastEvaluatedKey' not in response:
+            return updated
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
@@ -1,10 +1,11 @@
 import json
-import boto3
 import os
+import awsClients
+import metrics
 
-sfn_client = boto3.client('stepfunctions')
-STATE_MACHINE_ARN = os.environ['STATE_MACHINE_ARN']
+sfn_client = awsClients.lazy_client('stepfunctions')
 
+@metrics.handler('startInterview')
 def lambda_handler(event, context):
     body = json.loads(event.get('body', '{}'))
     job_posting_id = body.get('job_posting_id')
@@ -14,7 +15,7 @@ def lambda_handler(event, context):
 
     # Step Functions 워크플로 실행 시작
     response = sfn_client.start_execution(
-        stateMachineArn=STATE_MACHINE_ARN,
+        stateMachineArn=os.environ['STATE_MACHINE_ARN'],
         input=json.dumps({'job_posting_id': job_posting_id})
     )
 
@@ -23,3 +24,5 @@ def lambda_handler(event, context):
         'statusCode': 202, # Accepted
         'body': json.dumps({'executionArn': response['executionArn']})
     }
+
+awsClients.prime_on_init()
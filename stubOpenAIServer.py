@@ -0,0 +1,115 @@
+import argparse
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 로컬 확인용 OpenAI chat/completions 대역 서버 (일반 응답 + SSE 스트리밍)
+DEFAULT_REPLY = "좋은 답변입니다. 다만 구체적인 수치나 결과가 부족합니다. 그 프로젝트에서 본인이 맡은 역할은 무엇이었나요?"
+
+
+def make_handler(reply, token_delay, first_token_delay):
+    class StubOpenAIHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if request.get("stream"):
+                self._stream(request)
+            else:
+                self._buffered(request)
+
+        def _buffered(self, request):
+            time.sleep(first_token_delay + token_delay * len(reply.split()))
+            body = json.dumps({
+                "model": request.get("model"),
+                "choices": [{"message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 50, "completion_tokens": len(reply.split())}
+            }).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _stream(self, request):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            time.sleep(first_token_delay)
+            for i, word in enumerate(reply.split(" ")):
+                time.sleep(token_delay)
+                delta = word if i == 0 else " " + word
+                chunk = {"model": request.get("model"), "choices": [{"index": 0, "delta": {"content": delta}}]}
+                self._write_chunk(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n")
+            self._write_chunk("data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+
+        def _write_chunk(self, text):
+            data = text.encode("utf-8")
+            self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+
+        def log_message(self, *args):
+            pass
+
+    return StubOpenAIHandler
+
+
+def start(reply=DEFAULT_REPLY, token_delay=0.05, first_token_delay=0.3, port=0):
+    """대역 서버를 백그라운드 스레드로 띄우고 (server, chat/completions URL)을 반환합니다."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(reply, token_delay, first_token_delay))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/v1/chat/completions"
+
+
+def compare_modes(url):
+    """aiInterviewBot의 버퍼링/스트리밍 핸들러를 대역 서버에 붙여 첫 응답 시간을 비교합니다."""
+    os.environ["OPENAI_API_URL"] = url
+    os.environ.setdefault("OPENAI_API_KEY", "stub-key")
+    import llmGateway
+    llmGateway.OPENAI_API_URL = url
+    import aiInterviewBot
+
+    event = {"body": json.dumps({"common_index": 1, "user_answer": "저는 성실한 사람입니다."}, ensure_ascii=False)}
+
+    started = time.perf_counter()
+    buffered = aiInterviewBot.lambda_handler(event, None)
+    buffered_total = time.perf_counter() - started
+    assert buffered["statusCode"] == 200, buffered
+
+    started = time.perf_counter()
+    first_delta, events = None, []
+    for chunk in aiInterviewBot.stream_handler(event, None):
+        line = chunk.decode("utf-8").strip()
+        if line == "data: [DONE]":
+            break
+        payload = json.loads(line[len("data: "):])
+        if "delta" in payload and first_delta is None:
+            first_delta = time.perf_counter() - started
+        events.append(payload)
+    stream_total = time.perf_counter() - started
+
+    final = events[-1]
+    assert final["done"] and final["feedback_or_followup"] == json.loads(buffered["body"])["feedback_or_followup"]
+    print(f"buffered : first byte = total = {buffered_total * 1000:7.1f}ms")
+    print(f"streaming: first token = {first_delta * 1000:7.1f}ms, total = {stream_total * 1000:7.1f}ms "
+          f"({sum(1 for e in events if 'delta' in e)} chunks)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OpenAI chat/completions 대역 서버 (SSE 지원)")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--token-delay", type=float, default=0.05)
+    parser.add_argument("--first-token-delay", type=float, default=0.3)
+    parser.add_argument("--serve", action="store_true", help="비교 실행 없이 서버만 띄움")
+    args = parser.parse_args()
+    server, url = start(token_delay=args.token_delay, first_token_delay=args.first_token_delay, port=args.port)
+    if args.serve:
+        print(f"stub OpenAI server: {url}")
+        threading.Event().wait()
+    else:
+        compare_modes(url)
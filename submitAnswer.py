@@ -1,8 +1,10 @@
 import json
-import boto3
+import awsClients
+import metrics
 
-sfn_client = boto3.client('stepfunctions')
+sfn_client = awsClients.lazy_client('stepfunctions')
 
+@metrics.handler('submitAnswer')
 def lambda_handler(event, context):
     body = json.loads(event.get('body', '{}'))
     task_token = body.get('taskToken')
@@ -21,3 +23,5 @@ def lambda_handler(event, context):
         'statusCode': 200,
         'body': json.dumps({'status': 'Answer submitted successfully.'})
     }
+
+awsClients.prime_on_init()
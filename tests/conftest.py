@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+# 저장소 루트의 Lambda 모듈을 그대로 import (localHarness가 환경 변수 기본값도 채움)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import localHarness  # noqa: E402
+
+
+@pytest.fixture
+def harness():
+    """events/seed.json 상태의 메모리 대역 서비스 (지연/장애 주입 없음)."""
+    seed = localHarness._load_json(os.path.join(localHarness.DEFAULT_EVENT_DIR, localHarness.SEED_FILENAME))
+    h = localHarness.Harness(seed=seed, profiles=localHarness.build_profiles(no_latency=True)).install()
+    yield h
+    h.uninstall()
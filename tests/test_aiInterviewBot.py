@@ -0,0 +1,58 @@
+import json
+
+import aiInterviewBot
+import chatSession
+import feedbackCache
+
+
+def _post(body):
+    response = aiInterviewBot.lambda_handler({"body": json.dumps(body, ensure_ascii=False)}, None)
+    assert response["statusCode"] == 200, response
+    return json.loads(response["body"])
+
+
+def test_session_runs_to_final_message(harness):
+    reply = _post({"new_session": True, "resume": "백엔드 3년", "job_type": "백엔드 개발자"})
+    session_id = reply["session_id"]
+    questions = [reply["question"]]
+    for turn in range(len(aiInterviewBot.COMMON_QUESTIONS) + chatSession.CHAT_JOB_QUESTION_LIMIT):
+        reply = _post({"session_id": session_id, "user_answer": f"답변 {turn}"})
+        questions.append(reply["question"])
+        if reply.get("job_done"):
+            break
+    assert reply["job_done"] is True
+    assert reply["question"] == aiInterviewBot.FINAL_MESSAGE
+    assert reply["feedback_or_followup"]  # 마지막 답변에도 피드백은 나감
+    assert questions[:len(aiInterviewBot.COMMON_QUESTIONS)] == aiInterviewBot.COMMON_QUESTIONS
+
+    # 끝난 세션에 다시 답해도 종료 메시지만 반환
+    assert _post({"session_id": session_id, "user_answer": "추가 답변"})["question"] == aiInterviewBot.FINAL_MESSAGE
+
+
+def test_session_context_feedback_is_not_shared(harness, monkeypatch):
+    looked_up, stored = [], []
+    monkeypatch.setattr(feedbackCache, "store", lambda *args: stored.append(args))
+    monkeypatch.setattr(feedbackCache, "lookup", lambda *args: looked_up.append(args))
+
+    session_id = _post({"new_session": True, "resume": "이력서", "job_type": "백엔드 개발자"})["session_id"]
+    _post({"session_id": session_id, "user_answer": "첫 답변"})
+    _post({"session_id": session_id, "user_answer": "두 번째 답변"})  # 이전 턴이 맥락으로 붙음
+    # 맥락이 없던 첫 답변만 공유 캐시를 조회/저장
+    assert [args[1] for args in looked_up] == ["첫 답변"]
+    assert [args[1] for args in stored] == ["첫 답변"]
+
+
+def test_job_phase_prompt_has_no_common_cache_scope():
+    # 마지막 공통 질문 답변 턴: 직무 프롬프트로 바뀌므로 공통 질문 범위로 캐시하면 안 됨
+    _, prompt, _, cache_scope = aiInterviewBot.plan_turn({
+        "common_index": len(aiInterviewBot.COMMON_QUESTIONS), "job_type": "백엔드 개발자", "user_answer": "답변"})
+    assert "직무 면접" in prompt
+    assert cache_scope is None
+
+
+def test_legacy_client_controls_job_done():
+    # 진행 상태를 직접 보내는 기존 클라이언트는 직무 질문 수 제한 없이 계속 진행
+    early, prompt, fields, _ = aiInterviewBot.plan_turn({
+        "common_done": True, "job_index": 10, "job_type": "백엔드 개발자", "user_answer": "답변"})
+    assert early is None and prompt
+    assert fields["job_done"] is False and fields["job_index"] == 11
@@ -0,0 +1,36 @@
+import http.client
+import json
+import threading
+
+import aiInterviewBotStream
+
+
+def _serve():
+    server = aiInterviewBotStream.make_server(port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_stream_server_sends_sse_chunks(harness, monkeypatch):
+    monkeypatch.setenv('OPENAI_API_KEY', 'harness-key')
+    server = _serve()
+    try:
+        conn = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=10)
+        conn.request('GET', '/')
+        assert conn.getresponse().read() == b'{"status": "ok"}'
+
+        body = json.dumps({'common_index': 1, 'user_answer': '저는 백엔드 개발자입니다.'}, ensure_ascii=False)
+        conn.request('POST', '/', body=body.encode('utf-8'), headers={'Content-Type': 'application/json'})
+        response = conn.getresponse()
+        assert response.status == 200
+        assert response.getheader('Content-Type') == 'text/event-stream'
+        assert response.getheader('Transfer-Encoding') == 'chunked'
+        lines = [line for line in response.read().decode('utf-8').split('\n\n') if line]
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert lines[-1] == 'data: [DONE]'
+    events = [json.loads(line[len('data: '):]) for line in lines[:-1]]
+    assert events[0]['question'] == '본인의 강점과 약점을 말씀해주세요.'
+    assert sum(1 for e in events if 'delta' in e) > 1
+    assert events[-1]['done'] is True and events[-1]['feedback_or_followup']
@@ -0,0 +1,30 @@
+import importlib
+
+import processAnswerUpload
+
+BUCKET = 'ai-interview-bucket'
+KEY = 'interview-sessions/sess-1/q02_answer.txt'
+
+
+def _upload(harness, key, text):
+    harness.s3.load(BUCKET, key, text)
+    processAnswerUpload.process_answer(BUCKET, key)
+
+
+def test_verify_mode_rereads_answers_changed_after_bundling(harness):
+    scores = importlib.import_module('calculate-scores')
+    _upload(harness, KEY, '처음 답변')
+    harness.s3.load(BUCKET, KEY, '다시 올린 답변')  # 번들 갱신 전에 점수 계산이 시작된 경우
+    answers, failures = scores.load_answers(BUCKET, 'sess-1', mode='verify')
+    assert not failures
+    assert {a['id']: a['answer'] for a in answers}['q02'] == '다시 올린 답변'
+
+
+def test_verify_mode_uses_bundle_when_unchanged(harness):
+    scores = importlib.import_module('calculate-scores')
+    for key in scores.list_answer_keys(BUCKET, 'sess-1'):
+        processAnswerUpload.process_answer(BUCKET, key)
+    gets = harness.stats.requests.get(None, {}).get('s3.GetObject', 0)
+    answers, _ = scores.load_answers(BUCKET, 'sess-1', mode='verify')
+    assert len(answers) == 3
+    assert harness.stats.requests[None]['s3.GetObject'] == gets + 1  # 번들 GET 한 번뿐
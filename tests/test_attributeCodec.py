@@ -0,0 +1,25 @@
+import json
+from decimal import Decimal
+
+import attributeCodec
+import updateCompanyQuestions
+
+
+def test_fractional_decimal_round_trip():
+    value = {'score': Decimal('87.5'), 'rank': Decimal('3'), 'questions': ['자기소개를 해주세요.'] * 20}
+    encoded = attributeCodec.encode(value, threshold=0)
+    assert attributeCodec.is_encoded(encoded)
+    decoded = attributeCodec.decode(encoded)
+    assert decoded == value
+    assert json.loads(json.dumps(decoded, default=attributeCodec.json_default))['score'] == 87.5
+
+
+def test_update_response_keeps_fractional_scores(harness, monkeypatch):
+    monkeypatch.setenv('DYNAMODB_TABLE', 'AI_Interview_Data')
+    monkeypatch.setattr(attributeCodec, 'ATTRIBUTE_CODEC_THRESHOLD_BYTES', 0)  # 작은 목록도 압축 경로로
+    questions = [{'question': '가장 어려웠던 프로젝트는?', 'weight': 87.5}] * 10
+    event = {'pathParameters': {'job_posting_id': 'job-1'}, 'body': json.dumps({'company_questions': questions})}
+    response = updateCompanyQuestions.lambda_handler(event, None)
+    assert response['statusCode'] == 200
+    body = json.loads(response['body'])
+    assert body['updatedAttributes']['company_questions'][0]['weight'] == 87.5
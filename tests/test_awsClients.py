@@ -0,0 +1,67 @@
+import awsClients
+
+
+class _Connection:
+    def __init__(self):
+        self.connected = False
+
+    def connect(self):
+        self.connected = True
+
+    def close(self):
+        pass
+
+
+class _Pool:
+    def __init__(self):
+        self.idle = [_Connection()]
+
+    def _get_conn(self):
+        return self.idle.pop()
+
+    def _put_conn(self, connection):
+        self.idle.append(connection)
+
+
+class _HttpSession:
+    def __init__(self):
+        self.pools = {}
+
+    def _get_connection_manager(self, url, proxy_url=None):
+        return self
+
+    def connection_from_url(self, url):
+        return self.pools.setdefault(url, _Pool())
+
+
+class _Endpoint:
+    host = 'https://dynamodb.us-east-1.amazonaws.com'
+
+    def __init__(self):
+        self.http_session = _HttpSession()
+
+
+class _Client:
+    def __init__(self):
+        self._endpoint = _Endpoint()
+
+
+def test_open_connection_leaves_connected_socket_in_pool():
+    client = _Client()
+    assert awsClients.open_connection(client) is True
+    pool = client._endpoint.http_session.pools[_Endpoint.host]
+    assert [c.connected for c in pool.idle] == [True]
+
+
+def test_open_connection_skips_clients_without_endpoint():
+    assert awsClients.open_connection(object()) is False
+
+
+def test_prime_opens_one_connection_per_client(monkeypatch):
+    client = _Client()
+    proxies = [awsClients.LazyProxy(lambda: client, 'client:a'), awsClients.LazyProxy(lambda: client, 'client:b')]
+    monkeypatch.setattr(awsClients, '_registered', proxies)
+    calls = []
+    monkeypatch.setattr(awsClients, 'open_connection', lambda c: calls.append(c) or True)
+    assert awsClients.prime() == 2
+    assert calls == [client]
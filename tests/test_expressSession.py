@@ -0,0 +1,32 @@
+import json
+
+import expressSession
+import finalizeInterview
+
+
+def _answer(session_id, index, answer):
+    event = {'httpMethod': 'POST', 'pathParameters': {'session_id': session_id},
+             'body': json.dumps({'index': index, 'answer': answer}, ensure_ascii=False)}
+    return expressSession.lambda_handler(event, None)
+
+
+def test_last_answer_completes_in_one_update(harness, monkeypatch):
+    writes = []
+    real_advance = expressSession._advance
+    monkeypatch.setattr(expressSession, '_advance', lambda *args: writes.append(args[3]) or real_advance(*args))
+    for index in range(3):
+        response = _answer('express-1', index, f'답변 {index}')
+        assert response['statusCode'] == 200
+    body = json.loads(response['body'])
+    assert body['status'] == expressSession.STATUS_COMPLETED and 'question' not in body
+    assert writes[-2:] == [False, True]  # 마지막 답변은 상태 변경을 포함한 조건부 업데이트로 저장
+
+    item = expressSession.get_session('express-1')
+    assert item['status'] == expressSession.STATUS_COMPLETED
+    assert item['answers'] == ['답변 0', '답변 1', '답변 2'] and int(item['current_index']) == 3
+    assert _answer('express-1', 3, '추가 답변')['statusCode'] == 409
+
+
+def test_view_of_finalized_record_without_current_index():
+    item = finalizeInterview.build_session_record('done-1', 'posting-1', ['질문'], ['답변'])
+    assert expressSession.session_view(item) == {'session_id': 'done-1', 'status': 'COMPLETED', 'question_count': 1}
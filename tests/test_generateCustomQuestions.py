@@ -0,0 +1,11 @@
+import importlib
+
+BUCKET = 'ai-interview-bucket'
+
+
+def test_object_without_job_id_metadata_is_still_processed(harness):
+    generator = importlib.import_module('generate-custom-questions')
+    harness.s3.load(BUCKET, 'resumes/applicant-2.json', {'name': '김철수'})
+    response = generator.process_object(BUCKET, 'resumes/applicant-2.json')
+    assert response['statusCode'] == 200
+    assert response['outputKey'] == 'resume-questions/applicant-2_questions.json'
@@ -0,0 +1,36 @@
+import json
+
+import getCurrentQuestion
+
+EXEC_ARN = 'arn:aws:states:us-east-1:000000000000:execution:Interview:exec-1'
+
+
+def _get(execution_arn, wait=None):
+    event = {'pathParameters': {'executionArn': execution_arn},
+             'queryStringParameters': {'wait': str(wait)} if wait is not None else None}
+    return getCurrentQuestion.lambda_handler(event, None)
+
+
+def _ops(harness):
+    totals = {}
+    for bucket in harness.stats.requests.values():
+        for name, count in bucket.items():
+            totals[name] = totals.get(name, 0) + count
+    return totals
+
+
+def test_empty_long_poll_makes_no_writes(harness, monkeypatch):
+    monkeypatch.setattr(getCurrentQuestion, 'LONG_POLL_INITIAL_DELAY', 0.01)
+    monkeypatch.setattr(getCurrentQuestion, 'LONG_POLL_MAX_DELAY', 0.02)
+    before = _ops(harness)
+    assert _get('arn:missing', wait=0.2)['statusCode'] == 204
+    after = _ops(harness)
+    assert after.get('dynamodb.DeleteItem', 0) == before.get('dynamodb.DeleteItem', 0)
+    assert after['dynamodb.GetItem'] > before.get('dynamodb.GetItem', 0)
+
+
+def test_question_is_delivered_once(harness):
+    first = _get(EXEC_ARN)
+    assert first['statusCode'] == 200
+    assert json.loads(first['body'])['taskToken'] == 'task-token-1'
+    assert _get(EXEC_ARN)['statusCode'] == 204
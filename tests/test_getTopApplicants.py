@@ -0,0 +1,37 @@
+import base64
+import json
+
+import pytest
+
+import getTopApplicants
+import scoreRanking
+
+
+def _call(cursor, job_id='job-1'):
+    event = {'pathParameters': {'jobId': job_id}, 'queryStringParameters': {'cursor': cursor}}
+    return getTopApplicants.lambda_handler(event, None)
+
+
+def _raw_cursor(data):
+    return base64.urlsafe_b64encode(json.dumps(data).encode('utf-8')).decode('ascii')
+
+
+@pytest.mark.parametrize('cursor', [
+    'not-base64!!',
+    base64.urlsafe_b64encode(b'\xff\xfe').decode('ascii'),
+    _raw_cursor([1, 2]),
+    _raw_cursor({'k': 'x', 'r': 0}),
+    _raw_cursor({'k': {'jobId': 'job-1', 'scoreRank': 'a'}, 'r': None}),
+    _raw_cursor({'k': {'jobId': 'job-1', 'scoreRank': 'a'}, 'r': -1}),
+    _raw_cursor({'k': {'jobId': 'job-1', 'scoreRank': {'S': 'a'}}, 'r': 0}),
+    _raw_cursor({'k': {'jobId': 'job-2', 'scoreRank': 'a'}, 'r': 0}),
+])
+def test_bad_cursor_returns_400(harness, cursor):
+    response = _call(cursor)
+    assert response['statusCode'] == 400
+    assert '잘못된 cursor' in json.loads(response['body'])['error']
+
+
+def test_cursor_round_trip():
+    key = {'jobId': 'job-1', 'applicantEmail': 'a@example.com', 'scoreRank': '0087.5000#1#a@example.com'}
+    assert scoreRanking.decode_cursor(scoreRanking.encode_cursor(key, 20), 'job-1') == (key, 20)
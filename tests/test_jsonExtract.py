@@ -0,0 +1,37 @@
+import jsonExtract
+
+SCHEMA = {'type': 'array', 'minItems': 1, 'items': {'type': 'string'}}
+
+
+def _chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_incremental_extractor_completes_on_split_response():
+    response = '물론입니다. 질문은 다음과 같습니다:\n```json\n["협업 경험은?", "가장 어려웠던 {버그}는?"]\n```\n이상입니다.'
+    extractor = jsonExtract.IncrementalExtractor(SCHEMA)
+    results = [extractor.feed(chunk) for chunk in _chunks(response, 5)]
+    completed = [r for r in results if r is not None]
+    assert completed[0] == ["협업 경험은?", "가장 어려웠던 {버그}는?"]
+    assert results.index(completed[0]) < len(results) - 1  # 뒤쪽 설명 조각 전에 완성됨
+    assert extractor.finish() == completed[0]
+
+
+def test_extract_stream_stops_reading_once_value_closes():
+    read = []
+    chunks = _chunks('{"score": 80, "comment": "좋음"}' + ' 이어지는 설명' * 5, 4)
+
+    def stream():
+        for chunk in chunks:
+            read.append(chunk)
+            yield chunk
+
+    value = jsonExtract.extract_stream(stream(), {'type': 'object', 'required': ['score']}, name='test')
+    assert value == {'score': 80, 'comment': '좋음'}
+    assert len(read) < len(chunks)
+
+
+def test_extract_stream_falls_back_to_repair():
+    value = jsonExtract.extract_stream(iter(['질문: ', '없음']), SCHEMA, name='test',
+                                       repair=lambda text, error: '["다시 만든 질문"]')
+    assert value == ["다시 만든 질문"]
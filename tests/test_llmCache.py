@@ -0,0 +1,13 @@
+import llmCache
+
+
+class _FailingStore:
+    def delete(self, key):
+        raise RuntimeError("store unavailable")
+
+
+def test_invalidate_logs_store_delete_failure(monkeypatch):
+    monkeypatch.setattr(llmCache, '_store', _FailingStore())
+    errors = llmCache.get_stats()['errors']
+    llmCache.invalidate('some-key')  # 원래 예외를 가리지 않도록 삭제 실패는 삼킨다
+    assert llmCache.get_stats()['errors'] == errors + 1
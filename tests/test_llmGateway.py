@@ -0,0 +1,51 @@
+import importlib
+import json
+
+import llmGateway
+import metrics
+import promptCompiler
+
+SONNET_37 = 'anthropic.claude-3-7-sonnet-20250219-v1:0'
+
+
+def _scoring_prompt_parts():
+    scores = importlib.import_module('calculate-scores')
+    prefix, _ = scores.SCORING_PREFIX.render(criteria=promptCompiler.section('- 인재상: 도전', priority=1))
+    prompt, _ = scores.SCORING_SUFFIX.render(answers=promptCompiler.section('Q (q01): 답변', priority=1))
+    return prefix, prompt
+
+
+def test_prefix_and_prompt_are_separated():
+    prefix, prompt = _scoring_prompt_parts()
+    text = llmGateway.full_prompt(prompt, prefix)
+    assert '}\n\n<지원자 답변>' in text
+    assert llmGateway.full_prompt(prompt) == prompt
+
+
+def test_cached_block_matches_full_prompt():
+    prefix, prompt = _scoring_prompt_parts()
+    assert llmGateway.supports_prompt_cache(SONNET_37)
+    body = llmGateway.build_bedrock_body(prompt, SONNET_37, 100, cache_prefix=prefix)
+    blocks = body['messages'][0]['content']
+    assert blocks[0]['cache_control'] and blocks[0]['text'].endswith('}\n\n')
+    assert ''.join(block['text'] for block in blocks) == llmGateway.full_prompt(prompt, prefix)
+
+
+def test_short_prefix_is_logged_once(capsys, monkeypatch):
+    monkeypatch.setattr(llmGateway, '_short_prefix_logged', set())
+    for _ in range(2):
+        llmGateway.build_bedrock_body('답변', SONNET_37, 100, cache_prefix='짧은 기준')
+    assert capsys.readouterr().out.count('최소 캐시 길이') == 1
+    llmGateway.build_bedrock_body('답변', SONNET_37, 100, cache_prefix='기준 ' * 2000)
+    assert '최소 캐시 길이' not in capsys.readouterr().out
+
+
+def test_default_scoring_model_uses_prompt_cache():
+    assert llmGateway.supports_prompt_cache(importlib.import_module('calculate-scores').BEDROCK_MODEL_ID)
+
+
+def test_job_id_is_a_log_property_not_a_dimension(capsys):
+    metrics.emit({'Prompt': 'scoring'}, {'CacheReadTokens': 1}, properties={'JobId': 'job-1'})
+    doc = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+    assert doc['JobId'] == 'job-1'
+    assert doc['_aws']['CloudWatchMetrics'][0]['Dimensions'] == [['Prompt']]
@@ -0,0 +1,52 @@
+import io
+
+import postingExtractor
+
+BULLETED_POSTING = """우리는 데이터로 물류를 혁신하는 회사입니다.
+[인재상]
+- 끊임없이 도전하는 사람
+- 유연 근무 환경에서도 스스로 일정을 관리하는 사람
+- 고객 가치를 최우선으로 생각하는 사람
+[자격 요건]
+- Python 3년 이상 실무 경험
+- 기술 문서 및 서류 작성 능력
+- 참고 자료를 찾아 스스로 학습하는 능력
+- AWS 서비스 운영 경험
+[복리후생]
+- 연 1회 건강검진
+- 자기계발비 지원
+"""
+
+
+def _extract(text):
+    return postingExtractor.extract(io.BytesIO(text.encode('utf-8')), chunk_bytes=32)
+
+
+def test_bullets_with_drop_keywords_do_not_end_section():
+    text, stats = _extract(BULLETED_POSTING)
+    for line in BULLETED_POSTING.splitlines()[:10]:
+        assert line in text
+    assert '건강검진' not in text
+    assert stats['sections'] == ['[인재상]', '[자격 요건]']
+
+
+def test_only_whole_labels_switch_sections():
+    assert postingExtractor._heading_kind('- 고객 가치를 최우선으로 생각하는 사람') is None
+    assert postingExtractor._heading_kind('기타 문서 작성') is None
+    assert postingExtractor._heading_kind('자격 요건:') == 'keep'
+    assert postingExtractor._heading_kind('## 복리후생') == 'drop'
+    assert postingExtractor._heading_kind('[주요 업무] 백엔드 API 설계') == 'keep'
+    assert postingExtractor._heading_kind('근무지', marked=True) == 'drop'
+
+
+def test_html_headings_and_chrome():
+    page = ("<html><body><nav>홈 로그인</nav><p>우리는 데이터로 물류를 혁신하는 회사입니다. 고객의 시간을 아끼는 것을 가장 중요하게 생각합니다.</p>"
+            "<h2>인재상</h2><ul><li>도전하는 사람</li><li>근무 시간보다 성과로 말하는 사람</li></ul>"
+            "<h2>전형 절차</h2><p>서류 → 면접</p>"
+            "<h2>자격 요건</h2><ul><li>Python 3년 이상 실무 경험과 대용량 트래픽 서비스 운영 경험</li></ul>"
+            "<footer>Copyright 2024</footer></body></html>")
+    text, stats = _extract(page)
+    assert '근무 시간보다 성과로 말하는 사람' in text
+    assert 'Python 3년 이상' in text
+    assert '서류 → 면접' not in text and '로그인' not in text and 'Copyright' not in text
+    assert stats['html'] is True
@@ -0,0 +1,32 @@
+import json
+
+import questionBank
+import updateCompanyQuestions
+
+
+def _get_items(harness):
+    return sum(bucket.get('dynamodb.GetItem', 0) for bucket in harness.stats.requests.values())
+
+
+def test_warm_hit_reads_only_the_version(harness, monkeypatch):
+    questionBank.invalidate()
+    read_kwargs = []
+    table = questionBank.postings_table._get()
+    real_get_item = table.get_item
+    monkeypatch.setattr(table, 'get_item', lambda **kwargs: read_kwargs.append(kwargs) or real_get_item(**kwargs))
+    first = questionBank.get_bank('posting-1')
+    calls = _get_items(harness)
+    assert questionBank.get_bank('posting-1') == first
+    assert _get_items(harness) == calls + 1
+    assert read_kwargs[-1]['ProjectionExpression'] == 'bank_version'
+    assert read_kwargs[-1]['ConsistentRead'] is True
+
+
+def test_write_from_another_function_is_seen_on_next_hit(harness):
+    # 쓰는 쪽은 이 프로세스의 캐시를 비우지 않는다 (다른 컨테이너와 같은 조건): bank_version 확인으로 반영되어야 함
+    questionBank.invalidate()
+    questionBank.get_bank('posting-1')
+    updateCompanyQuestions.lambda_handler({'pathParameters': {'job_posting_id': 'posting-1'},
+                                           'body': json.dumps({'company_questions': ['새 질문']})}, None)
+    assert questionBank.get_bank('posting-1')['company_questions'] == ['새 질문']
+    assert questionBank.get_stats()['stale'] >= 1
@@ -1,11 +1,13 @@
 import json
-import boto3
-import os
+import attributeCodec
+import awsClients
+import metrics
+import questionBank
 
-dynamodb = boto3.resource('dynamodb')
-# 환경 변수에서 테이블 이름을 가져옵니다.
-table = dynamodb.Table(os.environ['DYNAMODB_TABLE'])
+# 환경 변수에서 테이블 이름을 가져옵니다. (첫 사용 시점)
+table = awsClients.lazy_table(env_var='DYNAMODB_TABLE')
 
+@metrics.handler('updateCompanyQuestions')
 def lambda_handler(event, context):
     # 1. API Gateway의 경로 변수에서 job_posting_id 가져오기
     try:
@@ -30,11 +32,12 @@ def lambda_handler(event, context):
     try:
         response = table.update_item(
             Key={'job_posting_id': job_posting_id},
-            # 'company_questions' 필드의 값을 :c 값으로 설정(SET)합니다.
-            UpdateExpression="SET company_questions = :c",
+            # 'company_questions' 필드의 값을 :c 값으로 설정(SET)하고, 질문 뱅크 캐시 무효화를 위해 버전을 올립니다.
+            UpdateExpression="SET company_questions = :c " + questionBank.BUMP_VERSION_EXPRESSION,
             # UpdateExpression에서 사용할 변수(:c)의 실제 값을 지정합니다.
             ExpressionAttributeValues={
-                ':c': company_questions
+                ':c': attributeCodec.encode(company_questions),  # 큰 목록은 압축 저장
+                **questionBank.BUMP_VERSION_VALUES
             },
             ReturnValues="UPDATED_NEW" # 업데이트된 후의 값을 반환하도록 설정
         )
@@ -42,8 +45,8 @@ def lambda_handler(event, context):
             'statusCode': 200, # OK
             'body': json.dumps({
                 'message': 'Company questions updated successfully.',
-                'updatedAttributes': response.get('Attributes', {})
-            })
+                'updatedAttributes': attributeCodec.decode_item(response.get('Attributes', {}))
+            }, default=attributeCodec.json_default) # bank_version 등 숫자 속성은 Decimal로 반환됨 (소수 유지)
         }
     except Exception as e:
         # DynamoDB 업데이트 중 에러 발생 시
@@ -51,3 +54,5 @@ def lambda_handler(event, context):
             'statusCode': 500, # Internal Server Error
             'body': json.dumps({'error': f"Could not update the database: {str(e)}"})
         }
+
+awsClients.prime_on_init()